@@ -1,6 +1,144 @@
 # -*- coding: utf-8 -*-
+import re
 from argparse import ArgumentParser, Namespace
 
+from utils.constants import FRIDAY_SESSION_ID
+from utils.log import LEVELS
+from utils.serializer import SERIALIZERS, get_serializer
+
+
+def _add_budget_args(parser: ArgumentParser) -> None:
+    """Add the arguments of the per-turn budget of Friday."""
+    parser.add_argument(
+        "--maxTurnSeconds",
+        type=float,
+        default=None,
+        required=False,
+        help="The wall-clock time budget of a turn in seconds"
+    )
+    parser.add_argument(
+        "--maxTurnTokens",
+        type=int,
+        default=None,
+        required=False,
+        help="The model token budget of a turn"
+    )
+    parser.add_argument(
+        "--maxToolCalls",
+        type=int,
+        default=None,
+        required=False,
+        help="The tool call budget of a turn"
+    )
+    parser.add_argument(
+        "--budgetReserve",
+        type=float,
+        default=0.2,
+        required=False,
+        help="The fraction of the time and token budgets kept for the final "
+             "response"
+    )
+
+
+def _add_memory_profile_arg(parser: ArgumentParser) -> None:
+    """Add the argument of the opt-in memory profiling."""
+    parser.add_argument(
+        "--memoryProfile",
+        type=str,
+        default=None,
+        required=False,
+        help="Append memory snapshots (top allocators, growth and object "
+             "counts) taken at each turn and debate round to this JSONL file"
+    )
+
+
+def _add_image_compaction_arg(parser: ArgumentParser) -> None:
+    """Add the argument of the compaction of the older images."""
+    parser.add_argument(
+        "--compactImagesAfterTurns",
+        type=int,
+        default=None,
+        required=False,
+        help="Replace the images older than this number of turns in the "
+             "session by their cached captions, which the agent can view "
+             "again by the view_image tool. Disabled if not given"
+    )
+
+
+def _add_logging_args(parser: ArgumentParser, default_level: str) -> None:
+    """Add the arguments of the logging."""
+    parser.add_argument(
+        "--logLevel",
+        choices=LEVELS,
+        default=default_level,
+        required=False,
+        help="The logging level, DEBUG logs the converted queries with the "
+             "binary data elided, and INFO or below also prints the agents' "
+             "messages to the console"
+    )
+    parser.add_argument(
+        "--logFile",
+        type=str,
+        default=None,
+        required=False,
+        help="Append the logs to this file besides stderr"
+    )
+
+
+def _add_serializer_arg(parser: ArgumentParser) -> None:
+    """Add the argument of the serialization format."""
+    parser.add_argument(
+        "--serializer",
+        choices=list(SERIALIZERS),
+        default="json",
+        required=False,
+        help="The format of the session files and of the large payloads "
+             "pushed to the studio, msgpack requires the msgpack package"
+    )
+
+
+def _validate_serializer_arg(parser: ArgumentParser, args: Namespace) -> None:
+    """Validate that the serializer is available."""
+    try:
+        get_serializer(args.serializer)
+    except ImportError as e:
+        parser.error(str(e))
+
+
+def _validate_image_compaction_arg(
+    parser: ArgumentParser,
+    args: Namespace,
+) -> None:
+    """Validate the number of the turns whose images are kept."""
+    if args.compactImagesAfterTurns is not None and args.compactImagesAfterTurns < 0:
+        parser.error("compactImagesAfterTurns must not be negative")
+
+
+def _validate_budget_args(parser: ArgumentParser, args: Namespace) -> None:
+    """Validate the arguments of the per-turn budget."""
+    for name in ("maxTurnSeconds", "maxTurnTokens", "maxToolCalls"):
+        value = getattr(args, name)
+        if value is not None and value <= 0:
+            parser.error(f"{name} must be positive")
+    if not 0 <= args.budgetReserve < 1:
+        parser.error("budgetReserve must be in [0, 1)")
+
+
+def _validate_rate_limit_args(parser: ArgumentParser, args: Namespace) -> None:
+    """Validate the rate limits of the model requests."""
+    for name in ("requestsPerMinute", "tokensPerMinute"):
+        value = getattr(args, name)
+        if value is not None and value <= 0:
+            parser.error(f"{name} must be positive")
+
+
+def _validate_debate_args(parser: ArgumentParser, args: Namespace) -> None:
+    """Validate the number of the debate agents and rounds."""
+    if not (2 <= args.debateAgents <= 5):
+        parser.error("debateAgents must be between 2 and 5")
+    if not (1 <= args.debateRounds <= 10):
+        parser.error("debateRounds must be between 1 and 10")
+
 
 def get_args() -> Namespace:
     """Get the command line arguments for the script."""
@@ -51,6 +189,43 @@ def get_args() -> Namespace:
         type=str,
         required=False,
     )
+    parser.add_argument(
+        "--requestsPerMinute",
+        type=float,
+        default=None,
+        required=False,
+        help="The rate limit of the model requests per minute"
+    )
+    parser.add_argument(
+        "--tokensPerMinute",
+        type=float,
+        default=None,
+        required=False,
+        help="The rate limit of the model tokens per minute"
+    )
+    _add_budget_args(parser)
+
+    parser.add_argument(
+        "--sessionId",
+        type=str,
+        default=FRIDAY_SESSION_ID,
+        required=False,
+        help="The ID of the conversation session to continue"
+    )
+    parser.add_argument(
+        "--maxSessions",
+        type=int,
+        default=None,
+        required=False,
+        help="Archive the least recently used sessions beyond this number"
+    )
+    parser.add_argument(
+        "--sessionMaxAgeDays",
+        type=float,
+        default=None,
+        required=False,
+        help="Archive the sessions not accessed for this many days"
+    )
 
     # 🆕 新增辩论模式参数 (New debate mode parameters)
     parser.add_argument(
@@ -74,6 +249,30 @@ def get_args() -> Namespace:
         required=False,
         help="Maximum number of debate rounds (1-10)"
     )
+    parser.add_argument(
+        "--debateJudge",
+        choices=["direct", "react"],
+        default="direct",
+        required=False,
+        help="The judge makes one structured model call per judgment "
+        "(direct), or runs as a ReAct agent (react)"
+    )
+    parser.add_argument(
+        "--debateDebater",
+        choices=["direct", "react"],
+        default="direct",
+        required=False,
+        help="The debaters speak by one streamed model call (direct), or "
+        "run as ReAct agents (react)"
+    )
+    parser.add_argument(
+        "--resumeDebate",
+        type=lambda x: x.lower() == 'true',
+        default=False,
+        required=False,
+        help="Resume the latest debate of the session from its last "
+        "completed round"
+    )
     parser.add_argument(
         "--debateTopic",
         type=str,
@@ -81,20 +280,150 @@ def get_args() -> Namespace:
         required=False,
         help="The topic for debate (if empty, will use query content)"
     )
+    _add_memory_profile_arg(parser)
+    _add_serializer_arg(parser)
+    _add_image_compaction_arg(parser)
+    # Quiet by default, the studio reads the outputs of the process
+    _add_logging_args(parser, "WARNING")
 
     args = parser.parse_args()
+    _validate_rate_limit_args(parser, args)
+    _validate_budget_args(parser, args)
+    _validate_serializer_arg(parser, args)
+    _validate_image_compaction_arg(parser, args)
 
-    # Validate that either query or query_file is provided
+    # Validate that either query or query_file is provided, a debate takes
+    # its topic from it unless debateTopic is given
     if not args.query and not args.query_file:
         parser.error("Either --query or --query-file must be provided")
 
-    # 辩论参数验证 (Debate parameter validation)
-    if args.debateMode:
-        if not (2 <= args.debateAgents <= 5):
-            parser.error("debateAgents must be between 2 and 5")
-        if not (1 <= args.debateRounds <= 10):
-            parser.error("debateRounds must be between 1 and 10")
-        if not args.debateTopic and not args.query:
-            parser.error("debateTopic or query must be provided in debate mode")
+    # The session ID is used as the file name
+    if not re.fullmatch(r"[\w\-]+", args.sessionId):
+        parser.error(
+            "sessionId may only contain letters, digits, '_' and '-'"
+        )
+
+    # 辩论参数验证，恢复辩论也可能开始新的辩论
+    # (Debate parameter validation, resuming may start a new debate too)
+    if args.debateMode or args.resumeDebate:
+        _validate_debate_args(parser, args)
+
+    return args
+
+
+def get_batch_args() -> Namespace:
+    """Get the command line arguments for the batch (headless) mode."""
+    parser = ArgumentParser(
+        description="Run a batch of Friday queries or debates headlessly"
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        required=True,
+        help="Path to a JSONL file, one query or debate per line"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=True,
+        help="Path to the JSONL file the results are streamed to"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        required=False,
+        help="The maximum number of items run at the same time"
+    )
+    parser.add_argument(
+        "--studio_url",
+        type=str,
+        default="",
+        required=False,
+        help="Forward the messages to the studio if given"
+    )
+    parser.add_argument(
+        "--llmProvider",
+        choices=["dashscope", "openai", "anthropic", "gemini", "ollama"],
+        required=True,
+    )
+    parser.add_argument(
+        "--modelName",
+        type=str,
+        required=True,
+    )
+    parser.add_argument(
+        "--visionModelName",
+        type=str,
+        required=False,
+    )
+    parser.add_argument(
+        "--apiKey",
+        type=str,
+        required=True,
+    )
+    parser.add_argument(
+        "--writePermission",
+        type=lambda x: x.lower() == 'true',
+        default=False,
+        required=False,
+    )
+    parser.add_argument(
+        "--baseUrl",
+        type=str,
+        required=False,
+    )
+    parser.add_argument(
+        "--requestsPerMinute",
+        type=float,
+        default=None,
+        required=False,
+        help="The rate limit of the model requests per minute"
+    )
+    parser.add_argument(
+        "--tokensPerMinute",
+        type=float,
+        default=None,
+        required=False,
+        help="The rate limit of the model tokens per minute"
+    )
+    _add_budget_args(parser)
+    parser.add_argument(
+        "--sessionDir",
+        type=str,
+        default=None,
+        required=False,
+        help="The directory of the sessions of the items with a sessionId"
+    )
+    parser.add_argument(
+        "--debateAgents",
+        type=int,
+        default=2,
+        required=False,
+        help="The default number of debate agents (2-5)"
+    )
+    parser.add_argument(
+        "--debateRounds",
+        type=int,
+        default=3,
+        required=False,
+        help="The default maximum number of debate rounds (1-10)"
+    )
+    _add_memory_profile_arg(parser)
+    _add_serializer_arg(parser)
+    _add_image_compaction_arg(parser)
+    # The progress of the items is logged at INFO
+    _add_logging_args(parser, "INFO")
+
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("concurrency must be at least 1")
+    _validate_rate_limit_args(parser, args)
+    _validate_budget_args(parser, args)
+    _validate_serializer_arg(parser, args)
+    _validate_image_compaction_arg(parser, args)
+    # The defaults of the debate items
+    _validate_debate_args(parser, args)
 
     return args
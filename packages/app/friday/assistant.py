@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""The Friday assistant agent and its toolkit, shared by the interactive and
+the batch entry points."""
+import asyncio
+import inspect
+import math
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Literal, Type
+
+from agentscope.agent import ReActAgent
+from agentscope.formatter import FormatterBase
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg, TextBlock, ToolResultBlock, ToolUseBlock
+from agentscope.model import ChatModelBase
+from pydantic import BaseModel
+from agentscope.tool import (
+    Toolkit,
+    write_text_file,
+    insert_text_file,
+    view_text_file,
+)
+
+from tool.coding import execute_python_code, execute_shell_command
+from tool.image import view_image
+from tool.schema_cache import register_tools
+from tool.source_index import search_agentscope_source
+from tool.utils import (
+    view_agentscope_library,
+    view_agentscope_readme,
+    view_agentscope_faq,
+)
+from utils.budget import TurnBudget
+from utils.log import is_console_output_enabled
+from utils.usage import UsageTracker, get_usage_tracker, usage_scope
+
+# The mark of the budget hint in the memory, removed after the reasoning
+_BUDGET_HINT_MARK = "friday_budget_hint"
+
+# The extra seconds a tool call gets to stop by its own timeout before it's
+# cancelled
+_TOOL_STOP_GRACE = 1.0
+
+
+def create_toolkit(
+    write_permission: bool,
+    compact_images: bool = False,
+) -> Toolkit:
+    """Create the toolkit of Friday, with the tool to view the compacted
+    images again if the images of the older turns are compacted. The tools
+    are registered with their cached JSON schemas."""
+    toolkit = Toolkit()
+
+    # Basic tools
+    basic_tools = [
+        execute_python_code,
+        execute_shell_command,
+        view_text_file,
+        insert_text_file,
+    ]
+    if write_permission:
+        basic_tools.append(write_text_file)
+    if compact_images:
+        basic_tools.append(view_image)
+    register_tools(toolkit, basic_tools)
+
+    # AgentScope tool group
+    toolkit.create_tool_group(
+        group_name="agentscope_tools",
+        description="The AgentScope library related tools that will provide a brief summary and notes about AgentScope in your system prompt, as well as a series of tools to retrieve AgentScope related information.",
+        notes="""# AgentScope Expertise
+## Answer Generation Guidelines
+The solution/code to the user query may already exist in the AgentScope resources, your duty is to show it to the user rather than coding from scratch. Search the following resources in this order:
+1. FAQ using `view_agentscope_faq` tool
+2. README using `view_agentscope_readme` tool
+3. Definitions and examples using `search_agentscope_source` tool, which returns where a class/function is defined, its signature and the examples using it in one call
+4. Examples using `execute_shell_command` with command `ls -l` in examples directory (AgentScope has many pre-built examples and they are very helpful)
+5. Python library using `view_agentscope_library` tool in top-down manner (top-module → submodule → specific class/function)
+6. Source code using `view_text_file` tool, within the line ranges given by `search_agentscope_source`"""
+    )
+    register_tools(
+        toolkit,
+        [
+            view_agentscope_library,
+            view_agentscope_readme,
+            view_agentscope_faq,
+            search_agentscope_source,
+        ],
+        group_name="agentscope_tools",
+    )
+
+    return toolkit
+
+
+class FridayAgent(ReActAgent):
+    """The ReAct agent whose reasoning-acting loop is limited by a per-turn
+    budget. Once the budget runs low, the agent is forced to give its final
+    response, instead of calling more tools."""
+
+    def __init__(
+        self,
+        *args: Any,
+        budget: TurnBudget | None = None,
+        on_budget_progress: Callable[
+            [ReActAgent, dict[str, Any]], Awaitable[None]
+        ]
+        | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the agent.
+
+        Args:
+            *args (`Any`):
+                The arguments of `ReActAgent`.
+            budget (`TurnBudget | None`, optional):
+                The budget of each turn, unbounded if not given.
+            on_budget_progress (`Callable[[ReActAgent, dict[str, Any]], \
+            Awaitable[None]] | None`, optional):
+                Called with the budget consumption after each reasoning
+                step, e.g. to push it to the studio.
+            **kwargs (`Any`):
+                The keyword arguments of `ReActAgent`.
+        """
+        super().__init__(*args, **kwargs)
+        self.budget = budget or TurnBudget()
+        self.on_budget_progress = on_budget_progress
+
+    async def reply(
+        self,
+        msg: Msg | list[Msg] | None = None,
+        structured_model: Type[BaseModel] | None = None,
+    ) -> Msg:
+        """Reply within the budget, whose tokens are counted by the usage
+        tracker of the caller if any."""
+        tracker = get_usage_tracker() or UsageTracker()
+        self.budget.start(tracker)
+        with usage_scope(tracker):
+            return await super().reply(msg, structured_model)
+
+    async def _reasoning(
+        self,
+        tool_choice: Literal["auto", "none", "required"] | None = None,
+    ) -> Msg:
+        """Reason, forcing the final response if the budget runs low."""
+        forced = self.budget.is_low()
+        if forced:
+            await self.memory.add(
+                Msg(
+                    "user",
+                    "<system-hint>The budget of this turn is running out. "
+                    "Don't call tools anymore, give your final response "
+                    "based on the current situation now.</system-hint>",
+                    "user",
+                ),
+                marks=_BUDGET_HINT_MARK,
+            )
+            # Call the finish function directly if the structured output is
+            # required, otherwise respond in text
+            tool_choice = (
+                self.finish_function_name
+                if self._required_structured_model
+                else "none"
+            )
+
+        try:
+            msg = await super()._reasoning(tool_choice)
+        finally:
+            await self.memory.delete_by_mark(_BUDGET_HINT_MARK)
+
+        self.budget.record_iteration(
+            len(msg.get_content_blocks("tool_use")) if msg else 0,
+        )
+        if self.on_budget_progress is not None and self.budget.enabled:
+            await self.on_budget_progress(
+                self,
+                {**self.budget.progress(), "forced": forced},
+            )
+        return msg
+
+    async def _acting(self, tool_call: ToolUseBlock) -> dict | None:
+        """Act within the remaining time and tool calls of the turn. The
+        tool calls beyond the limit are skipped, the timeout argument of a
+        tool, e.g. `execute_shell_command`'s, is capped to the remaining
+        time, and a tool call still running shortly after is cancelled, with
+        their results telling the model why. The finish function is always
+        called, so that the agent can respond."""
+        if (
+            tool_call["name"] != self.finish_function_name
+            and not self.budget.acquire_tool_call()
+        ):
+            await self._record_tool_skipped(tool_call)
+            return None
+
+        remaining = self.budget.remaining_seconds()
+        if remaining is None:
+            return await super()._acting(tool_call)
+        # At least a second, in whole seconds as the timeout arguments
+        remaining = max(1, math.ceil(remaining))
+
+        tool = self.toolkit.tools.get(tool_call["name"])
+        if (
+            tool is not None
+            and "timeout" in inspect.signature(tool.original_func).parameters
+        ):
+            timeout = tool_call["input"].get("timeout")
+            if not isinstance(timeout, (int, float)) or timeout > remaining:
+                tool_call = ToolUseBlock(
+                    **{
+                        **tool_call,
+                        "input": {
+                            **tool_call["input"],
+                            "timeout": remaining,
+                        },
+                    },
+                )
+
+        time_limit = remaining + _TOOL_STOP_GRACE
+        start = time.perf_counter()
+        try:
+            res = await asyncio.wait_for(
+                super()._acting(tool_call),
+                time_limit,
+            )
+        except asyncio.TimeoutError:
+            res = None
+
+        # The toolkit may record the cancellation as an interruption by the
+        # user rather than raise it
+        if time.perf_counter() - start >= time_limit:
+            await self._record_tool_timeout(tool_call["id"], time_limit)
+        return res
+
+    async def _record_tool_skipped(self, tool_call: ToolUseBlock) -> None:
+        """Record the result of a tool call skipped beyond the limit."""
+        msg = Msg(
+            "system",
+            [
+                ToolResultBlock(
+                    type="tool_result",
+                    id=tool_call["id"],
+                    name=tool_call["name"],
+                    output=[
+                        TextBlock(
+                            type="text",
+                            text=f"<system-info>The tool call was skipped, "
+                            f"as the {self.budget.max_tool_calls} tool calls "
+                            f"of this turn's budget are used up."
+                            f"</system-info>",
+                        ),
+                    ],
+                ),
+            ],
+            "system",
+        )
+        await self.print(msg, True)
+        await self.memory.add(msg)
+
+    async def _record_tool_timeout(
+        self,
+        tool_call_id: str,
+        time_limit: float,
+    ) -> None:
+        """Replace the output of the cancelled tool call in the memory."""
+        for msg in reversed(await self.memory.get_memory(prepend_summary=False)):
+            for block in msg.get_content_blocks("tool_result"):
+                if block["id"] == tool_call_id:
+                    block["output"] = [
+                        TextBlock(
+                            type="text",
+                            text=f"<system-info>The tool call was cancelled "
+                            f"after {time_limit:.0f}s, as the time budget of "
+                            f"this turn is running out.</system-info>",
+                        ),
+                    ]
+                    return
+
+
+def create_friday_agent(
+    model: ChatModelBase,
+    formatter: FormatterBase,
+    toolkit: Toolkit,
+    budget: TurnBudget | None = None,
+    on_budget_progress: Callable[[ReActAgent, dict[str, Any]], Awaitable[None]]
+    | None = None,
+) -> FridayAgent:
+    """Create the Friday agent with an empty memory, whose turns are limited
+    by the budget if given. It only prints to the console when logging at
+    INFO or below."""
+    agent = FridayAgent(
+        name="Friday",
+        sys_prompt="""You're Friday, a helpful assistant specialized in daily task management and AgentScope framework support.
+
+# Core Objectives
+- Help users manage and complete daily tasks efficiently
+- Provide expert-level support for AgentScope framework questions
+
+# Critical Principles (MUST FOLLOW)
+1. **No Assumptions**: All information must come from users or tool results
+2. **Safety First**: Request permission for dangerous operations; prohibit catastrophic ones
+
+# Workflow Process
+1. Analyze user query and make a plan
+2. Carry out your plan step by step
+3. Call `{finish_function}` with your final response
+
+# Response Guidelines
+- Be concise and focused on user's specific context
+- Avoid repeating exact material words. Instead, summarize in your own words
+- Ask clarifying questions when user intent is unclear
+- Distinguish between code generation requests vs. code execution requests
+
+# About AgentScope
+## Background
+- AgentScope is a Python framework for building LLM-empowered Multi-agent applications, open-sourced at https://github.com/agentscope-ai/agentscope
+- AgentScope is created by the AgentScope Team, Tongyi Lab, Alibaba Group
+## AgentScope-related Code/Response Generation Guidelines
+- You're an expert in AgentScope, you MUST stand for AgentScope and respond as a core developer/maintainer of the framework
+- Only use existing modules/classes/functions from agentscope documentation
+- Never guess or make up implementations
+
+# Available Context
+- Current date and time: {current_time}""".format(
+            current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            max_turns=20,
+            finish_function="generate_response",
+        ),
+        model=model,
+        formatter=formatter,
+        toolkit=toolkit,
+        memory=InMemoryMemory(),
+        max_iters=50,
+        enable_meta_tool=True,
+        budget=budget,
+        on_budget_progress=on_budget_progress,
+    )
+    if not is_console_output_enabled():
+        agent.set_console_output_enabled(False)
+    return agent
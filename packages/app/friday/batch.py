@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""The batch (headless) entry point of Friday, used for evaluation and
+regression runs. It runs the queries and debates listed in a JSONL file
+concurrently against shared model clients, and streams the results with
+their timings to an output JSONL file. Forwarding to the studio is optional.
+
+Each input line is a JSON object of either a query or a debate:
+
+    {"id": "q1", "query": "...", "sessionId": "optional-session"}
+    {"id": "d1", "debate": {"topic": "...", "agents": 3, "rounds": 2,
+                            "judge": "direct", "debater": "direct"}}
+
+where `query` is a string or a list of content blocks. The items with the
+same `sessionId` run one after another and continue the saved session.
+
+Each output line reports the item in the completion order:
+
+    {"id": "q1", "mode": "query", "status": "ok", "reply": {...},
+     "usage": {...}, "startedAt": "...", "duration": 1.23}
+
+with `result` (including its usage) instead of `reply` and `usage` for
+debates, and `status` being "error" together with the `error` message if
+the item failed. A line that isn't a valid JSON object is reported as a
+failed item, numbered by its line, without stopping the batch.
+
+Usage (from the friday directory):
+
+    python batch.py --input queries.jsonl --output results.jsonl \
+        --llmProvider openai --modelName gpt-4o --apiKey ... \
+        --concurrency 8 --requestsPerMinute 300
+
+With `--memoryProfile memory.jsonl`, a memory snapshot is appended after
+every item and debate round, to spot the growth of a long batch.
+"""
+import asyncio
+import json
+import os
+import time
+from argparse import Namespace
+from datetime import datetime
+from typing import Any
+
+from agentscope.agent import ReActAgent
+from agentscope.message import Msg
+
+from args import get_batch_args
+from assistant import create_friday_agent, create_toolkit
+from debate import DebateOrchestrator, DebateConfig
+from hook import (
+    studio_pre_print_hook,
+    studio_post_reply_hook,
+    push_budget_progress,
+    push_debate_event,
+)
+from model import get_model, get_formatter
+from utils.blob_store import BlobStore
+from utils.budget import TurnBudget
+from utils.common import get_local_file_path
+from utils.connect import StudioConnect
+from utils.image_compaction import ImageCompactor
+from utils.image_converter import ImageConverter
+from utils.log import logger, setup_logging
+from utils.memory_profile import (
+    record_memory,
+    start_memory_profiling,
+    stop_memory_profiling,
+)
+from utils.query import load_query
+from utils.serializer import get_serializer
+from utils.session import SessionManager
+from utils.usage import UsageTracker, usage_scope
+
+
+def _read_items(path: str, blob_store: BlobStore) -> list[dict[str, Any]]:
+    """Read the batch items from the JSONL file, skipping the blank lines.
+    The items without an `id` are numbered by their line, and their large
+    base64 images are moved into the blob store. A line that isn't a JSON
+    object is kept as an item with its `error`, so that it's reported as
+    failed."""
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = load_query(line, blob_store=blob_store)
+            except ValueError as e:
+                item = {"error": f"Line {line_no} isn't valid JSON: {e}"}
+            if not isinstance(item, dict):
+                item = {
+                    "error": f"Line {line_no} isn't a JSON object but "
+                    f"{type(item).__name__}",
+                }
+            item.setdefault("id", str(line_no))
+            items.append(item)
+    return items
+
+
+def _get_debate_config(
+    debate: dict[str, Any],
+    args: Namespace,
+) -> DebateConfig:
+    """The config of a debate item, whose number of agents and rounds
+    default to the arguments and are bounded the same way as theirs."""
+    if not isinstance(debate, dict):
+        raise ValueError("debate must be a JSON object")
+    num_agents = debate.get("agents", args.debateAgents)
+    max_rounds = debate.get("rounds", args.debateRounds)
+    if not isinstance(num_agents, int) or not 2 <= num_agents <= 5:
+        raise ValueError("debate.agents must be between 2 and 5")
+    if not isinstance(max_rounds, int) or not 1 <= max_rounds <= 10:
+        raise ValueError("debate.rounds must be between 1 and 10")
+    return DebateConfig(
+        num_agents=num_agents,
+        max_rounds=max_rounds,
+        topic=debate["topic"],
+        judge_mode=debate.get("judge", "direct"),
+        debater_mode=debate.get("debater", "direct"),
+    )
+
+
+class BatchRunner:
+    """Run the batch items with a bounded concurrency. The model clients and
+    the sessions are shared by all the items, while each item gets its own
+    agents."""
+
+    def __init__(
+        self,
+        args: Any,
+        socket: StudioConnect | None = None,
+    ) -> None:
+        """Initialize the batch runner.
+
+        Args:
+            args (`Any`):
+                The parsed batch arguments, see `get_batch_args`.
+            socket (`StudioConnect | None`, optional):
+                The connection to the studio, if the messages are forwarded.
+        """
+        self.args = args
+        self.socket = socket
+
+        # The requests of all the items share the rate limiter of the model,
+        # and the ones with images go to the vision model if given
+        self.model = get_model(
+            args.llmProvider,
+            args.modelName,
+            args.apiKey,
+            args.baseUrl,
+            args.requestsPerMinute,
+            args.tokensPerMinute,
+            args.visionModelName,
+        )
+        self.formatter = get_formatter(args.llmProvider)
+
+        # The captions of the compacted images are cached across the items
+        self.image_compactor = None
+        if args.compactImagesAfterTurns is not None:
+            self.image_compactor = ImageCompactor(
+                self.model,
+                self.formatter,
+                keep_turns=args.compactImagesAfterTurns,
+            )
+
+        self.image_converter = ImageConverter(
+            BlobStore(get_local_file_path("blobs")),
+        )
+        self.sessions = SessionManager(
+            save_dir=args.sessionDir or get_local_file_path(""),
+            serializer=get_serializer(args.serializer),
+        )
+
+        # The items of the same session mustn't run concurrently
+        self._session_locks: dict[str, asyncio.Lock] = {}
+        self._output_lock = asyncio.Lock()
+
+    async def run_query(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Run a query item with a fresh Friday agent, continuing the
+        session if the item has a `sessionId`."""
+        content = self.image_converter.convert_content_blocks(item["query"])
+
+        agent = create_friday_agent(
+            self.model,
+            self.formatter,
+            create_toolkit(
+                self.args.writePermission,
+                compact_images=self.image_compactor is not None,
+            ),
+            budget=TurnBudget(
+                max_seconds=self.args.maxTurnSeconds,
+                max_tokens=self.args.maxTurnTokens,
+                max_tool_calls=self.args.maxToolCalls,
+                reserve=self.args.budgetReserve,
+            ),
+            on_budget_progress=(
+                push_budget_progress if self.socket is not None else None
+            ),
+        )
+
+        usage = UsageTracker()
+        session_id = item.get("sessionId")
+        if session_id is None:
+            reply = await self._reply(agent, content, usage)
+        else:
+            lock = self._session_locks.setdefault(session_id, asyncio.Lock())
+            async with lock:
+                await self.sessions.load(session_id, agent)
+                turn = len(await self.sessions.get_usage(session_id)) + 1
+                reply = await self._reply(agent, content, usage, turn=turn)
+                if self.image_compactor is not None:
+                    with usage_scope(usage, agent=agent.name, turn=turn):
+                        await self.image_compactor.compact(agent.memory)
+                await self.sessions.save(
+                    session_id, agent, usage=usage.summary(),
+                )
+
+        return {"reply": reply.to_dict(), "usage": usage.summary()}
+
+    async def _reply(
+        self,
+        agent: ReActAgent,
+        content: Any,
+        usage: UsageTracker,
+        **labels: Any,
+    ) -> Msg:
+        """Let the agent reply, being interruptible from the studio."""
+        if self.socket is not None:
+            self.socket.targets.append(agent)
+        try:
+            with usage_scope(usage, agent=agent.name, **labels):
+                return await agent(Msg("user", content, "user"))
+        finally:
+            if self.socket is not None:
+                self.socket.targets.remove(agent)
+
+    async def run_debate(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Run a debate item with a fresh orchestrator."""
+        config = _get_debate_config(item["debate"], self.args)
+        orchestrator = DebateOrchestrator(
+            config=config,
+            model=self.model,
+            formatter=self.formatter,
+            toolkit=None,
+            studio_url=self.args.studio_url,
+            on_event=push_debate_event if self.socket is not None else None,
+        )
+
+        if self.socket is not None:
+            self.socket.targets.append(orchestrator)
+        try:
+            result = await orchestrator.run_debate(config.topic)
+        finally:
+            if self.socket is not None:
+                self.socket.targets.remove(orchestrator)
+
+        return {"result": result}
+
+    async def run_item(self, item: dict[str, Any]) -> dict[str, Any]:
+        """Run one item and report its outcome and timing. A failed item is
+        reported instead of stopping the batch."""
+        mode = "debate" if "debate" in item else "query"
+        record = {
+            "id": item["id"],
+            "mode": mode,
+            "startedAt": datetime.now().isoformat(timespec="milliseconds"),
+        }
+
+        start = time.perf_counter()
+        try:
+            if "error" in item:
+                raise ValueError(item["error"])
+            if mode == "debate":
+                record.update(await self.run_debate(item))
+            else:
+                record.update(await self.run_query(item))
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            logger.exception("Item %s failed.", item["id"])
+        record["duration"] = time.perf_counter() - start
+        record_memory("turn", item=item["id"], mode=mode)
+
+        return record
+
+    async def run(self, items: list[dict[str, Any]], output: str) -> list[dict]:
+        """Run all the items and stream the records to the output file.
+
+        Args:
+            items (`list[dict[str, Any]]`):
+                The batch items.
+            output (`str`):
+                The path of the output JSONL file.
+
+        Returns:
+            `list[dict]`:
+                The records in the completion order.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+
+        records = []
+        with open(output, "w", encoding="utf-8") as f:
+
+            async def worker() -> None:
+                while not queue.empty():
+                    record = await self.run_item(queue.get_nowait())
+                    async with self._output_lock:
+                        records.append(record)
+                        f.write(
+                            json.dumps(record, ensure_ascii=False, default=str)
+                            + "\n",
+                        )
+                        f.flush()
+                    logger.info(
+                        "[%d/%d] %s: %s in %.2fs",
+                        len(records),
+                        len(items),
+                        record["id"],
+                        record["status"],
+                        record["duration"],
+                    )
+
+            n_workers = min(self.args.concurrency, len(items))
+            await asyncio.gather(*[worker() for _ in range(n_workers)])
+
+        return records
+
+
+async def main():
+    args = get_batch_args()
+    setup_logging(args.logLevel, args.logFile)
+
+    # The agents' outputs interleave in the console, so only the progress
+    # is logged
+    os.environ["AGENTSCOPE_DISABLE_CONSOLE_OUTPUT"] = "true"
+
+    if args.memoryProfile:
+        start_memory_profiling(args.memoryProfile)
+
+    socket = None
+    if args.studio_url:
+        studio_pre_print_hook.url = args.studio_url
+        socket = StudioConnect(
+            url=args.studio_url,
+            serializer=get_serializer(args.serializer),
+        )
+        socket.start()
+        studio_pre_print_hook.channel = socket
+
+        ReActAgent.register_class_hook(
+            "pre_print",
+            "studio_pre_print_hook",
+            studio_pre_print_hook
+        )
+        ReActAgent.register_class_hook(
+            "post_reply",
+            "studio_post_reply_hook",
+            studio_post_reply_hook
+        )
+
+    runner = BatchRunner(args, socket=socket)
+    studio_pre_print_hook.image_converter = runner.image_converter
+    items = _read_items(args.input, runner.image_converter.blob_store)
+
+    start = time.perf_counter()
+    try:
+        records = await runner.run(items, args.output)
+    finally:
+        runner.image_converter.cleanup()
+        if socket is not None:
+            await socket.disconnect()
+        stop_memory_profiling()
+
+    n_ok = sum(record["status"] == "ok" for record in records)
+    logger.info(
+        "Finished %d/%d item(s) in %.2fs, results in %s",
+        n_ok,
+        len(items),
+        time.perf_counter() - start,
+        args.output,
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
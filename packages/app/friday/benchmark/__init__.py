@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for Friday that run against local stand-ins instead of real
+LLM providers and a real studio server.
+
+Run the benchmarks from the `friday` directory, e.g.
+`python -m benchmark.debate_bench`.
+"""
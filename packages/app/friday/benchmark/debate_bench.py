@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the debate runner with the local fake model and studio stub.
+
+The fake model answers a ReAct debater without tools in text, i.e. in one
+call per speech like the direct debater, so both debater modes take the
+same model calls and prompt tokens here. They differ in the messages posted
+to the studio and the size of the checkpoint.
+
+Example:
+    python -m benchmark.debate_bench --agents 2 3 5 --rounds 1 3 10 \
+        --token-latency 0.002 --output debate_bench.json
+"""
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any, Callable
+
+from agentscope.formatter import OpenAIChatFormatter
+
+from debate import DebateConfig, DebateOrchestrator
+from hook import push_debate_event, studio_pre_print_hook
+from utils.connect import StudioConnect
+from benchmark.fake_model import FakeChatModel, ScriptedJudge
+from benchmark.studio_stub import StudioStub
+
+
+def _build_serial(
+    config: DebateConfig,
+    model: FakeChatModel,
+    studio_url: str,
+) -> DebateOrchestrator:
+    """The default orchestrator, where debaters speak one after another."""
+    return DebateOrchestrator(
+        config=config,
+        model=model,
+        formatter=OpenAIChatFormatter(),
+        studio_url=studio_url,
+    )
+
+
+def _build_private_memory(
+    config: DebateConfig,
+    model: FakeChatModel,
+    studio_url: str,
+) -> DebateOrchestrator:
+    """The serial orchestrator where each participant keeps its own copy of
+    every message, instead of a view into the shared message log."""
+    return DebateOrchestrator(
+        config=config,
+        model=model,
+        formatter=OpenAIChatFormatter(),
+        studio_url=studio_url,
+        shared_memory=False,
+    )
+
+
+# The debate strategies to compare, new strategies should be registered here
+STRATEGIES: dict[str, Callable[..., DebateOrchestrator]] = {
+    "serial": _build_serial,
+    "private-memory": _build_private_memory,
+}
+
+
+async def _get_stored_msgs(orchestrator: DebateOrchestrator) -> int:
+    """The number of the message objects kept by the participants' memories,
+    counting a message shared by several memories once."""
+    stored = set()
+    for agent in orchestrator.agents:
+        for msg in await agent.memory.get_memory(prepend_summary=False):
+            stored.add(id(msg))
+    return len(stored)
+
+
+async def run_case(
+    strategy: str,
+    judge_mode: str,
+    debater_mode: str,
+    num_agents: int,
+    max_rounds: int,
+    args: Namespace,
+    stub: StudioStub,
+) -> dict[str, Any]:
+    """Run one debate and collect its metrics."""
+    model = FakeChatModel(
+        token_latency=args.token_latency,
+        first_token_latency=args.first_token_latency,
+        reply_tokens=args.reply_tokens,
+        judge=ScriptedJudge(finish_at=args.finish_at),
+    )
+    config = DebateConfig(
+        num_agents=num_agents,
+        max_rounds=max_rounds,
+        topic="Benchmark topic",
+        judge_mode=judge_mode,
+        debater_mode=debater_mode,
+    )
+    orchestrator = STRATEGIES[strategy](config, model, stub.url)
+    orchestrator.on_event = push_debate_event
+
+    stop_after = (
+        (args.interrupt_after, "interrupt")
+        if args.interrupt_after is not None
+        else (args.accept_after, "acceptDebate")
+    )
+
+    socket = None
+    if args.transport == "socket" or stop_after[0] is not None:
+        socket = StudioConnect(url=stub.url, targets=[orchestrator])
+        await socket.connect()
+    studio_pre_print_hook.channel = (
+        socket if args.transport == "socket" else None
+    )
+
+    async def _stop_later() -> None:
+        await asyncio.sleep(stop_after[0])
+        await asyncio.to_thread(stub.emit, stop_after[1])
+
+    stub.reset()
+    start = time.perf_counter()
+    # Drop the console output of the agents and the orchestrator
+    with contextlib.redirect_stdout(io.StringIO()):
+        if stop_after[0] is not None:
+            stop_task = asyncio.create_task(_stop_later())
+        result = await orchestrator.run_debate(config.topic)
+        wall_time = time.perf_counter() - start
+
+        if stop_after[0] is not None:
+            stop_task.cancel()
+        if socket is not None:
+            await socket.disconnect()
+
+    stored_msgs = await _get_stored_msgs(orchestrator)
+    start = time.perf_counter()
+    checkpoint = json.dumps(
+        orchestrator.state_dict(), ensure_ascii=False, default=str,
+    )
+    checkpoint_ms = (time.perf_counter() - start) * 1000
+
+    prompt_tokens = [_["prompt_tokens"] for _ in model.calls]
+    judge_calls = [_ for _ in model.calls if _.get("agent") == "Moderator"]
+    n_judgments = len({_["round"] for _ in judge_calls})
+    return {
+        "strategy": strategy,
+        "judge": judge_mode,
+        "debater": debater_mode,
+        "num_agents": num_agents,
+        "max_rounds": max_rounds,
+        "total_rounds": result["total_rounds"],
+        "accepted": result.get("accepted", False),
+        "wall_time": round(wall_time, 4),
+        "model_calls": len(model.calls),
+        "judge_calls": len(judge_calls),
+        "calls_per_judgment": (
+            round(len(judge_calls) / n_judgments, 2) if n_judgments else "-"
+        ),
+        "prompt_tokens_mean": round(sum(prompt_tokens) / len(prompt_tokens), 1),
+        "prompt_tokens_max": max(prompt_tokens),
+        "prompt_tokens_total": sum(prompt_tokens),
+        "stored_msgs": stored_msgs,
+        "checkpoint_kb": round(len(checkpoint.encode("utf-8")) / 1024, 1),
+        "checkpoint_ms": round(checkpoint_ms, 2),
+        "message_posts": stub.counts["pushMessageToFridayApp"],
+        "finished_posts": stub.counts["pushFinishedSignalToFridayApp"],
+        "debate_events": stub.counts["pushDebateEventToFridayApp"],
+        "interrupt_latency_ms": (
+            round(socket.last_interrupt_latency * 1000, 1)
+            if socket is not None and socket.last_interrupt_latency is not None
+            else "-"
+        ),
+    }
+
+
+def _print_table(results: list[dict]) -> None:
+    """Print the results as a plain text table."""
+    columns = [
+        "strategy",
+        "judge",
+        "debater",
+        "num_agents",
+        "max_rounds",
+        "total_rounds",
+        "accepted",
+        "wall_time",
+        "model_calls",
+        "calls_per_judgment",
+        "prompt_tokens_mean",
+        "prompt_tokens_max",
+        "stored_msgs",
+        "checkpoint_kb",
+        "checkpoint_ms",
+        "message_posts",
+        "finished_posts",
+        "debate_events",
+        "interrupt_latency_ms",
+    ]
+    widths = [
+        max(len(col), *(len(str(_[col])) for _ in results)) for col in columns
+    ]
+    print("  ".join(col.rjust(w) for col, w in zip(columns, widths)))
+    for result in results:
+        print(
+            "  ".join(str(result[col]).rjust(w) for col, w in zip(columns, widths)),
+        )
+
+
+def get_bench_args() -> Namespace:
+    """Get the command line arguments for the debate benchmark."""
+    parser = ArgumentParser(description="Benchmark the debate runner")
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=list(STRATEGIES),
+        default=list(STRATEGIES),
+    )
+    parser.add_argument(
+        "--judges",
+        nargs="+",
+        choices=["direct", "react"],
+        default=["direct", "react"],
+        help="The judge modes, one direct structured call or a ReAct agent",
+    )
+    parser.add_argument(
+        "--debaters",
+        nargs="+",
+        choices=["direct", "react"],
+        default=["direct", "react"],
+        help="The debater modes, one streamed call per speech or ReAct agents",
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["socket", "http"],
+        default="socket",
+        help="How the hooks push the messages to the studio stub",
+    )
+    parser.add_argument("--agents", nargs="+", type=int, default=[2, 3, 5])
+    parser.add_argument("--rounds", nargs="+", type=int, default=[1, 3, 10])
+    parser.add_argument(
+        "--token-latency",
+        type=float,
+        default=0.0,
+        help="Simulated seconds per output token",
+    )
+    parser.add_argument(
+        "--first-token-latency",
+        type=float,
+        default=0.0,
+        help="Simulated seconds to the first token",
+    )
+    parser.add_argument("--reply-tokens", type=int, default=50)
+    parser.add_argument(
+        "--finish-at",
+        type=int,
+        default=None,
+        help="The judgment that finishes the debate (never if not given)",
+    )
+    parser.add_argument(
+        "--interrupt-after",
+        type=float,
+        default=None,
+        help="Send an interrupt from the studio stub after the given seconds "
+        "and measure the interrupt-to-stop latency",
+    )
+    parser.add_argument(
+        "--accept-after",
+        type=float,
+        default=None,
+        help="Accept the judge's best answer from the studio stub after the "
+        "given seconds, stopping the debate early",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to write the results as JSON",
+    )
+    args = parser.parse_args()
+
+    if any(not 2 <= _ <= 5 for _ in args.agents):
+        parser.error("agents must be between 2 and 5")
+    if any(not 1 <= _ <= 10 for _ in args.rounds):
+        parser.error("rounds must be between 1 and 10")
+    if args.interrupt_after is not None and args.accept_after is not None:
+        parser.error("--interrupt-after and --accept-after are exclusive")
+
+    return args
+
+
+async def main() -> None:
+    args = get_bench_args()
+
+    results = []
+    with StudioStub() as stub:
+        studio_pre_print_hook.url = stub.url
+        for case in itertools.product(
+            args.strategies,
+            args.judges,
+            args.debaters,
+            args.agents,
+            args.rounds,
+        ):
+            results.append(await run_case(*case, args, stub))
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""A deterministic local stand-in for the chat models used by Friday."""
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator, Optional, Type
+
+from agentscope.message import TextBlock, ToolUseBlock
+from agentscope.model import ChatModelBase, ChatResponse
+from agentscope.model._model_usage import ChatUsage
+from pydantic import BaseModel
+
+from utils.usage import get_usage_labels
+
+
+def estimate_tokens(messages: Any) -> int:
+    """Roughly estimate the number of tokens in the given formatted messages
+    (about four characters per token)."""
+    return len(json.dumps(messages, ensure_ascii=False)) // 4 + 1
+
+
+class ScriptedJudge:
+    """The scripted outputs of the judge, one per judgment.
+
+    The judge says "not finished" until `finish_at` judgments have been
+    made, and then finishes with a fixed conclusion. If `finish_at` is
+    `None`, the judge never finishes on its own.
+    """
+
+    def __init__(self, finish_at: Optional[int] = None) -> None:
+        """Initialize the scripted judge.
+
+        Args:
+            finish_at (`Optional[int]`, defaults to `None`):
+                The index (1-based) of the judgment that finishes the debate.
+        """
+        self.finish_at = finish_at
+        self.n_judgments = 0
+
+    def next_output(self) -> dict:
+        """Return the next scripted judgment as the `JudgeModel` fields."""
+        self.n_judgments += 1
+        finished = (
+            self.finish_at is not None and self.n_judgments >= self.finish_at
+        )
+        return {
+            "finished": finished,
+            "correct_answer": (
+                f"Scripted conclusion after {self.n_judgments} judgments"
+                if finished
+                else None
+            ),
+            "best_answer": (
+                f"Scripted best answer after {self.n_judgments} judgments"
+            ),
+            "reasoning": f"Scripted reasoning #{self.n_judgments}",
+        }
+
+
+class FakeChatModel(ChatModelBase):
+    """A chat model that generates deterministic responses locally with a
+    configurable per-token latency, and records every call it receives.
+
+    Calls that require the `generate_response` tool or a structured model
+    are answered by the scripted judge, the others with a fixed text reply.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "fake-model",
+        stream: bool = True,
+        token_latency: float = 0.0,
+        first_token_latency: float = 0.0,
+        reply_tokens: int = 50,
+        tokens_per_chunk: int = 5,
+        judge: Optional[ScriptedJudge] = None,
+    ) -> None:
+        """Initialize the fake chat model.
+
+        Args:
+            model_name (`str`, defaults to `"fake-model"`):
+                The model name.
+            stream (`bool`, defaults to `True`):
+                Whether to stream the output.
+            token_latency (`float`, defaults to `0.0`):
+                The simulated generation time per output token in seconds.
+            first_token_latency (`float`, defaults to `0.0`):
+                The simulated time to the first token in seconds.
+            reply_tokens (`int`, defaults to `50`):
+                The number of tokens in each text reply.
+            tokens_per_chunk (`int`, defaults to `5`):
+                The number of tokens in each streamed chunk.
+            judge (`Optional[ScriptedJudge]`, defaults to `None`):
+                The scripted judge outputs, a judge that never finishes is
+                used if not given.
+        """
+        super().__init__(model_name=model_name, stream=stream)
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.reply_tokens = reply_tokens
+        self.tokens_per_chunk = max(1, tokens_per_chunk)
+        self.judge = judge or ScriptedJudge()
+
+        self.calls: list[dict] = []
+
+    async def __call__(
+        self,
+        messages: list[dict],
+        tools: Optional[list[dict]] = None,
+        tool_choice: Optional[str] = None,
+        structured_model: Optional[Type[BaseModel]] = None,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        """Generate a deterministic response for the given messages."""
+        tool_names = [_["function"]["name"] for _ in tools or []]
+        prompt_tokens = estimate_tokens(messages)
+        self.calls.append(
+            {
+                "prompt_tokens": prompt_tokens,
+                "n_messages": len(messages),
+                "tools": tool_names,
+                "tool_choice": tool_choice,
+                "structured": structured_model is not None,
+                # The calling agent and the debate round, if labelled
+                **get_usage_labels(),
+            },
+        )
+
+        metadata = None
+        if structured_model is not None:
+            metadata = self.judge.next_output()
+            blocks = [TextBlock(type="text", text=json.dumps(metadata))]
+        elif "generate_response" in tool_names and tool_choice != "none":
+            blocks = [
+                ToolUseBlock(
+                    type="tool_use",
+                    id=f"call_{len(self.calls)}",
+                    name="generate_response",
+                    input=self.judge.next_output(),
+                ),
+            ]
+        else:
+            blocks = [
+                TextBlock(
+                    type="text",
+                    text=" ".join(
+                        f"word{i}" for i in range(self.reply_tokens)
+                    ),
+                ),
+            ]
+
+        n_output_tokens = estimate_tokens(blocks)
+        if self.stream:
+            return self._stream(blocks, metadata, prompt_tokens)
+
+        start = time.monotonic()
+        await asyncio.sleep(
+            self.first_token_latency + self.token_latency * n_output_tokens,
+        )
+        return ChatResponse(
+            content=blocks,
+            metadata=metadata,
+            usage=ChatUsage(
+                input_tokens=prompt_tokens,
+                output_tokens=n_output_tokens,
+                time=time.monotonic() - start,
+            ),
+        )
+
+    async def _stream(
+        self,
+        blocks: list,
+        metadata: Optional[dict],
+        prompt_tokens: int,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Stream the accumulated content chunk by chunk, the same way as the
+        real streaming models do."""
+        start = time.monotonic()
+        await asyncio.sleep(self.first_token_latency)
+
+        text_blocks = [_ for _ in blocks if _["type"] == "text"]
+        if not text_blocks:
+            # Tool calls are yielded at once after the simulated latency
+            n_tokens = estimate_tokens(blocks)
+            await asyncio.sleep(self.token_latency * n_tokens)
+            yield ChatResponse(
+                content=blocks,
+                metadata=metadata,
+                usage=ChatUsage(
+                    input_tokens=prompt_tokens,
+                    output_tokens=n_tokens,
+                    time=time.monotonic() - start,
+                ),
+            )
+            return
+
+        words = text_blocks[0]["text"].split(" ")
+        for end in range(
+            self.tokens_per_chunk,
+            len(words) + self.tokens_per_chunk,
+            self.tokens_per_chunk,
+        ):
+            end = min(end, len(words))
+            await asyncio.sleep(self.token_latency * self.tokens_per_chunk)
+            yield ChatResponse(
+                content=[TextBlock(type="text", text=" ".join(words[:end]))],
+                metadata=metadata if end == len(words) else None,
+                usage=ChatUsage(
+                    input_tokens=prompt_tokens,
+                    output_tokens=end,
+                    time=time.monotonic() - start,
+                ),
+            )
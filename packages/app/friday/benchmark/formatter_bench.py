@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the caching chat formatters against the AgentScope ones over
+the reasoning iterations of a turn.
+
+The memory starts with the earlier turns of a session, some of them with
+images in the blob store, and each iteration appends a tool call and its
+result, then formats the system prompt and the whole memory as the ReAct
+agent does. The formatted prompts of both formatters are checked to be the
+same.
+
+Example:
+    python -m benchmark.formatter_bench --providers openai dashscope \
+        --turns 20 --images 4 --image-mb 1 --iterations 20 \
+        --output formatter_bench.json
+"""
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any
+
+from agentscope.formatter import (
+    AnthropicChatFormatter,
+    DashScopeChatFormatter,
+    FormatterBase,
+    GeminiChatFormatter,
+    OllamaChatFormatter,
+    OpenAIChatFormatter,
+)
+from agentscope.message import (
+    ImageBlock,
+    Msg,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+)
+
+from benchmark.metrics import percentile
+from model import get_formatter
+from utils.blob_store import BlobStore
+
+_FORMATTERS: dict[str, type[FormatterBase]] = {
+    "dashscope": DashScopeChatFormatter,
+    "openai": OpenAIChatFormatter,
+    "ollama": OllamaChatFormatter,
+    "gemini": GeminiChatFormatter,
+    "anthropic": AnthropicChatFormatter,
+}
+
+# A minimal PNG header, so that the blobs are stored and read as images
+_PNG_HEADER = bytes.fromhex("89504e470d0a1a0a")
+
+
+def _build_history(args: Namespace, blob_store: BlobStore) -> list[Msg]:
+    """The earlier turns, with an image in each of the first `images`
+    turns."""
+    msgs = []
+    for turn in range(args.turns):
+        content = [
+            TextBlock(type="text", text=f"Question {turn}: " + "word " * 50),
+        ]
+        if turn < args.images:
+            path = blob_store.put_base64(
+                base64.b64encode(
+                    _PNG_HEADER + os.urandom(int(args.image_mb * 1024 * 1024)),
+                ),
+            )
+            content.append(
+                ImageBlock(type="image", source={"type": "url", "url": path}),
+            )
+        msgs.append(Msg("user", content, "user"))
+        msgs.append(Msg("Friday", "Answer " + "word " * 100, "assistant"))
+    return msgs
+
+
+def _tool_step(i: int) -> list[Msg]:
+    """The tool call of an iteration and its result."""
+    return [
+        Msg(
+            "Friday",
+            [
+                ToolUseBlock(
+                    type="tool_use",
+                    id=f"call_{i}",
+                    name="execute_shell_command",
+                    input={"command": f"ls -l examples/{i}"},
+                ),
+            ],
+            "assistant",
+        ),
+        Msg(
+            "system",
+            [
+                ToolResultBlock(
+                    type="tool_result",
+                    id=f"call_{i}",
+                    name="execute_shell_command",
+                    output=[
+                        TextBlock(type="text", text="file.py\n" * 50),
+                    ],
+                ),
+            ],
+            "system",
+        ),
+    ]
+
+
+async def run_provider(
+    provider: str,
+    history: list[Msg],
+    args: Namespace,
+) -> dict[str, Any]:
+    """Format the iterations of a turn with both formatters."""
+    plain, cached = _FORMATTERS[provider](), get_formatter(provider)
+    memory = list(history)
+    times: dict[str, list[float]] = {"plain": [], "cached": []}
+    for i in range(args.iterations):
+        memory.extend(_tool_step(i))
+        prompts = {}
+        for name, formatter in (("plain", plain), ("cached", cached)):
+            # The system prompt is created for each iteration, as ReActAgent
+            # does
+            msgs = [Msg("system", "You're Friday. " * 200, "system"), *memory]
+            start = time.perf_counter()
+            prompts[name] = await formatter.format(msgs)
+            times[name].append(time.perf_counter() - start)
+        assert prompts["plain"] == prompts["cached"], provider
+
+    def _ms(values: list[float], p: float) -> float:
+        return round(percentile(values, p) * 1000, 2)
+
+    return {
+        "provider": provider,
+        "messages": len(memory) + 1,
+        "plain_first_ms": round(times["plain"][0] * 1000, 2),
+        "cached_first_ms": round(times["cached"][0] * 1000, 2),
+        "plain_p50_ms": _ms(times["plain"][1:] or times["plain"], 50),
+        "cached_p50_ms": _ms(times["cached"][1:] or times["cached"], 50),
+        "plain_total_ms": round(sum(times["plain"]) * 1000, 1),
+        "cached_total_ms": round(sum(times["cached"]) * 1000, 1),
+        "hit_rate": round(
+            cached.n_hits / max(1, cached.n_hits + cached.n_misses), 3,
+        ),
+    }
+
+
+def _print_table(results: list[dict]) -> None:
+    """Print the results as a plain text table."""
+    columns = list(results[0])
+    widths = [
+        max(len(col), *(len(str(_[col])) for _ in results)) for col in columns
+    ]
+    print("  ".join(col.rjust(w) for col, w in zip(columns, widths)))
+    for result in results:
+        print(
+            "  ".join(str(result[col]).rjust(w) for col, w in zip(columns, widths)),
+        )
+
+
+def get_bench_args() -> Namespace:
+    """Get the command line arguments for the formatter benchmark."""
+    parser = ArgumentParser(description="Benchmark the caching formatters")
+    parser.add_argument(
+        "--providers",
+        nargs="+",
+        choices=list(_FORMATTERS),
+        default=list(_FORMATTERS),
+    )
+    parser.add_argument(
+        "--turns",
+        type=int,
+        default=20,
+        help="The number of the earlier turns in the memory",
+    )
+    parser.add_argument(
+        "--images",
+        type=int,
+        default=4,
+        help="The number of the earlier turns with an image",
+    )
+    parser.add_argument("--image-mb", type=float, default=1.0)
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="The number of the reasoning iterations of the turn",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to write the results as JSON",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = get_bench_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history = _build_history(args, BlobStore(tmp_dir))
+        results = [
+            await run_provider(provider, history, args)
+            for provider in args.providers
+        ]
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
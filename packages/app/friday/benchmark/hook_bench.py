@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmark the studio forwarding hooks against the local studio
+stub.
+
+The hooks are invoked the same way as the agent does while streaming: the
+`pre_print` hook is called with a deep copy of the accumulated message for
+every chunk, and the `post_reply` hook once the reply is finished. The data
+is pushed over the socket.io channel or, with `--transport http`, over the
+tRPC endpoints.
+
+With `--images blob`, the images are pushed once as binary blobs and
+referred to by the messages (see `ImageConverter.to_references`), instead of
+being inlined as base64 into every chunk.
+
+Example:
+    python -m benchmark.hook_bench --scenarios text image \
+        --images inline blob --text-tokens 2000 --image-mb 4 \
+        --output hook_bench.json
+"""
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from copy import deepcopy
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator
+
+from agentscope._utils._common import _execute_async_or_sync_func
+from agentscope.message import ImageBlock, Msg, TextBlock
+
+from hook import studio_pre_print_hook, studio_post_reply_hook
+from utils.blob_store import BlobStore
+from utils.image_converter import ImageConverter
+from utils.connect import StudioConnect
+from benchmark.metrics import LoopBlockMonitor, percentile
+from benchmark.studio_stub import StudioStub
+
+
+def _stream_text(n_tokens: int, tokens_per_chunk: int) -> Iterator[Msg]:
+    """Stream a long text reply, yielding the accumulated message."""
+    msg = Msg("Friday", [], "assistant")
+    words = []
+    for i in range(n_tokens):
+        words.append(f"token{i}")
+        if len(words) % tokens_per_chunk == 0 or i == n_tokens - 1:
+            msg.content = [TextBlock(type="text", text=" ".join(words))]
+            yield msg
+
+
+def _stream_image(
+    image_mb: float,
+    n_chunks: int,
+    tokens_per_chunk: int,
+) -> Iterator[Msg]:
+    """Stream a reply that carries a large base64 image block next to the
+    growing text."""
+    data = base64.b64encode(os.urandom(int(image_mb * 1024 * 1024))).decode()
+    image = ImageBlock(
+        type="image",
+        source={"type": "base64", "media_type": "image/png", "data": data},
+    )
+    msg = Msg("Friday", [], "assistant")
+    words = []
+    for i in range(n_chunks):
+        words.extend(f"token{i}_{j}" for j in range(tokens_per_chunk))
+        msg.content = [image, TextBlock(type="text", text=" ".join(words))]
+        yield msg
+
+
+async def _call_hook(hook: Callable, agent: Any, *args: Any) -> None:
+    """Call a hook like the agent does, copying its arguments first."""
+    await _execute_async_or_sync_func(hook, agent, *deepcopy(args))
+
+
+async def run_scenario(
+    name: str,
+    chunks: Iterator[Msg],
+    stub: StudioStub,
+) -> dict[str, Any]:
+    """Forward the streamed chunks through the hooks and collect the
+    metrics."""
+    agent = SimpleNamespace(name="Friday", _reply_id=f"bench-{name}")
+    latencies = []
+
+    stub.reset()
+    async with LoopBlockMonitor() as monitor:
+        start = time.perf_counter()
+        for msg in chunks:
+            chunk_start = time.perf_counter()
+            await _call_hook(studio_pre_print_hook, agent, {"msg": msg})
+            latencies.append(time.perf_counter() - chunk_start)
+            # Yield to the event loop as the model stream does between chunks
+            await asyncio.sleep(0)
+
+        await _call_hook(studio_post_reply_hook, agent, {}, None)
+        # Wait for the studio to receive all the pushed data
+        if studio_pre_print_hook.channel is not None:
+            await studio_pre_print_hook.channel._flush()
+        total_time = time.perf_counter() - start
+
+    # Let the stub record the in-flight requests
+    await asyncio.sleep(0.05)
+
+    return {
+        "scenario": name,
+        "chunks": len(latencies),
+        "total_time": round(total_time, 4),
+        "chunks_per_sec": round(len(latencies) / total_time, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "bytes_on_wire": sum(stub.bytes_received.values()),
+        "requests": sum(stub.counts.values()),
+        "loop_blocked_ms": round(monitor.blocked_time * 1000, 1),
+        "loop_max_block_ms": round(monitor.max_block * 1000, 1),
+    }
+
+
+def get_bench_args() -> Namespace:
+    """Get the command line arguments for the hook benchmark."""
+    parser = ArgumentParser(description="Benchmark the studio hooks")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=["text", "image"],
+        default=["text", "image"],
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["socket", "http"],
+        default="socket",
+    )
+    parser.add_argument("--text-tokens", type=int, default=2000)
+    parser.add_argument("--tokens-per-chunk", type=int, default=5)
+    parser.add_argument(
+        "--images",
+        nargs="+",
+        choices=["inline", "blob"],
+        default=["inline", "blob"],
+        help="How the images are pushed in the image scenario",
+    )
+    parser.add_argument("--image-mb", type=float, default=2.0)
+    parser.add_argument("--image-chunks", type=int, default=20)
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to write the results as JSON",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = get_bench_args()
+
+    results = []
+    with StudioStub() as stub:
+        studio_pre_print_hook.url = stub.url
+
+        # Keep the realtime connection open as Friday does during a reply
+        socket = StudioConnect(url=stub.url)
+        await socket.connect()
+        studio_pre_print_hook.channel = (
+            socket if args.transport == "socket" else None
+        )
+        blob_dir = tempfile.TemporaryDirectory()
+        try:
+            for scenario in args.scenarios:
+                if scenario == "text":
+                    chunks = _stream_text(
+                        args.text_tokens, args.tokens_per_chunk,
+                    )
+                    results.append(await run_scenario(scenario, chunks, stub))
+                    continue
+
+                for images in args.images:
+                    studio_pre_print_hook.image_converter = (
+                        ImageConverter(BlobStore(blob_dir.name))
+                        if images == "blob"
+                        else None
+                    )
+                    chunks = _stream_image(
+                        args.image_mb,
+                        args.image_chunks,
+                        args.tokens_per_chunk,
+                    )
+                    results.append(
+                        await run_scenario(f"image-{images}", chunks, stub),
+                    )
+        finally:
+            studio_pre_print_hook.image_converter = None
+            blob_dir.cleanup()
+            await socket.disconnect()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Metric helpers shared by the benchmarks."""
+import asyncio
+import time
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the `q`-th percentile (0-100) of the values with linear
+    interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+class LoopBlockMonitor:
+    """Measure how long the running event loop is blocked, by scheduling a
+    heartbeat every `interval` seconds and accumulating how late it wakes
+    up."""
+
+    def __init__(self, interval: float = 0.001, threshold: float = 0.002):
+        """Initialize the monitor.
+
+        Args:
+            interval (`float`, defaults to `0.001`):
+                The heartbeat interval in seconds.
+            threshold (`float`, defaults to `0.002`):
+                Delays shorter than this are regarded as scheduling noise
+                rather than blocking.
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.blocked_time = 0.0
+        self.max_block = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        """The heartbeat loop."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            delay = time.perf_counter() - start - self.interval
+            if delay > self.threshold:
+                self.blocked_time += delay
+                self.max_block = max(self.max_block, delay)
+
+    async def __aenter__(self) -> "LoopBlockMonitor":
+        self._task = asyncio.create_task(self._run())
+        # Let the heartbeat start before the measured code runs
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        # Let the heartbeat observe the last blocking call
+        await asyncio.sleep(self.interval * 2)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
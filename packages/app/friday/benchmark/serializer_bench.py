@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the serializers on the payloads of Friday: a typical streamed
+message, a message with inline images, and a long session history.
+
+For each payload and format, the encoding and decoding times and the size
+are measured, together with how long the event loop is blocked when the
+payload is serialized on the loop versus by `serialize`, which moves the
+large payloads into a worker thread. The channel scenario pushes the
+payloads to the local studio stub through `StudioConnect`.
+
+Example:
+    python -m benchmark.serializer_bench --formats json-stdlib json msgpack \
+        --image-mb 2 --session-turns 200 --output serializer_bench.json
+"""
+import asyncio
+import base64
+import json
+import math
+import os
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any
+
+from agentscope.message import ImageBlock, Msg, TextBlock, ToolUseBlock
+
+from benchmark.metrics import LoopBlockMonitor, percentile
+from benchmark.studio_stub import StudioStub
+from utils.connect import StudioConnect
+from utils.serializer import (
+    OFFLOAD_SIZE,
+    SERIALIZERS,
+    Serializer,
+    get_serializer,
+    serialize,
+)
+
+
+class _StdlibJSONSerializer(Serializer):
+    """The standard library JSON, i.e. the baseline before orjson."""
+
+    name = "json-stdlib"
+    extension = ".json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+def _get_serializer(name: str) -> Serializer:
+    """Get the serializer of the format, including the baseline."""
+    if name == "json-stdlib":
+        return _StdlibJSONSerializer()
+    return get_serializer(name)
+
+
+def _text_msg(n_tokens: int) -> dict:
+    """A typical reply with text and a tool call."""
+    return Msg(
+        "Friday",
+        [
+            TextBlock(
+                type="text",
+                text=" ".join(f"token{i}" for i in range(n_tokens)),
+            ),
+            ToolUseBlock(
+                type="tool_use",
+                id="call_1",
+                name="view_agentscope_library",
+                input={"module": "agentscope.agent", "limit": 20},
+            ),
+        ],
+        "assistant",
+    ).to_dict()
+
+
+def _build_payloads(args: Namespace) -> dict[str, Any]:
+    """The benchmarked payloads, as pushed to the studio or saved."""
+    image_data = base64.b64encode(
+        os.urandom(int(args.image_mb * 1024 * 1024)),
+    ).decode()
+    image_msg = Msg(
+        "user",
+        [
+            TextBlock(type="text", text="What is in these images?"),
+            *[
+                ImageBlock(
+                    type="image",
+                    source={
+                        "type": "base64",
+                        "media_type": "image/png",
+                        "data": image_data,
+                    },
+                )
+                for _ in range(args.images)
+            ],
+        ],
+        "user",
+    ).to_dict()
+
+    session = {
+        "friday": {
+            "memory": {
+                "content": [
+                    [_text_msg(args.text_tokens), []]
+                    for _ in range(args.session_turns)
+                ],
+            },
+        },
+        "usage": [
+            {"total": {"input_tokens": 1000, "output_tokens": 200}}
+            for _ in range(args.session_turns)
+        ],
+    }
+
+    return {
+        "text": {"replyId": "bench", "msg": _text_msg(args.text_tokens)},
+        "image": {"replyId": "bench", "msg": image_msg},
+        "session": session,
+    }
+
+
+def _time(func: Any, repeats: int) -> float:
+    """The median time of the calls in milliseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return percentile(times, 50) * 1000
+
+
+async def bench_formats(
+    payloads: dict[str, Any],
+    args: Namespace,
+) -> list[dict[str, Any]]:
+    """Measure each format on each payload."""
+    results = []
+    for name, payload in payloads.items():
+        for fmt in args.formats:
+            serializer = _get_serializer(fmt)
+            data = serializer.dumps(payload)
+            assert serializer.loads(data) == json.loads(json.dumps(payload))
+
+            async def _block(offload: bool) -> float:
+                async with LoopBlockMonitor() as monitor:
+                    if offload:
+                        await serialize(payload, serializer)
+                    else:
+                        serializer.dumps(payload)
+                return round(monitor.max_block * 1000, 1)
+
+            results.append(
+                {
+                    "payload": name,
+                    "format": fmt,
+                    "size_kb": round(len(data) / 1024, 1),
+                    "dumps_ms": round(
+                        _time(lambda: serializer.dumps(payload), args.repeats),
+                        3,
+                    ),
+                    "loads_ms": round(
+                        _time(lambda: serializer.loads(data), args.repeats),
+                        3,
+                    ),
+                    "loop_block_inline_ms": await _block(False),
+                    "loop_block_serialize_ms": await _block(True),
+                },
+            )
+    return results
+
+
+async def bench_channel(
+    payloads: dict[str, Any],
+    args: Namespace,
+) -> list[dict[str, Any]]:
+    """Push the message payloads through the studio channel, with the large
+    ones serialized on the loop by socket.io or off the loop."""
+    results = []
+    with StudioStub() as stub:
+        for fmt in [_ for _ in args.formats if _ in SERIALIZERS]:
+            for offload in (False, True):
+                socket = StudioConnect(
+                    url=stub.url,
+                    serializer=get_serializer(fmt),
+                    offload_size=OFFLOAD_SIZE if offload else math.inf,
+                )
+                await socket.connect()
+                for name in ("text", "image"):
+                    stub.reset()
+                    async with LoopBlockMonitor() as monitor:
+                        start = time.perf_counter()
+                        for _ in range(args.channel_messages):
+                            await socket.send(
+                                "pushMessageToFridayApp",
+                                payloads[name],
+                            )
+                        await socket._flush()
+                        total_time = time.perf_counter() - start
+                    assert (
+                        stub.last_payloads["pushMessageToFridayApp"]
+                        == payloads[name]
+                    )
+                    results.append(
+                        {
+                            "payload": name,
+                            "format": fmt,
+                            "offload": offload,
+                            "messages": args.channel_messages,
+                            "total_ms": round(total_time * 1000, 1),
+                            "loop_blocked_ms": round(
+                                monitor.blocked_time * 1000, 1,
+                            ),
+                            "loop_max_block_ms": round(
+                                monitor.max_block * 1000, 1,
+                            ),
+                        },
+                    )
+                await socket.disconnect()
+    return results
+
+
+def _print_table(results: list[dict]) -> None:
+    """Print the results as a plain text table."""
+    columns = list(results[0])
+    widths = [
+        max(len(col), *(len(str(_[col])) for _ in results)) for col in columns
+    ]
+    print("  ".join(col.rjust(w) for col, w in zip(columns, widths)))
+    for result in results:
+        print(
+            "  ".join(str(result[col]).rjust(w) for col, w in zip(columns, widths)),
+        )
+
+
+def get_bench_args() -> Namespace:
+    """Get the command line arguments for the serializer benchmark."""
+    parser = ArgumentParser(description="Benchmark the serializers")
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=["json-stdlib", *SERIALIZERS],
+        default=["json-stdlib", "json"],
+        help="The formats to compare, msgpack requires the msgpack package",
+    )
+    parser.add_argument("--text-tokens", type=int, default=400)
+    parser.add_argument("--images", type=int, default=2)
+    parser.add_argument("--image-mb", type=float, default=2.0)
+    parser.add_argument("--session-turns", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument(
+        "--channel-messages",
+        type=int,
+        default=20,
+        help="The number of messages pushed per channel scenario",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to write the results as JSON",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = get_bench_args()
+    payloads = _build_payloads(args)
+
+    formats = await bench_formats(payloads, args)
+    channel = await bench_channel(payloads, args)
+
+    _print_table(formats)
+    print()
+    _print_table(channel)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"formats": formats, "channel": channel}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the construction of the toolkit and the agent of Friday, with
+and without the cached tool schemas.
+
+Each repeat builds the toolkit and the agent as a new Friday process does:
+- `plain`: the tools are registered without the cached schemas, so their
+  docstrings are parsed again
+- `cold`: the cache file doesn't exist yet, so the schemas are generated
+  and written
+- `warm`: the cache is loaded from the file
+
+The local Friday directory is a temporary one, and the schemas of the
+toolkits are checked to be the same.
+
+Example:
+    python -m benchmark.startup_bench --repeats 50 \
+        --output startup_bench.json
+"""
+import json
+import os
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any, Callable
+from unittest import mock
+
+from agentscope.formatter import OpenAIChatFormatter
+from agentscope.tool import Toolkit
+
+from assistant import create_friday_agent, create_toolkit
+from benchmark.fake_model import FakeChatModel
+from benchmark.metrics import percentile
+from tool import schema_cache
+from utils.common import get_local_file_path
+
+
+def _register_plain(
+    toolkit: Toolkit,
+    tool_funcs: list[Callable],
+    group_name: str = "basic",
+) -> None:
+    """Register the tools by parsing their docstrings, as without the
+    cache."""
+    for tool_func in tool_funcs:
+        toolkit.register_tool_function(tool_func, group_name=group_name)
+
+
+def _reset(mode: str) -> None:
+    """Drop the cache loaded by the process, and its file for a cold
+    start."""
+    if hasattr(schema_cache._load_schema_cache, "cache"):
+        del schema_cache._load_schema_cache.cache
+    cache_path = get_local_file_path("tool_schemas.json")
+    if mode == "cold" and os.path.exists(cache_path):
+        os.remove(cache_path)
+
+
+def run_mode(mode: str, args: Namespace) -> tuple[dict[str, Any], list]:
+    """Build the toolkit and the agent `repeats` times in the mode."""
+    model, formatter = FakeChatModel(), OpenAIChatFormatter()
+    times: dict[str, list[float]] = {"toolkit": [], "agent": []}
+    schemas = []
+    for _ in range(args.repeats):
+        _reset(mode)
+        with mock.patch(
+            "assistant.register_tools",
+            _register_plain if mode == "plain" else schema_cache.register_tools,
+        ):
+            start = time.perf_counter()
+            toolkit = create_toolkit(
+                args.write_permission,
+                compact_images=args.compact_images,
+            )
+            times["toolkit"].append(time.perf_counter() - start)
+            create_friday_agent(model, formatter, toolkit)
+            times["agent"].append(time.perf_counter() - start)
+        schemas = toolkit.get_json_schemas()
+
+    def _ms(values: list[float], p: float) -> float:
+        return round(percentile(values, p) * 1000, 2)
+
+    return {
+        "mode": mode,
+        "tools": len(toolkit.tools),
+        "toolkit_p50_ms": _ms(times["toolkit"], 50),
+        "toolkit_p95_ms": _ms(times["toolkit"], 95),
+        "agent_p50_ms": _ms(times["agent"], 50),
+        "agent_p95_ms": _ms(times["agent"], 95),
+    }, schemas
+
+
+def _print_table(results: list[dict]) -> None:
+    """Print the results as a plain text table."""
+    columns = list(results[0])
+    widths = [
+        max(len(col), *(len(str(_[col])) for _ in results)) for col in columns
+    ]
+    print("  ".join(col.rjust(w) for col, w in zip(columns, widths)))
+    for result in results:
+        print(
+            "  ".join(str(result[col]).rjust(w) for col, w in zip(columns, widths)),
+        )
+
+
+def get_bench_args() -> Namespace:
+    """Get the command line arguments for the startup benchmark."""
+    parser = ArgumentParser(
+        description="Benchmark the construction of the toolkit and the agent",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=50,
+        help="The number of the toolkits and agents built in each mode",
+    )
+    parser.add_argument("--write-permission", action="store_true")
+    parser.add_argument("--compact-images", action="store_true")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path to write the results as JSON",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = get_bench_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The local Friday directory of every platform
+        with mock.patch.dict(os.environ, {"HOME": tmp_dir, "APPDATA": tmp_dir}):
+            results, all_schemas = [], []
+            for mode in ("plain", "cold", "warm"):
+                result, schemas = run_mode(mode, args)
+                results.append(result)
+                all_schemas.append(schemas)
+    assert all(_ == all_schemas[0] for _ in all_schemas)
+
+    _print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""A local stand-in of the studio server that records the requests pushed by
+Friday's hooks and the events sent over the socket.io `/friday` namespace,
+and stores and serves the pushed blobs like the studio does."""
+import asyncio
+import base64
+import json
+import mimetypes
+import re
+import socket
+import threading
+from collections import Counter
+from typing import Any
+
+import socketio
+from aiohttp import web
+
+from utils.serializer import get_serializer
+
+# The blob IDs are the SHA-256 of the content with a file extension
+_BLOB_ID_PATTERN = re.compile(r"[0-9a-f]{64}\.[0-9a-z]+")
+
+
+def _payload_size(data: Any) -> int:
+    """Estimate the number of bytes of a socket.io event payload."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    if isinstance(data, (list, tuple)):
+        return sum(_payload_size(_) for _ in data)
+    if isinstance(data, dict):
+        return sum(
+            len(str(k)) + _payload_size(v) for k, v in data.items()
+        )
+    return len(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+class StudioStub:
+    """The studio stub, serving the tRPC endpoints and the socket.io
+    namespace used by Friday in a background thread with its own event loop,
+    so that blocking clients in the benchmarked event loop don't block the
+    server."""
+
+    _friday_namespace = "/friday"
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        """Initialize the studio stub.
+
+        Args:
+            host (`str`, defaults to `"127.0.0.1"`):
+                The host to bind.
+        """
+        self.host = host
+        self.port = self._get_free_port(host)
+
+        self.counts: Counter = Counter()
+        self.bytes_received: Counter = Counter()
+        # The last payload of each event, decoded like the studio does
+        self.last_payloads: dict[str, Any] = {}
+        # The pushed blobs by their IDs, served at /friday/blobs/{blob_id}
+        self.blobs: dict[str, bytes] = {}
+        # The number of the next events acknowledged with false, as if the
+        # studio failed to save them
+        self.n_failures = 0
+
+        self.sio = socketio.AsyncServer(
+            async_mode="aiohttp",
+            max_http_buffer_size=1024**3,
+        )
+        self.sio.on("*", self._handle_event, namespace=self._friday_namespace)
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._runner: web.AppRunner | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        """The base URL of the studio stub."""
+        return f"http://{self.host}:{self.port}"
+
+    @staticmethod
+    def _get_free_port(host: str) -> int:
+        """Get a free port on the given host."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((host, 0))
+            return s.getsockname()[1]
+
+    def reset(self) -> None:
+        """Reset the recorded counters and the stored blobs."""
+        self.counts.clear()
+        self.bytes_received.clear()
+        self.last_payloads.clear()
+        self.blobs.clear()
+        self.n_failures = 0
+
+    def _save_blob(self, blob_id: str, data: bytes) -> None:
+        """Store a blob, rejecting the invalid IDs like the studio does."""
+        if not _BLOB_ID_PATTERN.fullmatch(blob_id):
+            raise ValueError(f"Invalid blob ID: {blob_id}")
+        self.blobs[blob_id] = data
+
+    async def _handle_trpc(self, request: web.Request) -> web.Response:
+        """Record a tRPC mutation and answer it like the studio does."""
+        procedure = request.match_info["procedure"]
+        body = await request.read()
+        self.counts[procedure] += 1
+        self.bytes_received[procedure] += len(body)
+        if procedure == "pushBlobToFridayApp":
+            payload = json.loads(body)
+            self._save_blob(payload["blobId"], base64.b64decode(payload["data"]))
+        return web.json_response({"result": {"data": None}})
+
+    async def _handle_blob(self, request: web.Request) -> web.Response:
+        """Serve a stored blob with the media type of its extension, as the
+        studio's /friday/blobs/:blobId route does."""
+        blob_id = request.match_info["blob_id"]
+        if blob_id not in self.blobs:
+            raise web.HTTPNotFound()
+        return web.Response(
+            body=self.blobs[blob_id],
+            content_type=mimetypes.guess_type(blob_id)[0]
+            or "application/octet-stream",
+        )
+
+    async def _handle_event(self, event: str, sid: str, *data: Any) -> bool:
+        """Record an event sent by Friday over the socket.io namespace and
+        acknowledge it like the studio does, with false if saving it fails."""
+        self.counts[event] += 1
+        self.bytes_received[event] += _payload_size(list(data))
+        if self.n_failures > 0:
+            self.n_failures -= 1
+            return False
+        # The large payloads arrive pre-serialized as {encoding, body}
+        payload = data[0] if data else None
+        if (
+            isinstance(payload, dict)
+            and isinstance(payload.get("body"), bytes)
+            and "encoding" in payload
+        ):
+            payload = get_serializer(payload["encoding"]).loads(
+                payload["body"],
+            )
+        self.last_payloads[event] = payload
+        if event == "pushBlobToFridayApp":
+            self._save_blob(payload["blobId"], payload["data"])
+        return True
+
+    def emit(self, event: str, *data: Any) -> None:
+        """Emit an event to the connected Friday clients from any thread."""
+        asyncio.run_coroutine_threadsafe(
+            self.sio.emit(
+                event,
+                data[0] if len(data) == 1 else data or None,
+                namespace=self._friday_namespace,
+            ),
+            self._loop,
+        ).result()
+
+    def _create_app(self) -> web.Application:
+        """Create the web application of the stub."""
+        app = web.Application(client_max_size=1024**3)
+        app.router.add_post("/trpc/{procedure}", self._handle_trpc)
+        app.router.add_get("/friday/blobs/{blob_id}", self._handle_blob)
+        self.sio.attach(app)
+        return app
+
+    def _serve(self) -> None:
+        """Run the stub server in the current (background) thread."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        self._runner = web.AppRunner(self._create_app())
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        self._ready.set()
+        self._loop.run_forever()
+
+        # Stop the background tasks of socket.io before closing the loop
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(
+            asyncio.gather(*tasks, return_exceptions=True),
+        )
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> "StudioStub":
+        """Start the stub server in a background thread."""
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        """Stop the stub server."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StudioStub":
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
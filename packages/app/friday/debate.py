@@ -7,11 +7,16 @@ Based on AgentScope's multi-agent debate tutorial:
 https://doc.agentscope.io/tutorial/workflow_multiagent_debate.html
 """
 import asyncio
-from typing import List, Dict, Any, Optional
+import json
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Type
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
-from agentscope.agent import ReActAgent
+from agentscope.agent import AgentBase, ReActAgent
+from agentscope.memory import InMemoryMemory, MemoryBase
 from agentscope.message import Msg
 from agentscope.pipeline import MsgHub
 from agentscope.model import ChatModelBase
@@ -19,6 +24,12 @@ from agentscope.formatter import FormatterBase
 from agentscope.tool import Toolkit
 
 from hook import studio_pre_print_hook, studio_post_reply_hook
+from utils.common import write_file_atomic
+from utils.log import is_console_output_enabled, logger
+from utils.memory_profile import record_memory
+from utils.message_log import LogMemory, MessageLog
+from utils.serializer import get_serializer, serialize
+from utils.usage import UsageTracker, usage_scope
 
 
 class JudgeModel(BaseModel):
@@ -31,12 +42,243 @@ class JudgeModel(BaseModel):
         description="The final conclusion if debate is finished, otherwise None",
         default=None,
     )
+    best_answer: Optional[str] = Field(
+        description="The best answer so far, given after every round even if the debate is not finished",
+        default=None,
+    )
     reasoning: str = Field(
         description="The reasoning behind the judgment",
         default="",
     )
 
 
+class _SingleCallAgent(AgentBase):
+    """单次调用智能体基类 (Base of the agents replying by one model call)
+
+    Unlike `ReActAgent`, there is no reasoning-acting loop or finish
+    function, while the `pre_print`/`post_reply` hooks fire the same way.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sys_prompt: str,
+        model: ChatModelBase,
+        formatter: FormatterBase,
+        memory: Optional[MemoryBase] = None,
+    ) -> None:
+        super().__init__()
+        self.name = name
+        self._sys_prompt = sys_prompt
+        self.model = model
+        self.formatter = formatter
+        self.memory = memory or InMemoryMemory()
+
+    @property
+    def sys_prompt(self) -> str:
+        """The system prompt of the agent."""
+        return self._sys_prompt
+
+    async def observe(self, msg: Msg | list[Msg] | None) -> None:
+        """记录其他人的发言 (Record the others' speeches)"""
+        await self.memory.add(msg)
+
+    async def _get_prompt_msgs(self) -> List[Msg]:
+        """系统提示词和记忆 (The system prompt and the memory)"""
+        return [
+            Msg("system", self.sys_prompt, "system"),
+            *await self.memory.get_memory(),
+        ]
+
+
+class DebaterAgent(_SingleCallAgent):
+    """轻量辩手 (Lightweight debater)
+
+    Each speech is one streamed model call without tools, instead of a ReAct
+    loop finished by the `generate_response` tool.
+    """
+
+    async def reply(self, msg: Msg | list[Msg] | None = None) -> Msg:
+        """发言一次 (Speak once)
+
+        Args:
+            msg (`Msg | list[Msg] | None`, optional):
+                The prompt of the speech.
+        """
+        await self.memory.add(msg)
+        prompt = await self.formatter.format(await self._get_prompt_msgs())
+
+        reply_msg = Msg(self.name, [], "assistant")
+        try:
+            res = await self.model(prompt)
+            if self.model.stream:
+                # 每个分块只打印一次，最后一块在循环后打印
+                # (Print each chunk once, the last one after the loop)
+                async for chunk in res:
+                    if reply_msg.content:
+                        await self.print(reply_msg, False)
+                    reply_msg.content = chunk.content
+            else:
+                reply_msg.content = list(res.content)
+            await self.print(reply_msg, True)
+
+        finally:
+            # 中断时保留已生成的部分 (Keep the partial speech if interrupted)
+            if reply_msg.content:
+                await self.memory.add(reply_msg)
+
+        return reply_msg
+
+    async def handle_interrupt(
+        self,
+        msg: Msg | list[Msg] | None = None,
+    ) -> Msg:
+        """中断时结束发言 (Stop speaking when interrupted)"""
+        response_msg = Msg(
+            self.name,
+            "发言被中断",
+            "assistant",
+            metadata={"_is_interrupted": True},
+        )
+        await self.print(response_msg, True)
+        return response_msg
+
+
+class DebateJudge(_SingleCallAgent):
+    """轻量裁判 (Lightweight judge)
+
+    Each judgment is one direct model call in the structured output mode of
+    the provider (e.g. JSON schema for OpenAI), instead of a ReAct loop that
+    calls the `generate_response` tool. The output is validated locally, and
+    repaired by at most `max_repairs` more calls with the validation error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sys_prompt: str,
+        model: ChatModelBase,
+        formatter: FormatterBase,
+        memory: Optional[MemoryBase] = None,
+        max_repairs: int = 1,
+    ) -> None:
+        super().__init__(name, sys_prompt, model, formatter, memory)
+        self.max_repairs = max_repairs
+
+    @staticmethod
+    def _validate(
+        structured_model: Type[BaseModel],
+        output: Any,
+    ) -> BaseModel:
+        """本地校验裁判输出 (Validate the judgment locally)"""
+        judgment = structured_model.model_validate(output)
+        # 结束辩论时必须给出结论 (A finished debate must have a conclusion)
+        if getattr(judgment, "finished", False) and not getattr(
+            judgment, "correct_answer", True,
+        ):
+            raise ValueError("correct_answer is required when finished")
+        return judgment
+
+    async def _call_model(
+        self,
+        msgs: List[Msg],
+        structured_model: Type[BaseModel],
+    ) -> Any:
+        """一次模型调用，返回结构化输出 (One model call for the structured output)"""
+        prompt = await self.formatter.format(msgs)
+        res = await self.model(prompt, structured_model=structured_model)
+        if self.model.stream:
+            last = None
+            async for chunk in res:
+                last = chunk
+            # 空的流式输出可以修复 (An empty stream is repaired like an invalid output)
+            if last is None:
+                raise ValueError("the model returned an empty response")
+            res = last
+
+        if res.metadata is not None:
+            return res.metadata
+
+        # 部分模型以文本返回JSON (Some models answer the JSON in text)
+        text = "".join(
+            _.get("text", "") for _ in res.content if _.get("type") == "text"
+        )
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
+
+    async def reply(
+        self,
+        msg: Msg | list[Msg] | None = None,
+        structured_model: Type[BaseModel] | None = None,
+    ) -> Msg:
+        """给出一次判断 (Give a judgment)
+
+        Args:
+            msg (`Msg | list[Msg] | None`, optional):
+                The judge prompt.
+            structured_model (`Type[BaseModel] | None`, optional):
+                The output model, `JudgeModel` by default. The validated
+                output is stored in the metadata of the reply.
+        """
+        structured_model = structured_model or JudgeModel
+        await self.memory.add(msg)
+
+        msgs = await self._get_prompt_msgs()
+        judgment = None
+        for _ in range(1 + self.max_repairs):
+            try:
+                output = await self._call_model(msgs, structured_model)
+                judgment = self._validate(structured_model, output)
+                break
+            except (ValidationError, ValueError) as e:
+                # 带上错误信息修复一次 (Repair with the validation error)
+                msgs = [
+                    *msgs,
+                    Msg(
+                        "user",
+                        f"你的输出无效，请修正后重新输出: {e}",
+                        "user",
+                    ),
+                ]
+
+        if judgment is None:
+            # 无法得到有效判断，继续辩论 (No valid judgment, go on debating)
+            metadata = {
+                "finished": False,
+                "correct_answer": None,
+                "reasoning": "裁判输出无效",
+            }
+        else:
+            metadata = judgment.model_dump()
+
+        text = metadata.get("reasoning") or ""
+        if metadata.get("finished") and metadata.get("correct_answer"):
+            text = f"{metadata['correct_answer']}\n\n{text}".strip()
+
+        reply_msg = Msg(self.name, text, "assistant", metadata=metadata)
+        await self.print(reply_msg, True)
+        await self.memory.add(reply_msg)
+        return reply_msg
+
+    async def handle_interrupt(
+        self,
+        msg: Msg | list[Msg] | None = None,
+        structured_model: Type[BaseModel] | None = None,
+    ) -> Msg:
+        """中断时不给出判断 (No judgment when interrupted)"""
+        response_msg = Msg(
+            self.name,
+            "裁判被中断",
+            "assistant",
+            metadata={"_is_interrupted": True},
+        )
+        await self.print(response_msg, True)
+        await self.memory.add(response_msg)
+        return response_msg
+
+
 class DebateConfig:
     """辩论配置类 (Debate configuration class)"""
 
@@ -46,11 +288,19 @@ class DebateConfig:
         max_rounds: int = 3,
         topic: str = "",
         agent_roles: Optional[List[str]] = None,
+        judge_mode: str = "direct",
+        debater_mode: str = "direct",
     ):
         self.num_agents = num_agents
         self.max_rounds = max_rounds
         self.topic = topic
         self.agent_roles = agent_roles or self._get_default_roles(num_agents)
+        # 裁判模式: "direct" 单次结构化调用, "react" ReAct智能体
+        # (Judge mode: "direct" for one structured call, "react" for a ReAct agent)
+        self.judge_mode = judge_mode
+        # 辩手模式: "direct" 每次发言一次流式调用, "react" ReAct智能体
+        # (Debater mode: "direct" for one streamed call per speech, "react" for a ReAct agent)
+        self.debater_mode = debater_mode
 
     @staticmethod
     def _get_default_roles(num_agents: int) -> List[str]:
@@ -75,17 +325,186 @@ class DebateOrchestrator:
         formatter: FormatterBase,
         toolkit: Optional[Toolkit] = None,
         studio_url: str = "",
+        checkpoint_path: str = "",
+        shared_memory: bool = True,
+        on_event: Optional[
+            Callable[["DebateOrchestrator", Dict[str, Any]], Awaitable[None]]
+        ] = None,
     ):
         self.config = config
         self.model = model
         self.formatter = formatter
         self.toolkit = toolkit
         self.studio_url = studio_url
-
-        self.debaters: List[ReActAgent] = []
-        self.moderator: Optional[ReActAgent] = None
+        # 每轮结束后保存检查点的路径，为空则不保存
+        # (The checkpoint saved after each round, disabled if empty)
+        self.checkpoint_path = checkpoint_path
+
+        # 所有参与者共享的消息日志，每个记忆只是日志的视图
+        # (The message log shared by all the participants, whose memories
+        # are views into it, instead of a copy of each message per agent)
+        self.shared_memory = shared_memory
+        self.message_log = MessageLog()
+
+        self.debaters: List[AgentBase] = []
+        self.moderator: Optional[AgentBase] = None
         self.debate_history: List[Dict[str, Any]] = []
 
+        # 每轮的进度事件，例如推送到studio
+        # (The progress events of each round, e.g. pushed to the studio)
+        self.debate_id = uuid.uuid4().hex
+        self.on_event = on_event
+
+        # 用户是否中断了辩论 (Whether the debate is interrupted by the user)
+        self._interrupted = False
+        # 用户是否接受了当前结论并提前结束
+        # (Whether the user accepted the interim conclusion to stop early)
+        self._accepted = False
+        # 裁判最近一次给出的最佳答案 (The latest best answer of the judge)
+        self.verdict: Optional[Dict[str, Any]] = None
+
+        # 每个智能体和每轮的token用量 (Token usage per agent and round)
+        self.usage = UsageTracker()
+
+        # 已完成的轮数和最终结果，从检查点恢复时非空
+        # (The completed rounds and the final result, restored from a checkpoint)
+        self._completed_rounds = 0
+        self._final_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def agents(self) -> List[AgentBase]:
+        """所有辩论者和裁判 (All the debaters and the moderator)"""
+        if self.moderator is None:
+            return list(self.debaters)
+        return [*self.debaters, self.moderator]
+
+    def _create_memory(self) -> MemoryBase:
+        """创建参与者的记忆 (Create the memory of a participant)"""
+        if self.shared_memory:
+            return LogMemory(self.message_log)
+        return InMemoryMemory()
+
+    def state_dict(self) -> Dict[str, Any]:
+        """辩论状态 (The debate state, saved as the checkpoint)"""
+        return {
+            "config": vars(self.config),
+            "debate_id": self.debate_id,
+            "completed_rounds": self._completed_rounds,
+            "verdict": self.verdict,
+            "history": self.debate_history,
+            "log": self.message_log.state_dict(),
+            "agents": {agent.name: agent.state_dict() for agent in self.agents},
+            "usage": self.usage.records,
+            "result": self._final_result,
+        }
+
+    async def _save_checkpoint(self) -> None:
+        """保存检查点 (Save the checkpoint atomically)"""
+        if not self.checkpoint_path:
+            return
+
+        # 长辩论的检查点在工作线程中序列化 (A long debate is serialized off the event loop)
+        content = await serialize(self.state_dict())
+
+        await asyncio.to_thread(
+            write_file_atomic,
+            self.checkpoint_path,
+            content,
+        )
+
+    @classmethod
+    async def from_checkpoint(
+        cls,
+        checkpoint_path: str,
+        model: ChatModelBase,
+        formatter: FormatterBase,
+        toolkit: Optional[Toolkit] = None,
+        studio_url: str = "",
+        on_event: Optional[
+            Callable[["DebateOrchestrator", Dict[str, Any]], Awaitable[None]]
+        ] = None,
+    ) -> Optional["DebateOrchestrator"]:
+        """从检查点恢复辩论 (Restore the debate from its checkpoint)
+
+        The debate continues from the last completed round by `run_debate`,
+        without generating the earlier turns again.
+
+        Returns:
+            恢复的编排器，没有检查点时为None
+            (The restored orchestrator, or None without a checkpoint)
+        """
+        if not os.path.exists(checkpoint_path):
+            return None
+
+        def _read() -> Dict[str, Any]:
+            with open(checkpoint_path, "rb") as f:
+                return get_serializer().loads(f.read())
+
+        state = await asyncio.to_thread(_read)
+
+        orchestrator = cls(
+            config=DebateConfig(**state["config"]),
+            model=model,
+            formatter=formatter,
+            toolkit=toolkit,
+            studio_url=studio_url,
+            checkpoint_path=checkpoint_path,
+            on_event=on_event,
+        )
+        await orchestrator.create_debate_agents()
+        await orchestrator.create_moderator()
+        # 先恢复共享日志，记忆再指向它 (The log before the memories into it)
+        if "log" in state:
+            orchestrator.message_log.load_state_dict(state["log"])
+        for agent in orchestrator.agents:
+            if agent.name in state["agents"]:
+                agent.load_state_dict(state["agents"][agent.name], strict=False)
+
+        orchestrator.debate_id = state.get("debate_id", orchestrator.debate_id)
+        orchestrator._completed_rounds = state["completed_rounds"]
+        orchestrator.verdict = state.get("verdict")
+        orchestrator.debate_history = state["history"]
+        orchestrator.usage.records = state["usage"]
+        orchestrator._final_result = state["result"]
+        return orchestrator
+
+    async def interrupt(self) -> None:
+        """中断辩论 (Interrupt the debate)
+
+        The replying agent is cancelled together with its model stream and
+        tool calls, and no further speaker or judgment is started.
+        """
+        self._interrupted = True
+        await asyncio.gather(*[agent.interrupt() for agent in self.agents])
+
+    async def accept(self) -> None:
+        """接受裁判当前的最佳答案，提前结束辩论
+        (Accept the judge's best answer so far, stopping the debate early)
+
+        The replying agent is cancelled as by `interrupt`, while the debate
+        finishes with the latest verdict as its conclusion instead of
+        waiting for `max_rounds`.
+        """
+        self._accepted = True
+        await asyncio.gather(*[agent.interrupt() for agent in self.agents])
+
+    @property
+    def _stopped(self) -> bool:
+        """辩论是否被用户中断或接受 (Whether interrupted or accepted)"""
+        return self._interrupted or self._accepted
+
+    async def _emit(self, event_type: str, **fields: Any) -> None:
+        """发送进度事件 (Send a progress event)
+
+        A failed event is reported without stopping the debate.
+        """
+        if self.on_event is None:
+            return
+        try:
+            await self.on_event(self, {"type": event_type, **fields})
+        except Exception as e:
+            logger.warning("[EVENT] Failed to send the %s event: %s", event_type, e)
+
     def _create_debater_sys_prompt(self, role: str, position: int) -> str:
         """为辩论者创建系统提示词 (Create system prompt for debater)"""
         return f"""你是辩论中的第{position + 1}号辩手，你的角色定位是: {role}
@@ -134,6 +553,7 @@ class DebateOrchestrator:
 你必须以结构化格式输出评估结果：
 - finished: true/false (是否结束辩论)
 - correct_answer: 最终结论（如果finished=true）
+- best_answer: 目前为止的最佳答案（每轮都要给出，即使辩论尚未结束）
 - reasoning: 你的判断理由
 
 # 评估原则 (Evaluation Principles)
@@ -145,16 +565,33 @@ class DebateOrchestrator:
         """创建所有辩论智能体 (Create all debate agents)"""
         self.debaters = []
 
+        # 辩手需要工具时才用ReAct (ReAct only when the debaters use tools)
+        use_react = self.config.debater_mode == "react" or self.toolkit is not None
+
         for i, role in enumerate(self.config.agent_roles):
-            agent = ReActAgent(
-                name=f"Debater_{i+1}_{role.split()[0]}",  # 例如: Debater_1_Proponent
-                sys_prompt=self._create_debater_sys_prompt(role, i),
-                model=self.model,
-                formatter=self.formatter,
-                toolkit=self.toolkit,
-                max_iters=10,
-                enable_meta_tool=False,  # 辩论场景不需要元工具
-            )
+            name = f"Debater_{i+1}_{role.split()[0]}"  # 例如: Debater_1_Proponent
+            if use_react:
+                agent = ReActAgent(
+                    name=name,
+                    sys_prompt=self._create_debater_sys_prompt(role, i),
+                    model=self.model,
+                    formatter=self.formatter,
+                    toolkit=self.toolkit,
+                    memory=self._create_memory(),
+                    max_iters=10,
+                    enable_meta_tool=False,  # 辩论场景不需要元工具
+                )
+            else:
+                agent = DebaterAgent(
+                    name=name,
+                    sys_prompt=self._create_debater_sys_prompt(role, i),
+                    model=self.model,
+                    formatter=self.formatter,
+                    memory=self._create_memory(),
+                )
+
+            if not is_console_output_enabled():
+                agent.set_console_output_enabled(False)
 
             # 注册hook，让辩论消息自动推送到前端 (Register hooks to push messages to frontend)
             if self.studio_url:
@@ -173,14 +610,27 @@ class DebateOrchestrator:
 
     async def create_moderator(self) -> None:
         """创建裁判智能体 (Create moderator agent)"""
-        self.moderator = ReActAgent(
-            name="Moderator",
-            sys_prompt=self._create_moderator_sys_prompt(),
-            model=self.model,
-            formatter=self.formatter,
-            max_iters=5,
-            enable_meta_tool=False,
-        )
+        if self.config.judge_mode == "react":
+            self.moderator = ReActAgent(
+                name="Moderator",
+                sys_prompt=self._create_moderator_sys_prompt(),
+                model=self.model,
+                formatter=self.formatter,
+                memory=self._create_memory(),
+                max_iters=5,
+                enable_meta_tool=False,
+            )
+        else:
+            self.moderator = DebateJudge(
+                name="Moderator",
+                sys_prompt=self._create_moderator_sys_prompt(),
+                model=self.model,
+                formatter=self.formatter,
+                memory=self._create_memory(),
+            )
+
+        if not is_console_output_enabled():
+            self.moderator.set_console_output_enabled(False)
 
         # 裁判消息也推送到前端 (Push moderator messages to frontend)
         if self.studio_url:
@@ -205,6 +655,11 @@ class DebateOrchestrator:
             辩论结果字典，包含最终结论和辩论历史
             (Debate result dictionary containing final conclusion and history)
         """
+        # 已经结束的辩论直接返回结果 (A finished debate returns its result)
+        if self._final_result is not None:
+            logger.info("[DEBATE FINISHED] Restored the result of: %s", topic)
+            return self._final_result
+
         # 确保智能体已创建 (Ensure agents are created)
         if not self.debaters:
             await self.create_debate_agents()
@@ -218,28 +673,39 @@ class DebateOrchestrator:
             role="system"
         )
 
-        print(f"\n{'='*60}")
-        print(f"[DEBATE START] Topic: {topic}")
-        print(f"[PARTICIPANTS] {len(self.debaters)} debaters + 1 moderator")
-        print(f"[MAX ROUNDS] {self.config.max_rounds}")
-        print(f"{'='*60}\n")
+        logger.info(
+            "[DEBATE START] Topic: %s, %d debaters + 1 moderator, max rounds: %d",
+            topic,
+            len(self.debaters),
+            self.config.max_rounds,
+        )
+        if self._completed_rounds:
+            logger.info("[RESUME] Continue after round %d", self._completed_rounds)
 
-        current_round = 0
+        current_round = self._completed_rounds
         final_result = None
 
         # 辩论主循环 (Main debate loop)
-        while current_round < self.config.max_rounds:
+        while current_round < self.config.max_rounds and not self._stopped:
             current_round += 1
-            print(f"\n--- [ROUND {current_round}/{self.config.max_rounds}] Debate round starts ---\n")
+            logger.info("[ROUND %d/%d] Debate round starts", current_round, self.config.max_rounds)
+            await self._emit(
+                "round_started",
+                round=current_round,
+                max_rounds=self.config.max_rounds,
+            )
 
             # 阶段1: 辩论者轮流发言（在MsgHub中）(Phase 1: Debaters speak in MsgHub)
             async with MsgHub(
                 participants=[*self.debaters, self.moderator]
             ):
                 for idx, debater in enumerate(self.debaters):
+                    if self._stopped:
+                        break
+
                     if current_round == 1:
                         # 第一轮：直接回应主题 (First round: respond to topic directly)
-                        response = await debater(topic_msg)
+                        prompt = topic_msg
                     else:
                         # 后续轮次：基于之前的讨论继续 (Subsequent rounds: continue based on previous discussion)
                         prompt = Msg(
@@ -247,7 +713,12 @@ class DebateOrchestrator:
                             content=f"请根据之前的讨论，进一步阐述你的观点或回应其他辩手。",
                             role="system"
                         )
+                    start = time.perf_counter()
+                    with usage_scope(
+                        self.usage, agent=debater.name, round=current_round,
+                    ):
                         response = await debater(prompt)
+                    latency = time.perf_counter() - start
 
                     # 记录到历史 (Record to history)
                     self.debate_history.append({
@@ -256,9 +727,22 @@ class DebateOrchestrator:
                         "role": self.config.agent_roles[idx],
                         "content": response.content,
                     })
+                    await self._emit(
+                        "speaker_finished",
+                        round=current_round,
+                        speaker=debater.name,
+                        role=self.config.agent_roles[idx],
+                        latency=round(latency, 3),
+                        interrupted=bool(
+                            (response.metadata or {}).get("_is_interrupted"),
+                        ),
+                    )
+
+            if self._stopped:
+                break
 
             # 阶段2: 裁判评估（独立于MsgHub）(Phase 2: Judge evaluation outside MsgHub)
-            print(f"\n--- [JUDGE] Evaluating... ---\n")
+            logger.debug("[JUDGE] Evaluating round %d", current_round)
 
             judge_prompt = Msg(
                 name="system",
@@ -272,13 +756,38 @@ class DebateOrchestrator:
             )
 
             # 使用结构化输出调用裁判 (Call moderator with structured output)
-            judge_response = await self.moderator(judge_prompt, structured_model=JudgeModel)
+            start = time.perf_counter()
+            with usage_scope(
+                self.usage, agent=self.moderator.name, round=current_round,
+            ):
+                judge_response = await self.moderator(
+                    judge_prompt, structured_model=JudgeModel,
+                )
+            latency = time.perf_counter() - start
+
+            # 被中断的判断不算完成本轮 (An interrupted judgment doesn't complete the round)
+            if self._stopped:
+                break
 
             # 解析裁判的结构化输出 (Parse judge's structured output)
             finished = judge_response.metadata.get("finished", False)
             correct_answer = judge_response.metadata.get("correct_answer", "")
             reasoning = judge_response.metadata.get("reasoning", "")
 
+            # 当前最佳答案，用户可以接受它提前结束
+            # (The best answer so far, which the user may accept to stop early)
+            best_answer = (
+                correct_answer
+                if finished and correct_answer
+                else judge_response.metadata.get("best_answer")
+            )
+            if best_answer:
+                self.verdict = {
+                    "round": current_round,
+                    "best_answer": best_answer,
+                    "reasoning": reasoning,
+                }
+
             self.debate_history.append({
                 "round": current_round,
                 "speaker": "Moderator",
@@ -288,13 +797,27 @@ class DebateOrchestrator:
                 "conclusion": correct_answer,
             })
 
+            # 保存本轮检查点 (Checkpoint the completed round)
+            self._completed_rounds = current_round
+            await self._save_checkpoint()
+            record_memory("round", debate=self.debate_id, round=current_round)
+
+            await self._emit(
+                "judge_verdict",
+                round=current_round,
+                finished=finished,
+                best_answer=best_answer,
+                reasoning=reasoning,
+                latency=round(latency, 3),
+            )
+
             # 阶段3: 检查是否结束 (Phase 3: Check if debate should end)
             if finished:
-                print(f"\n{'='*60}")
-                print(f"[JUDGE] Debate finished!")
-                print(f"[CONCLUSION] {correct_answer}")
-                print(f"[REASONING] {reasoning}")
-                print(f"{'='*60}\n")
+                logger.info(
+                    "[JUDGE] Debate finished, conclusion: %s, reasoning: %s",
+                    correct_answer,
+                    reasoning,
+                )
 
                 final_result = {
                     "finished": True,
@@ -302,14 +825,34 @@ class DebateOrchestrator:
                     "reasoning": reasoning,
                     "total_rounds": current_round,
                     "history": self.debate_history,
+                    "usage": self.usage.summary(),
                 }
                 break
 
+        # 辩论被中断，不再请裁判总结 (Interrupted, skip the final summary)
+        if self._interrupted:
+            logger.info("[INTERRUPTED] Debate interrupted in round %d", current_round)
+            await self._emit(
+                "debate_finished",
+                round=current_round,
+                reason="interrupted",
+                conclusion=None,
+                reasoning="",
+            )
+            return {
+                "finished": False,
+                "interrupted": True,
+                "conclusion": "辩论被用户中断",
+                "reasoning": "",
+                "total_rounds": current_round,
+                "history": self.debate_history,
+                "usage": self.usage.summary(),
+            }
+
         # 如果达到最大轮数仍未结束 (If max rounds reached without conclusion)
-        if not final_result:
-            print(f"\n{'='*60}")
-            print(f"[TIMEOUT] Max rounds ({self.config.max_rounds}) reached, debate ends")
-            print(f"{'='*60}\n")
+        reason = "judge" if final_result else "max_rounds"
+        if not final_result and not self._accepted:
+            logger.info("[TIMEOUT] Max rounds (%d) reached, debate ends", self.config.max_rounds)
 
             # 请裁判给出最终总结 (Ask judge for final summary)
             final_summary_prompt = Msg(
@@ -317,14 +860,52 @@ class DebateOrchestrator:
                 content="辩论已达到最大轮数。请总结各方观点，给出你的最终结论。",
                 role="system"
             )
-            final_judge = await self.moderator(final_summary_prompt, structured_model=JudgeModel)
+            with usage_scope(
+                self.usage, agent=self.moderator.name, round="final",
+            ):
+                final_judge = await self.moderator(
+                    final_summary_prompt, structured_model=JudgeModel,
+                )
+
+            # 总结时被接受则采用之前的最佳答案
+            # (Accepted during the summary, use the best answer so far)
+            if not self._accepted:
+                final_result = {
+                    "finished": True,
+                    "conclusion": final_judge.metadata.get("correct_answer", "未能达成明确结论"),
+                    "reasoning": "达到最大轮数限制",
+                    "total_rounds": current_round,
+                    "history": self.debate_history,
+                    "usage": self.usage.summary(),
+                }
 
+        # 用户接受了当前最佳答案，不再请裁判总结
+        # (The user accepted the best answer so far, skip the final summary)
+        if not final_result and self._accepted:
+            reason = "accepted"
+            verdict = self.verdict or {}
+            logger.info(
+                "[ACCEPTED] Accepted the verdict of round %s in round %d",
+                verdict.get("round"),
+                current_round,
+            )
             final_result = {
                 "finished": True,
-                "conclusion": final_judge.metadata.get("correct_answer", "未能达成明确结论"),
-                "reasoning": "达到最大轮数限制",
+                "accepted": True,
+                "conclusion": verdict.get("best_answer") or "裁判尚未给出答案",
+                "reasoning": verdict.get("reasoning", ""),
                 "total_rounds": current_round,
                 "history": self.debate_history,
+                "usage": self.usage.summary(),
             }
 
+        self._final_result = final_result
+        await self._save_checkpoint()
+        await self._emit(
+            "debate_finished",
+            round=final_result["total_rounds"],
+            reason=reason,
+            conclusion=final_result["conclusion"],
+            reasoning=final_result["reasoning"],
+        )
         return final_result
@@ -1,52 +1,117 @@
 # -*- coding: utf-8 -*-
 """The hooks for the agent"""
+import asyncio
+import random
+import time
 from typing import Any
 
 import requests
 from agentscope.agent import AgentBase
 
+from utils.serializer import get_serializer
 
-def studio_pre_print_hook(self: AgentBase, kwargs: dict[str, Any]) -> None:
-    """Forward the message to the studio application interface."""
-    msg = kwargs["msg"]
-    message_data = msg.to_dict()
-
-    message_data["content"] = msg.get_content_blocks()
 
+def _post_to_studio(procedure: str, payload: dict[str, Any]) -> None:
+    """Call the tRPC procedure of the studio, retrying up to 3 times with
+    jittered exponential backoff (about 0.25s, 0.5s and 1s)."""
+    data = get_serializer("json").dumps(payload)
     n_retry = 0
     while True:
         try:
             res = requests.post(
-                f"{studio_pre_print_hook.url}/trpc/pushMessageToFridayApp",
-                json={
-                    "replyId": self._reply_id,
-                    "msg": message_data,
-                },
+                f"{studio_pre_print_hook.url}/trpc/{procedure}",
+                data=data,
+                headers={"Content-Type": "application/json"},
             )
             res.raise_for_status()
             break
         except Exception as e:
             if n_retry < 3:
+                time.sleep(random.uniform(0.5, 1.0) * 0.5 * 2**n_retry)
                 n_retry += 1
                 continue
 
             raise e from None
 
 
-def studio_post_reply_hook(self: AgentBase, *args, **kwargs) -> None:
+async def push_to_studio(procedure: str, payload: dict[str, Any]) -> None:
+    """Push the payload to the studio through the realtime channel if it's
+    set (see `StudioConnect`), otherwise by the tRPC procedure of the same
+    name in a worker thread, so that the event loop isn't blocked."""
+    channel = getattr(studio_pre_print_hook, "channel", None)
+    if channel is not None:
+        await channel.send(procedure, payload)
+    else:
+        await asyncio.to_thread(_post_to_studio, procedure, payload)
+
+
+async def studio_pre_print_hook(
+    self: AgentBase,
+    kwargs: dict[str, Any],
+) -> None:
+    """Forward the message to the studio application interface."""
+    msg = kwargs["msg"]
+    message_data = msg.to_dict()
+
+    message_data["content"] = msg.get_content_blocks()
+
+    # Over the realtime channel, the images are pushed once as binary blobs
+    # and referred to by the message, instead of being inlined as base64
+    # into every streamed chunk
+    channel = getattr(studio_pre_print_hook, "channel", None)
+    image_converter = getattr(studio_pre_print_hook, "image_converter", None)
+    if channel is not None and image_converter is not None:
+        message_data["content"], blobs = image_converter.to_references(
+            message_data["content"],
+            f"{studio_pre_print_hook.url}/friday/blobs",
+        )
+        for blob_id, path in blobs.items():
+            await channel.send_blob(blob_id, path)
+
+    await push_to_studio(
+        "pushMessageToFridayApp",
+        {
+            "replyId": self._reply_id,
+            "msg": message_data,
+        },
+    )
+
+
+async def studio_post_reply_hook(self: AgentBase, *args, **kwargs) -> None:
     """Send the finished signal to the studio application interface."""
-    n_retry = 0
-    while True:
-        try:
-            res = requests.post(
-                f"{studio_pre_print_hook.url}/trpc/pushFinishedSignalToFridayApp",
-                json={"replyId": self._reply_id}
-            )
-            res.raise_for_status()
-            break
-        except Exception as e:
-            if n_retry < 3:
-                n_retry += 1
-                continue
+    await push_finished_signal(self)
 
-            raise e from None
+
+async def push_finished_signal(agent: AgentBase) -> None:
+    """Send the finished signal of the agent's reply to the studio."""
+    await push_to_studio(
+        "pushFinishedSignalToFridayApp",
+        {"replyId": agent._reply_id},
+    )
+
+
+async def push_usage_summary(reply_id: str | None, usage: dict) -> None:
+    """Send the token usage summary of a reply (or a debate) to the
+    studio."""
+    await push_to_studio(
+        "pushUsageToFridayApp",
+        {"replyId": reply_id, "usage": usage},
+    )
+
+
+async def push_budget_progress(agent: AgentBase, progress: dict) -> None:
+    """Send the budget consumption of the agent's current turn to the
+    studio."""
+    await push_to_studio(
+        "pushBudgetToFridayApp",
+        {"replyId": agent._reply_id, "budget": progress},
+    )
+
+
+async def push_debate_event(orchestrator: Any, event: dict) -> None:
+    """Send a progress event of the debate (e.g. the round started, a speaker
+    finished, or the judge's verdict) to the studio."""
+    await push_to_studio(
+        "pushDebateEventToFridayApp",
+        {"debateId": orchestrator.debate_id, "event": event},
+    )
@@ -4,37 +4,36 @@ an agent assistant that helps users to deal with their daily tasks locally.
 """
 import asyncio
 import os
-from datetime import datetime
 
-import json5
 from agentscope.agent import ReActAgent
-from agentscope.memory import InMemoryMemory
 from agentscope.message import Msg
-from agentscope.session import JSONSession
-from agentscope.tool import (
-    Toolkit,
-    execute_python_code,
-    execute_shell_command,
-    write_text_file,
-    insert_text_file,
-    view_text_file,
-)
 
 from hook import (
     studio_pre_print_hook,
     studio_post_reply_hook,
+    push_usage_summary,
+    push_budget_progress,
+    push_debate_event,
 )
 from args import get_args
+from assistant import create_friday_agent, create_toolkit
 from model import get_model, get_formatter
-from tool.utils import (
-    view_agentscope_library,
-    view_agentscope_readme,
-    view_agentscope_faq,
-)
+from utils.blob_store import BlobStore
+from utils.budget import TurnBudget
 from utils.common import get_local_file_path
 from utils.connect import StudioConnect
-from utils.constants import FRIDAY_SESSION_ID
+from utils.image_compaction import ImageCompactor
 from utils.image_converter import ImageConverter
+from utils.log import logger, setup_logging
+from utils.memory_profile import (
+    record_memory,
+    start_memory_profiling,
+    stop_memory_profiling,
+)
+from utils.query import load_query
+from utils.serializer import get_serializer
+from utils.session import SessionManager
+from utils.usage import UsageTracker, usage_scope
 
 # 🆕 导入辩论模块 (Import debate module)
 from debate import DebateOrchestrator, DebateConfig
@@ -55,66 +54,119 @@ def _extract_text_from_content(content):
 
 async def main():
     args = get_args()
+    setup_logging(args.logLevel, args.logFile)
 
-    studio_pre_print_hook.url = args.studio_url
+    if args.memoryProfile:
+        start_memory_profiling(args.memoryProfile)
 
-    # Initialize image converter
-    image_converter = ImageConverter()
+    studio_pre_print_hook.url = args.studio_url
 
-    # get model from args
-    model = get_model(args.llmProvider, args.modelName, args.apiKey, args.baseUrl)
+    # The socket is used for realtime steering and pushing messages. It
+    # connects in the background while the models and agents are initialized
+    # targets will be set later
+    socket = StudioConnect(
+        url=args.studio_url,
+        serializer=get_serializer(args.serializer),
+    )
+    socket.start()
+    studio_pre_print_hook.channel = socket
+
+    # Initialize image converter, which exchanges the images with the agent
+    # and the studio as references to the blob store
+    blob_store = BlobStore(get_local_file_path("blobs"))
+    image_converter = ImageConverter(blob_store)
+    studio_pre_print_hook.image_converter = image_converter
+
+    # get model from args, the requests with images in the context go to
+    # the vision model if given
+    model = get_model(
+        args.llmProvider,
+        args.modelName,
+        args.apiKey,
+        args.baseUrl,
+        args.requestsPerMinute,
+        args.tokensPerMinute,
+        args.visionModelName,
+    )
     formatter = get_formatter(args.llmProvider)
 
     # Parse and convert the query content
-    query_content = json5.loads(args.query)
+    # The large base64 images are moved into the blob store while parsing
+    query_content = load_query(args.query, args.query_file, blob_store)
     converted_content = image_converter.convert_content_blocks(query_content)
-    print(f"DEBUG - Converted content: {converted_content}")
+    logger.debug("Converted content: %s", converted_content)
 
     # 🆕 检测辩论模式 (Detect debate mode)
-    is_debate_mode = args.debateMode
-
-    # The socket is used for realtime steering
-    socket = StudioConnect(url=args.studio_url, agent=None)  # agent will be set later
-    await socket.connect()
+    is_debate_mode = args.debateMode or args.resumeDebate
 
     try:
         # 🆕 辩论模式分支 (Debate mode branch)
         if is_debate_mode:
-            print("\n" + "="*60)
-            print("[DEBATE MODE] Multi-Agent Debate Mode")
-            print("="*60 + "\n")
-
-            # 创建辩论配置 (Create debate configuration)
-            debate_topic = args.debateTopic or _extract_text_from_content(converted_content)
-            debate_config = DebateConfig(
-                num_agents=args.debateAgents,
-                max_rounds=args.debateRounds,
-                topic=debate_topic,
-            )
+            logger.info("[DEBATE MODE] Multi-Agent Debate Mode")
+
+            # 每个会话保存最近一场辩论的检查点 (Checkpoint of the latest debate of the session)
+            checkpoint_path = get_local_file_path(f"debate_{args.sessionId}.json")
+
+            # 从上一个完成的轮次继续 (Continue from the last completed round)
+            orchestrator = None
+            if args.resumeDebate:
+                orchestrator = await DebateOrchestrator.from_checkpoint(
+                    checkpoint_path,
+                    model=model,
+                    formatter=formatter,
+                    toolkit=None,
+                    studio_url=args.studio_url,
+                    on_event=push_debate_event,
+                )
+                if orchestrator is None:
+                    logger.info("[RESUME] No debate checkpoint found, starting a new debate")
+
+            if orchestrator is not None:
+                debate_topic = orchestrator.config.topic
+            else:
+                # 创建辩论配置 (Create debate configuration)
+                debate_topic = args.debateTopic or _extract_text_from_content(converted_content)
+                debate_config = DebateConfig(
+                    num_agents=args.debateAgents,
+                    max_rounds=args.debateRounds,
+                    topic=debate_topic,
+                    judge_mode=args.debateJudge,
+                    debater_mode=args.debateDebater,
+                )
 
-            # 创建辩论编排器 (Create debate orchestrator)
-            orchestrator = DebateOrchestrator(
-                config=debate_config,
-                model=model,
-                formatter=formatter,
-                toolkit=None,  # 辩论通常不需要工具 (Debate usually doesn't need tools)
-                studio_url=args.studio_url,
-            )
+                # 创建辩论编排器 (Create debate orchestrator)
+                orchestrator = DebateOrchestrator(
+                    config=debate_config,
+                    model=model,
+                    formatter=formatter,
+                    toolkit=None,  # 辩论通常不需要工具 (Debate usually doesn't need tools)
+                    studio_url=args.studio_url,
+                    checkpoint_path=checkpoint_path,
+                    on_event=push_debate_event,
+                )
+
+            # 中断信号会传递给所有辩论者和裁判，用户也可以接受裁判当前的结论提前结束
+            # (Interrupts reach all debaters and the moderator, and the user may
+            # accept the judge's interim conclusion to stop early)
+            socket.targets.append(orchestrator)
 
             # 运行辩论 (Run debate)
             result = await orchestrator.run_debate(debate_topic)
 
-            print("\n" + "="*60)
-            print("[DEBATE FINISHED] Debate Finished")
-            print(f"[CONCLUSION] Final Conclusion: {result['conclusion']}")
-            print(f"[ROUNDS] Total Rounds: {result['total_rounds']}")
-            print("="*60 + "\n")
+            logger.info(
+                "[DEBATE FINISHED] Conclusion: %s, rounds: %s, usage: %s",
+                result["conclusion"],
+                result["total_rounds"],
+                result["usage"]["total"],
+            )
+
+            await push_usage_summary(
+                orchestrator.moderator._reply_id, result["usage"],
+            )
 
         # 原有单智能体模式 (Original single agent mode)
         else:
-            print("\n" + "="*60)
-            print("[SINGLE AGENT MODE] Standard Mode")
-            print("="*60 + "\n")
+            logger.info("[SINGLE AGENT MODE] Standard Mode")
 
             # Forward message to the studio
             ReActAgent.register_class_hook(
@@ -130,141 +182,71 @@ async def main():
             )
 
             # Init agent
-            toolkit = Toolkit()
-
-            # Basic tools
-            toolkit.register_tool_function(execute_python_code)
-            toolkit.register_tool_function(execute_shell_command)
-            toolkit.register_tool_function(view_text_file)
-            toolkit.register_tool_function(insert_text_file)
-            if args.writePermission:
-                toolkit.register_tool_function(write_text_file)
-
-            # AgentScope tool group
-            toolkit.create_tool_group(
-                group_name="agentscope_tools",
-                description="The AgentScope library related tools that will provide a brief summary and notes about AgentScope in your system prompt, as well as a series of tools to retrieve AgentScope related information.",
-                notes="""# AgentScope Expertise
-## Answer Generation Guidelines
-The solution/code to the user query may already exist in the AgentScope resources, your duty is to show it to the user rather than coding from scratch. Search the following resources in this order:
-1. FAQ using `view_agentscope_faq` tool
-2. README using `view_agentscope_readme` tool
-3. Examples using `execute_shell_command` with command `ls -l` in examples directory (AgentScope has many pre-built examples and they are very helpful)
-4. Python library using `view_agentscope_library` tool in top-down manner (top-module → submodule → specific class/function)
-5. Source code using `view_text_file` tool"""
-            )
-            toolkit.register_tool_function(
-                view_agentscope_library, group_name="agentscope_tools"
-            )
-            toolkit.register_tool_function(
-                view_agentscope_readme, group_name="agentscope_tools"
-            )
-            toolkit.register_tool_function(
-                view_agentscope_faq, group_name="agentscope_tools"
+            toolkit = create_toolkit(
+                args.writePermission,
+                compact_images=args.compactImagesAfterTurns is not None,
             )
-
-            # Function to detect if content contains images
-            def has_images(content):
-                """Check if the content contains any images."""
-                if isinstance(content, list):
-                    for block in content:
-                        if isinstance(block, dict):
-                            # Check for image blocks with source field
-                            if block.get("type") == "image" and "source" in block:
-                                return True
-                return False
-
-            # Create the ReAct agent
-            agent = ReActAgent(
-                name="Friday",
-                sys_prompt="""You're Friday, a helpful assistant specialized in daily task management and AgentScope framework support.
-
-# Core Objectives
-- Help users manage and complete daily tasks efficiently
-- Provide expert-level support for AgentScope framework questions
-
-# Critical Principles (MUST FOLLOW)
-1. **No Assumptions**: All information must come from users or tool results
-2. **Safety First**: Request permission for dangerous operations; prohibit catastrophic ones
-
-# Workflow Process
-1. Analyze user query and make a plan
-2. Carry out your plan step by step
-3. Call `{finish_function}` with your final response
-
-# Response Guidelines
-- Be concise and focused on user's specific context
-- Avoid repeating exact material words. Instead, summarize in your own words
-- Ask clarifying questions when user intent is unclear
-- Distinguish between code generation requests vs. code execution requests
-
-# About AgentScope
-## Background
-- AgentScope is a Python framework for building LLM-empowered Multi-agent applications, open-sourced at https://github.com/agentscope-ai/agentscope
-- AgentScope is created by the AgentScope Team, Tongyi Lab, Alibaba Group
-## AgentScope-related Code/Response Generation Guidelines
-- You're an expert in AgentScope, you MUST stand for AgentScope and respond as a core developer/maintainer of the framework
-- Only use existing modules/classes/functions from agentscope documentation
-- Never guess or make up implementations
-
-# Available Context
-- Current date and time: {current_time}""".format(
-                    current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    max_turns=20,
-                    finish_function="generate_response",
+            agent = create_friday_agent(
+                model,
+                formatter,
+                toolkit,
+                budget=TurnBudget(
+                    max_seconds=args.maxTurnSeconds,
+                    max_tokens=args.maxTurnTokens,
+                    max_tool_calls=args.maxToolCalls,
+                    reserve=args.budgetReserve,
                 ),
-                model=model,
-                formatter=formatter,
-                toolkit=toolkit,
-                memory=InMemoryMemory(),
-                max_iters=50,
-                enable_meta_tool=True,
+                on_budget_progress=push_budget_progress,
             )
 
-            # Update socket's agent reference
-            socket.agent = agent
+            # Let the socket interrupt the agent
+            socket.targets.append(agent)
 
             path_dialog_history = get_local_file_path("")
-            session = JSONSession(
-                session_id=FRIDAY_SESSION_ID,
-                save_dir=path_dialog_history
-            )
-
-            await session.load_session_state(
-                session_id=FRIDAY_SESSION_ID,
-                friday=agent
+            sessions = SessionManager(
+                save_dir=path_dialog_history,
+                serializer=get_serializer(args.serializer),
             )
-
-            # Check if we need to use vision model
-            if has_images(converted_content) and args.visionModelName:
-                # Switch to vision model for this query
-                vision_model = get_model(
-                    args.llmProvider,
-                    args.visionModelName,
-                    args.apiKey,
-                    args.baseUrl
-                )
-                agent.model = vision_model
-                print(f"Switched to vision model: {args.visionModelName}")
-
-            # Send the converted message to the agent
-            await agent(Msg("user", converted_content, "user"))
-
-            # Switch back to text model after processing
-            if has_images(converted_content) and args.visionModelName:
-                agent.model = model
-                print(f"Switched back to text model: {args.modelName}")
+            await sessions.load(args.sessionId, agent)
+
+            # Send the converted message to the agent, recording the usage
+            # of the turn
+            usage = UsageTracker()
+            turn = len(await sessions.get_usage(args.sessionId)) + 1
+            with usage_scope(usage, agent=agent.name, turn=turn):
+                await agent(Msg("user", converted_content, "user"))
+
+                # Compact the images of the older turns before saving, the
+                # captions are counted in the usage of the turn
+                if args.compactImagesAfterTurns is not None:
+                    compacted = await ImageCompactor(
+                        model,
+                        formatter,
+                        keep_turns=args.compactImagesAfterTurns,
+                    ).compact(agent.memory)
+                    if compacted:
+                        logger.info("Compacted images: %d", compacted)
+            record_memory("turn", session=args.sessionId, turn=turn)
 
             # Save dialog history
-            await session.save_session_state(
-                session_id=FRIDAY_SESSION_ID,
-                friday=agent
-            )
+            await sessions.save(args.sessionId, agent, usage=usage.summary())
+            await push_usage_summary(agent._reply_id, usage.summary())
+
+            # Archive the old sessions by the policy
+            if args.maxSessions is not None or args.sessionMaxAgeDays is not None:
+                archived = await sessions.archive(
+                    max_sessions=args.maxSessions,
+                    max_age_days=args.sessionMaxAgeDays,
+                    keep=(args.sessionId,),
+                )
+                if archived:
+                    logger.info("Archived sessions: %s", archived)
 
     finally:
         # Clean up temporary files
         image_converter.cleanup()
         await socket.disconnect()
+        stop_memory_profiling()
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -1,15 +1,11 @@
 # -*- coding: utf-8 -*-
 """Get the formatter and model based on the model provider."""
-from agentscope.formatter import (
-    DashScopeChatFormatter,
-    OpenAIChatFormatter,
-    FormatterBase,
-    OllamaChatFormatter,
-    GeminiChatFormatter,
-    AnthropicChatFormatter,
-)
+from typing import Any, AsyncGenerator
+
+from agentscope.formatter import FormatterBase
 from agentscope.model import (
     ChatModelBase,
+    ChatResponse,
     DashScopeChatModel,
     OpenAIChatModel,
     OllamaChatModel,
@@ -17,27 +13,151 @@ from agentscope.model import (
     AnthropicChatModel,
 )
 
+from utils.formatter_cache import (
+    CachedAnthropicChatFormatter,
+    CachedDashScopeChatFormatter,
+    CachedGeminiChatFormatter,
+    CachedOllamaChatFormatter,
+    CachedOpenAIChatFormatter,
+)
+from utils.rate_limit import RateLimitedChatModel, get_rate_limiter
+
 
 def get_formatter(llmProvider: str) -> FormatterBase:
-    """Get the formatter based on the model provider."""
+    """Get the formatter based on the model provider, which caches the
+    formatted messages across the reasoning iterations."""
     match llmProvider.lower():
         case "dashscope":
-            return DashScopeChatFormatter()
+            return CachedDashScopeChatFormatter()
         case "openai":
-            return OpenAIChatFormatter()
+            return CachedOpenAIChatFormatter()
         case "ollama":
-            return OllamaChatFormatter()
+            return CachedOllamaChatFormatter()
         case "gemini":
-            return GeminiChatFormatter()
+            return CachedGeminiChatFormatter()
         case "anthropic":
-            return AnthropicChatFormatter()
+            return CachedAnthropicChatFormatter()
         case _:
             raise ValueError(
                 f"Unsupported model provider: {llmProvider}. "
             )
 
-def get_model(llmProvider:str, modelName: str, apiKey: str, baseUrl: str = None) -> ChatModelBase:
-    """Get the model instance based on the input arguments."""
+
+def _is_image_part(part: dict) -> bool:
+    """If a content part of a formatted message is an image, in the format
+    of any of the providers."""
+    # OpenAI "image_url", Anthropic "image" and DashScope {"image": ...}
+    if part.get("type") in ("image_url", "image") or "image" in part:
+        return True
+    # Gemini "inline_data" and "file_data", which may be audio or video too
+    for key in ("inline_data", "file_data"):
+        data = part.get(key)
+        if isinstance(data, dict) and str(data.get("mime_type", "")).startswith(
+            "image/",
+        ):
+            return True
+    # The images returned by the tools, e.g. Anthropic "tool_result"
+    content = part.get("content")
+    return isinstance(content, list) and any(
+        isinstance(_, dict) and _is_image_part(_) for _ in content
+    )
+
+
+def has_image_parts(messages: Any) -> bool:
+    """If the formatted messages of a request, i.e. the whole context window
+    including the earlier turns and the tool results, carry any image."""
+    if not isinstance(messages, list):
+        return False
+    for msg in messages:
+        if not isinstance(msg, dict):
+            continue
+        # Ollama keeps the images of a message aside from its content
+        if msg.get("images"):
+            return True
+        for key in ("content", "parts"):
+            parts = msg.get(key)
+            if isinstance(parts, list) and any(
+                isinstance(_, dict) and _is_image_part(_) for _ in parts
+            ):
+                return True
+    return False
+
+
+class VisionRoutingChatModel(ChatModelBase):
+    """A chat model that sends each request to the vision model only if its
+    formatted messages carry images, and the others to the text model. The
+    images of the earlier turns and of the tool results in the context window
+    count as well, and a turn whose later requests no longer see the images
+    goes back to the (faster) text model."""
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        vision_model: ChatModelBase,
+    ) -> None:
+        """Initialize the routing model.
+
+        Args:
+            model (`ChatModelBase`):
+                The text model, for the requests without images.
+            vision_model (`ChatModelBase`):
+                The vision model, for the requests with images. It must be of
+                the same provider, as the messages are formatted once.
+        """
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.vision_model = vision_model
+
+    async def __call__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        messages = kwargs.get("messages", args[0] if args else None)
+        if has_image_parts(messages):
+            return await self.vision_model(*args, **kwargs)
+        return await self.model(*args, **kwargs)
+
+
+def get_model(
+    llmProvider: str,
+    modelName: str,
+    apiKey: str,
+    baseUrl: str = None,
+    requestsPerMinute: float = None,
+    tokensPerMinute: float = None,
+    visionModelName: str = None,
+) -> ChatModelBase:
+    """Get the model instance based on the input arguments. The requests of
+    the models of the same provider and model name share one rate limiter,
+    which also retries the ones rejected with 429 (Too Many Requests) or
+    failed by a transient error, e.g. a 5xx response or a timeout. With
+    a vision model, the requests are routed by `VisionRoutingChatModel`."""
+    model = _create_model(llmProvider, modelName, apiKey, baseUrl)
+    limiter = get_rate_limiter(
+        llmProvider,
+        modelName,
+        requests_per_minute=requestsPerMinute,
+        tokens_per_minute=tokensPerMinute,
+    )
+    model = RateLimitedChatModel(model, limiter)
+    if visionModelName and visionModelName != modelName:
+        model = VisionRoutingChatModel(
+            model,
+            get_model(
+                llmProvider,
+                visionModelName,
+                apiKey,
+                baseUrl,
+                requestsPerMinute,
+                tokensPerMinute,
+            ),
+        )
+    return model
+
+
+def _create_model(llmProvider:str, modelName: str, apiKey: str, baseUrl: str = None) -> ChatModelBase:
+    """Create the model client of the provider."""
 
     match llmProvider.lower():
         case "dashscope":
@@ -47,7 +167,9 @@ def get_model(llmProvider:str, modelName: str, apiKey: str, baseUrl: str = None)
                 stream=True,
             )
         case "openai":
-            client_args = {}
+            # The rate limiter retries the 429s and the transient errors with
+            # backoff instead of the client
+            client_args = {"max_retries": 0}
             if baseUrl:
                 client_args["base_url"] = baseUrl
             return OpenAIChatModel(
@@ -73,6 +195,8 @@ def get_model(llmProvider:str, modelName: str, apiKey: str, baseUrl: str = None)
                 model_name=modelName,
                 api_key=apiKey,
                 stream=True,
+                # Retried by the rate limiter, see the OpenAI client
+                client_args={"max_retries": 0},
             )
         case _:
             raise ValueError(
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""The shared fixtures of the Friday tests, run from the Friday directory by
+`python -m pytest tests`."""
+import os
+import sys
+from typing import Iterator
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.studio_stub import StudioStub  # noqa: E402
+from hook import studio_pre_print_hook  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def local_dir(tmp_path, monkeypatch) -> str:
+    """Keep the local Friday files (sessions, caches, blobs) of each test in
+    its own temporary directory."""
+    home = str(tmp_path / "home")
+    monkeypatch.setenv("HOME", home)
+    monkeypatch.setenv("APPDATA", home)
+    return home
+
+
+@pytest.fixture
+def studio(monkeypatch) -> Iterator[StudioStub]:
+    """A running studio stub, which the HTTP fallback of the hooks posts
+    to."""
+    with StudioStub() as stub:
+        monkeypatch.setattr(studio_pre_print_hook, "url", stub.url, raising=False)
+        yield stub
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""The validation of the command line arguments."""
+import sys
+
+import pytest
+
+from args import get_args, get_batch_args
+
+_MODEL_ARGS = [
+    "--llmProvider",
+    "openai",
+    "--modelName",
+    "gpt-4o",
+    "--apiKey",
+    "sk-test",
+]
+
+
+def _parse(monkeypatch, parse, argv: list[str]):
+    """Parse the arguments as if given on the command line."""
+    monkeypatch.setattr(sys, "argv", ["friday", *argv])
+    return parse()
+
+
+def _get_args(monkeypatch, *argv: str, query: tuple = ("--query", "Hi")):
+    """Parse the arguments of the interactive entry point."""
+    return _parse(
+        monkeypatch,
+        get_args,
+        [
+            "--studio_url",
+            "http://localhost:3000",
+            "--writePermission",
+            "",
+            *query,
+            *_MODEL_ARGS,
+            *argv,
+        ],
+    )
+
+
+def _get_batch_args(monkeypatch, *argv: str):
+    """Parse the arguments of the batch entry point."""
+    return _parse(
+        monkeypatch,
+        get_batch_args,
+        ["--input", "in.jsonl", "--output", "out", *_MODEL_ARGS, *argv],
+    )
+
+
+@pytest.mark.parametrize("parse", [_get_args, _get_batch_args])
+@pytest.mark.parametrize("name", ["--requestsPerMinute", "--tokensPerMinute"])
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_rate_limits_positive(monkeypatch, parse, name: str, value: str) -> None:
+    """The rate limits must be positive in both entry points."""
+    with pytest.raises(SystemExit):
+        parse(monkeypatch, name, value)
+
+
+@pytest.mark.parametrize("parse", [_get_args, _get_batch_args])
+def test_rate_limits(monkeypatch, parse) -> None:
+    """The given rate limits are parsed."""
+    args = parse(
+        monkeypatch,
+        "--requestsPerMinute",
+        "60",
+        "--tokensPerMinute",
+        "10000",
+    )
+    assert (args.requestsPerMinute, args.tokensPerMinute) == (60, 10000)
+
+
+@pytest.mark.parametrize("query", [("--query", "Hi"), ("--query-file", "q.json")])
+def test_debate_topic_from_query(monkeypatch, query: tuple) -> None:
+    """A debate without debateTopic takes its topic from the query, also
+    from a query file, which the studio uses for the large queries."""
+    args = _get_args(monkeypatch, "--debateMode", "true", query=query)
+    assert args.debateMode and not args.debateTopic
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Reading and running the batch items, where an invalid item is reported
+as failed without stopping the batch."""
+import asyncio
+import json
+import sys
+
+import pytest
+
+from args import get_batch_args
+from batch import BatchRunner, _read_items
+from benchmark.fake_model import FakeChatModel, ScriptedJudge
+from utils.blob_store import BlobStore
+
+
+def _runner(monkeypatch, tmp_path, *argv: str) -> BatchRunner:
+    """A batch runner whose model is a fake one."""
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "batch",
+            "--input",
+            str(tmp_path / "in.jsonl"),
+            "--output",
+            str(tmp_path / "out.jsonl"),
+            "--llmProvider",
+            "openai",
+            "--modelName",
+            "gpt-4o",
+            "--apiKey",
+            "sk-test",
+            *argv,
+        ],
+    )
+    runner = BatchRunner(get_batch_args())
+    runner.model = FakeChatModel(judge=ScriptedJudge(finish_at=1))
+    return runner
+
+
+def _run(runner: BatchRunner, tmp_path, lines: list[str]) -> dict:
+    """Run the lines of an input file, returning the records by ID."""
+    with open(tmp_path / "in.jsonl", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    items = _read_items(
+        str(tmp_path / "in.jsonl"),
+        BlobStore(str(tmp_path / "blobs")),
+    )
+    records = asyncio.run(runner.run(items, str(tmp_path / "out.jsonl")))
+
+    with open(tmp_path / "out.jsonl", encoding="utf-8") as f:
+        assert [json.loads(_) for _ in f] == json.loads(
+            json.dumps(records, default=str),
+        )
+    return {_["id"]: _ for _ in records}
+
+
+def test_invalid_lines_failed(monkeypatch, tmp_path) -> None:
+    """The lines that aren't JSON objects are failed items, numbered by
+    their line."""
+    records = _run(
+        _runner(monkeypatch, tmp_path),
+        tmp_path,
+        [
+            "[]",
+            '"x"',
+            "",
+            "{not json",
+            json.dumps({"id": "d", "debate": {"topic": "Is 42 the answer?"}}),
+        ],
+    )
+
+    assert sorted(records) == ["1", "2", "4", "d"]
+    assert records["1"]["status"] == "error"
+    assert "Line 1 isn't a JSON object but list" in records["1"]["error"]
+    assert "Line 2 isn't a JSON object but str" in records["2"]["error"]
+    assert "Line 4 isn't valid JSON" in records["4"]["error"]
+    assert records["d"]["status"] == "ok"
+    assert records["d"]["result"]["finished"] is True
+
+
+@pytest.mark.parametrize(
+    "debate,error",
+    [
+        ({"agents": 1}, "debate.agents must be between 2 and 5"),
+        ({"agents": 6}, "debate.agents must be between 2 and 5"),
+        ({"agents": "3"}, "debate.agents must be between 2 and 5"),
+        ({"rounds": 0}, "debate.rounds must be between 1 and 10"),
+        ({"rounds": 11}, "debate.rounds must be between 1 and 10"),
+    ],
+)
+def test_debate_bounds(monkeypatch, tmp_path, debate: dict, error: str) -> None:
+    """The debate items are bounded the same way as the arguments."""
+    runner = _runner(monkeypatch, tmp_path)
+    records = _run(
+        runner,
+        tmp_path,
+        [json.dumps({"id": "d", "debate": {"topic": "Why?", **debate}})],
+    )
+
+    assert records["d"]["status"] == "error"
+    assert error in records["d"]["error"]
+    assert not runner.model.calls
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [["--debateAgents", "6"], ["--debateRounds", "0"]],
+)
+def test_debate_defaults_bounded(monkeypatch, tmp_path, argv: list) -> None:
+    with pytest.raises(SystemExit):
+        _runner(monkeypatch, tmp_path, *argv)
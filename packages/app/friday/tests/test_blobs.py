@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""The binary data of a query, from the query file through the blob store to
+the studio, which serves it back by its blob ID."""
+import asyncio
+import base64
+import json
+import os
+
+import pytest
+import requests
+
+from utils.blob_store import BlobStore
+from utils.connect import StudioConnect
+from utils.image_converter import ImageConverter
+from utils.query import load_query
+
+_PNG_SIGNATURE = bytes.fromhex("89504e470d0a1a0a")
+
+
+def _write_query(path: str, image: bytes) -> None:
+    """Write a multimodal query with the image inline as base64."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            [
+                {"type": "text", "text": "What's in the image?"},
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": "image/png",
+                        "data": base64.b64encode(image).decode("ascii"),
+                    },
+                },
+            ],
+            f,
+        )
+
+
+def _load_references(
+    tmp_path,
+    image: bytes,
+    base_url: str,
+) -> tuple[list[dict], str, str]:
+    """Load the query into the blob store and refer to its image by the
+    studio URL, returning the blocks, the blob ID and the blob path."""
+    query_file = str(tmp_path / "query.json")
+    _write_query(query_file, image)
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+
+    content = load_query(query_file=query_file, blob_store=blob_store)
+    source = content[1]["source"]
+    assert source["type"] == "url"
+    assert blob_store.is_blob(source["url"])
+    with open(source["url"], "rb") as f:
+        assert f.read() == image
+
+    references, blobs = ImageConverter(blob_store).to_references(
+        content,
+        base_url,
+    )
+    assert references[0] == content[0]
+    assert len(blobs) == 1
+    blob_id, path = next(iter(blobs.items()))
+    assert blob_id.endswith(".png")
+    assert references[1]["source"] == {
+        "type": "url",
+        "url": f"{base_url}/{blob_id}",
+    }
+    return references, blob_id, path
+
+
+def _assert_served(url: str, image: bytes) -> None:
+    """The studio serves the blob with its bytes and media type."""
+    res = requests.get(url)
+    assert res.status_code == 200
+    assert res.headers["Content-Type"].startswith("image/png")
+    assert res.content == image
+
+
+@pytest.mark.parametrize("size_mb", [1, 8])
+def test_query_blob_round_trip(tmp_path, studio, size_mb: int) -> None:
+    """A multi-MB base64 image arrives at the studio over the socket."""
+    image = _PNG_SIGNATURE + os.urandom(size_mb * 1024 * 1024)
+    references, blob_id, path = _load_references(
+        tmp_path,
+        image,
+        f"{studio.url}/friday/blobs",
+    )
+
+    async def _push() -> None:
+        connect = StudioConnect(studio.url)
+        connect.start()
+        await connect.send_blob(blob_id, path)
+        # Pushed once however many messages refer to it
+        await connect.send_blob(blob_id, path)
+        await connect.disconnect()
+
+    asyncio.run(_push())
+
+    assert studio.counts["pushBlobToFridayApp"] == 1
+    assert studio.last_payloads["pushBlobToFridayApp"]["blobId"] == blob_id
+    _assert_served(references[1]["source"]["url"], image)
+
+
+def test_query_blob_http_fallback(tmp_path, studio) -> None:
+    """Without the socket, the blob is posted as base64 over HTTP."""
+    image = _PNG_SIGNATURE + os.urandom(1024 * 1024)
+    references, blob_id, path = _load_references(
+        tmp_path,
+        image,
+        f"{studio.url}/friday/blobs",
+    )
+
+    async def _push() -> None:
+        connect = StudioConnect(studio.url)
+        await connect.send_blob(blob_id, path)
+        await connect.disconnect()
+
+    asyncio.run(_push())
+
+    assert studio.counts["pushBlobToFridayApp"] == 1
+    assert "pushBlobToFridayApp" not in studio.last_payloads
+    _assert_served(references[1]["source"]["url"], image)
+
+
+def test_unknown_blob_not_found(studio) -> None:
+    """The studio doesn't serve the blobs it never received."""
+    res = requests.get(f"{studio.url}/friday/blobs/{'0' * 64}.png")
+    assert res.status_code == 404
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""The per-turn budget of the agent's reasoning-acting loop."""
+import asyncio
+import time
+
+from agentscope.formatter import OpenAIChatFormatter
+from agentscope.memory import InMemoryMemory
+from agentscope.message import ToolUseBlock
+from agentscope.tool import Toolkit, ToolResponse
+
+from assistant import FridayAgent
+from benchmark.fake_model import FakeChatModel
+from tool.coding import execute_shell_command
+from utils.budget import TurnBudget
+from utils.usage import UsageTracker
+
+
+def _started(budget: TurnBudget, elapsed: float = 0) -> TurnBudget:
+    """Start the budget as if the turn began `elapsed` seconds ago."""
+    budget.start(UsageTracker())
+    budget._start -= elapsed
+    return budget
+
+
+def test_unbounded_budget() -> None:
+    """A budget without limits never runs low."""
+    budget = _started(TurnBudget(), elapsed=3600)
+    budget.record_iteration(100)
+
+    assert not budget.enabled
+    assert not budget.is_low()
+    assert budget.remaining_seconds() is None
+
+
+def test_budget_low_before_next_iteration() -> None:
+    """The budget runs low once the next iteration, as long as the mean of
+    the past ones, would cross the reserve."""
+    budget = _started(TurnBudget(max_seconds=10, reserve=0.2), elapsed=5)
+    assert not budget.is_low()
+
+    # 5s + 5s per iteration >= 8s
+    budget.record_iteration(1)
+    assert budget.is_low()
+    assert 2.9 < budget.remaining_seconds() <= 3
+
+
+def test_budget_tool_calls() -> None:
+    """The budget runs low once the tool calls are used up."""
+    budget = _started(TurnBudget(max_tool_calls=3))
+    budget.record_iteration(2)
+    assert not budget.is_low()
+    budget.record_iteration(1)
+    assert budget.is_low()
+
+
+async def _sleep() -> ToolResponse:
+    """Sleep longer than the budget of the turn."""
+    await asyncio.sleep(30)
+    return ToolResponse(content=[])
+
+
+def test_tool_calls_bounded_by_budget() -> None:
+    """The tool calls stop when the time of the turn runs out, by their own
+    timeout if they have one, otherwise by cancelling them."""
+    toolkit = Toolkit()
+    toolkit.register_tool_function(_sleep)
+    toolkit.register_tool_function(execute_shell_command)
+    agent = FridayAgent(
+        name="Friday",
+        sys_prompt="",
+        model=FakeChatModel(),
+        formatter=OpenAIChatFormatter(),
+        toolkit=toolkit,
+        memory=InMemoryMemory(),
+        budget=TurnBudget(max_seconds=1, reserve=0.2),
+    )
+    agent.set_console_output_enabled(False)
+
+    async def _act(name: str, tool_input: dict) -> tuple[float, list]:
+        agent.budget.start(UsageTracker())
+        start = time.perf_counter()
+        await agent._acting(
+            ToolUseBlock(type="tool_use", id=name, name=name, input=tool_input),
+        )
+        msg = (await agent.memory.get_memory())[-1]
+        (result,) = msg.get_content_blocks("tool_result")
+        return time.perf_counter() - start, result["output"]
+
+    elapsed, output = asyncio.run(_act("_sleep", {}))
+    assert elapsed < 5
+    assert "time budget" in output[0]["text"]
+
+    elapsed, output = asyncio.run(
+        _act(
+            "execute_shell_command",
+            {"command": "sleep 30", "timeout": 300},
+        ),
+    )
+    assert elapsed < 5
+    assert "exceeded the timeout of 1 seconds" in output[0]["text"]
+
+
+def test_tool_calls_beyond_budget_skipped() -> None:
+    """The tool calls beyond the limit, e.g. requested at once, are skipped
+    with a result telling the model why, except the finish function."""
+    calls = []
+
+    async def _echo(text: str) -> ToolResponse:
+        """Echo the text."""
+        calls.append(text)
+        return ToolResponse(content=[])
+
+    toolkit = Toolkit()
+    toolkit.register_tool_function(_echo)
+    agent = FridayAgent(
+        name="Friday",
+        sys_prompt="",
+        model=FakeChatModel(),
+        formatter=OpenAIChatFormatter(),
+        toolkit=toolkit,
+        memory=InMemoryMemory(),
+        budget=TurnBudget(max_tool_calls=2),
+    )
+    agent.set_console_output_enabled(False)
+
+    async def _act() -> list:
+        agent.budget.start(UsageTracker())
+        for i in range(3):
+            await agent._acting(
+                ToolUseBlock(
+                    type="tool_use",
+                    id=str(i),
+                    name="_echo",
+                    input={"text": str(i)},
+                ),
+            )
+        await agent._acting(
+            ToolUseBlock(
+                type="tool_use",
+                id="3",
+                name=agent.finish_function_name,
+                input={"response": "Done"},
+            ),
+        )
+        return [
+            msg.get_content_blocks("tool_result")[0]
+            for msg in await agent.memory.get_memory()
+        ]
+
+    results = asyncio.run(_act())
+
+    assert calls == ["0", "1"]
+    assert [_["id"] for _ in results] == ["0", "1", "2", "3"]
+    assert results[2]["output"][0]["text"] == (
+        "<system-info>The tool call was skipped, as the 2 tool calls of this "
+        "turn's budget are used up.</system-info>"
+    )
+    assert "skipped" not in str(results[3]["output"])
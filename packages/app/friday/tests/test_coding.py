@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""The code execution tools, whose subprocesses are stopped and reaped when
+the tool call times out or is cancelled."""
+import asyncio
+
+import pytest
+
+import tool.coding
+from tool.coding import execute_python_code, execute_shell_command
+
+
+def _capture_processes(monkeypatch) -> list:
+    """Record the subprocesses started by the tools."""
+    processes = []
+    create = asyncio.create_subprocess_shell
+
+    async def _create(*args, **kwargs):
+        proc = await create(*args, **kwargs)
+        processes.append(proc)
+        return proc
+
+    monkeypatch.setattr(tool.coding.asyncio, "create_subprocess_shell", _create)
+    return processes
+
+
+def test_timeout_keeps_output() -> None:
+    """The output printed before the timeout is returned."""
+    res = asyncio.run(
+        execute_python_code(
+            "import time\nprint('started', flush=True)\ntime.sleep(30)",
+            timeout=1,
+        ),
+    )
+    text = res.content[0]["text"]
+    assert "<returncode>-1</returncode>" in text
+    assert "<stdout>started\n</stdout>" in text
+    assert "exceeded the timeout of 1 seconds" in text
+
+
+def test_cancelled_process_reaped(monkeypatch) -> None:
+    """The cancelled command is killed and reaped before the cancellation
+    propagates."""
+    processes = _capture_processes(monkeypatch)
+
+    async def _run() -> None:
+        task = asyncio.create_task(execute_shell_command("sleep 30"))
+        while not processes:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # Reaped, without waiting any longer
+        assert processes[0].returncode is not None
+
+    asyncio.run(asyncio.wait_for(_run(), 5))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""The outbox of the studio connection: the pushed data is kept until the
+studio acknowledges saving it, emitted again when it fails to, and posted
+over HTTP as the last resort."""
+import asyncio
+
+from utils.connect import _MAX_RETRIES, StudioConnect
+
+_EVENT = "pushFinishedSignalToFridayApp"
+
+
+async def _push(url: str, payload: dict) -> StudioConnect:
+    """Push the payload over a new connection, then disconnect."""
+    connect = StudioConnect(url)
+    connect.start()
+    await connect.send(_EVENT, payload)
+    await connect.disconnect()
+    return connect
+
+
+def test_acknowledged_data_dropped(studio) -> None:
+    """The data the studio saved is sent once."""
+    connect = asyncio.run(_push(studio.url, {"replyId": "a"}))
+
+    assert studio.counts[_EVENT] == 1
+    assert studio.last_payloads[_EVENT] == {"replyId": "a"}
+    assert not connect._outbox
+    assert not connect._failures
+
+
+def test_failed_save_retried(studio) -> None:
+    """The data the studio failed to save is emitted again over the
+    socket."""
+    studio.n_failures = _MAX_RETRIES - 1
+    connect = asyncio.run(_push(studio.url, {"replyId": "a"}))
+
+    assert studio.counts[_EVENT] == _MAX_RETRIES
+    assert studio.last_payloads[_EVENT] == {"replyId": "a"}
+    assert not connect._outbox
+    assert not connect._failures
+
+
+def test_exhausted_retries_fall_back_to_http(studio) -> None:
+    """The data still failing after the retries is posted over HTTP."""
+    studio.n_failures = _MAX_RETRIES + 1
+    connect = asyncio.run(_push(studio.url, {"replyId": "a"}))
+
+    # The first emit, the retries and the HTTP request
+    assert studio.counts[_EVENT] == _MAX_RETRIES + 2
+    assert _EVENT not in studio.last_payloads
+    assert not connect._outbox
+    assert not connect._failures
+
+
+def test_superseded_snapshots_dropped() -> None:
+    """Only the latest snapshot of a streamed message waits for the
+    connection."""
+
+    async def _send() -> StudioConnect:
+        connect = StudioConnect("http://127.0.0.1:1")
+        for msg_id, content in [("a", "1"), ("b", "1"), ("a", "12")]:
+            await connect.send(
+                "pushMessageToFridayApp",
+                {"msg": {"id": msg_id, "content": content}},
+            )
+        return connect
+
+    connect = asyncio.run(_send())
+
+    assert [payload["msg"] for _, payload in connect._outbox.values()] == [
+        {"id": "b", "content": "1"},
+        {"id": "a", "content": "12"},
+    ]
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""The judge's validation and repair, and resuming a debate from its
+checkpoint."""
+import asyncio
+import copy
+from typing import Any
+
+import pytest
+from agentscope.formatter import OpenAIChatFormatter
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg
+
+from benchmark.fake_model import FakeChatModel, ScriptedJudge
+from debate import (
+    DebateConfig,
+    DebateJudge,
+    DebateOrchestrator,
+    DebaterAgent,
+    JudgeModel,
+)
+
+
+class _EmptyStreamModel(FakeChatModel):
+    """A fake model whose first `n_empty` streams end without any chunk."""
+
+    def __init__(self, n_empty: int, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.n_empty = n_empty
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self.n_empty > 0:
+            self.n_empty -= 1
+            self.calls.append({})
+            return self._empty()
+        return await super().__call__(*args, **kwargs)
+
+    @staticmethod
+    async def _empty() -> Any:
+        return
+        yield
+
+
+def _judge(model: FakeChatModel) -> Msg:
+    """Ask a new judge for one judgment."""
+    judge = DebateJudge(
+        "Moderator",
+        "",
+        model,
+        OpenAIChatFormatter(),
+        memory=InMemoryMemory(),
+    )
+    judge.set_console_output_enabled(False)
+    return asyncio.run(
+        judge(Msg("system", "Judge", "system"), structured_model=JudgeModel),
+    )
+
+
+def test_validate_requires_conclusion() -> None:
+    """A finished judgment must give the conclusion."""
+    with pytest.raises(ValueError):
+        DebateJudge._validate(JudgeModel, {"finished": True, "reasoning": ""})
+    judgment = DebateJudge._validate(
+        JudgeModel,
+        {"finished": True, "correct_answer": "42"},
+    )
+    assert judgment.correct_answer == "42"
+
+
+def test_empty_stream_repaired() -> None:
+    """An empty model stream is repaired like an invalid output."""
+    model = _EmptyStreamModel(1, judge=ScriptedJudge(finish_at=1))
+    reply = _judge(model)
+
+    assert len(model.calls) == 2
+    assert reply.metadata["finished"] is True
+    assert reply.metadata["correct_answer"].startswith("Scripted conclusion")
+
+
+def test_repairs_exhausted() -> None:
+    """Without a valid judgment after the repairs, the debate goes on."""
+    model = _EmptyStreamModel(2)
+    reply = _judge(model)
+
+    assert len(model.calls) == 2
+    assert reply.metadata["finished"] is False
+    assert reply.metadata["correct_answer"] is None
+
+
+def test_resume_from_checkpoint(tmp_path) -> None:
+    """An interrupted debate continues after its last completed round."""
+    checkpoint_path = str(tmp_path / "debate.json")
+
+    async def _interrupt_after_round(
+        orchestrator: DebateOrchestrator,
+        event: dict,
+    ) -> None:
+        if event["type"] == "judge_verdict":
+            await orchestrator.interrupt()
+
+    async def _run() -> tuple[
+        dict, DebateOrchestrator, dict, dict, FakeChatModel
+    ]:
+        orchestrator = DebateOrchestrator(
+            config=DebateConfig(num_agents=2, max_rounds=3),
+            model=FakeChatModel(),
+            formatter=OpenAIChatFormatter(),
+            checkpoint_path=checkpoint_path,
+            on_event=_interrupt_after_round,
+        )
+        interrupted = await orchestrator.run_debate("Is 42 the answer?")
+
+        model = FakeChatModel(judge=ScriptedJudge(finish_at=1))
+        restored = await DebateOrchestrator.from_checkpoint(
+            checkpoint_path,
+            model=model,
+            formatter=OpenAIChatFormatter(),
+        )
+        state = copy.deepcopy(restored.state_dict())
+        result = await restored.run_debate("Is 42 the answer?")
+        return interrupted, restored, state, result, model
+
+    interrupted, restored, state, result, model = asyncio.run(_run())
+
+    assert interrupted["interrupted"] is True
+    assert state["completed_rounds"] == 1
+    assert state["verdict"]["round"] == 1
+    assert [_["round"] for _ in state["history"]] == [1, 1, 1]
+
+    # Only the second round is generated
+    assert len(model.calls) == 3
+    assert result["finished"] is True
+    assert result["total_rounds"] == 2
+    assert [_["round"] for _ in result["history"]] == [1, 1, 1, 2, 2, 2]
+    assert restored.debate_id == state["debate_id"]
+
+
+def test_debater_prints_each_chunk_once() -> None:
+    """A streamed speech prints each chunk once, the last one as such."""
+    debater = DebaterAgent(
+        "Debater_1_Proponent",
+        "",
+        FakeChatModel(reply_tokens=12, tokens_per_chunk=5),
+        OpenAIChatFormatter(),
+        memory=InMemoryMemory(),
+    )
+    printed = []
+
+    async def _print(msg: Msg, last: bool = True) -> None:
+        printed.append((len(msg.get_text_content().split()), last))
+
+    debater.print = _print
+    reply = asyncio.run(debater(Msg("user", "Your speech", "user")))
+
+    assert printed == [(5, False), (10, False), (12, True)]
+    assert len(reply.get_text_content().split()) == 12
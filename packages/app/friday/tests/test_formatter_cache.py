@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""The chat formatters caching the formatted output of each message."""
+import asyncio
+
+import pytest
+from agentscope.formatter import AnthropicChatFormatter, OpenAIChatFormatter
+from agentscope.message import Msg, TextBlock, ToolResultBlock, ToolUseBlock
+
+from utils import formatter_cache
+from utils.formatter_cache import (
+    CachedAnthropicChatFormatter,
+    CachedOpenAIChatFormatter,
+)
+
+
+def _create_msgs(image_path: str) -> list[Msg]:
+    """A conversation with a system prompt, an image, and a tool call."""
+    return [
+        Msg("system", "You're Friday.", "system"),
+        Msg(
+            "user",
+            [
+                TextBlock(type="text", text="What's in the image?"),
+                {
+                    "type": "image",
+                    "source": {"type": "url", "url": image_path},
+                },
+            ],
+            "user",
+        ),
+        Msg(
+            "Friday",
+            [
+                ToolUseBlock(
+                    type="tool_use",
+                    id="call_1",
+                    name="view_image",
+                    input={"path": image_path},
+                ),
+            ],
+            "assistant",
+        ),
+        Msg(
+            "system",
+            [
+                ToolResultBlock(
+                    type="tool_result",
+                    id="call_1",
+                    name="view_image",
+                    output=[TextBlock(type="text", text="A cat.")],
+                ),
+            ],
+            "system",
+        ),
+        Msg("Friday", "A cat.", "assistant"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "cached_cls, cls",
+    [
+        (CachedOpenAIChatFormatter, OpenAIChatFormatter),
+        (CachedAnthropicChatFormatter, AnthropicChatFormatter),
+    ],
+)
+def test_formatter_cache_equivalence(tmp_path, cached_cls, cls) -> None:
+    """The cached formatter gives the same prompt as the formatter, from
+    the cache the next time, and formats a message changed in place
+    again."""
+    image_path = str(tmp_path / "image.png")
+    with open(image_path, "wb") as f:
+        f.write(bytes.fromhex("89504e470d0a1a0a") + b"\0" * 64)
+
+    async def _run() -> None:
+        msgs = _create_msgs(image_path)
+        formatter, cached = cls(), cached_cls()
+        assert await cached.format(msgs) == await formatter.format(msgs)
+        assert await cached.format(msgs) == await formatter.format(msgs)
+        assert cached.n_hits == len(msgs)
+
+        msgs[-1].content = "A dog."
+        n_misses = cached.n_misses
+        assert await cached.format(msgs) == await formatter.format(msgs)
+        assert cached.n_misses == n_misses + 1
+
+    asyncio.run(_run())
+
+
+def test_cache_key_without_rehashing(monkeypatch) -> None:
+    """The messages with an ID aren't serialized and hashed again, the
+    others are cached by the hash of their fields."""
+    hashed, hash_msg = [], formatter_cache._hash_msg
+
+    def _hash_msg(msg: Msg) -> bytes:
+        hashed.append(msg)
+        return hash_msg(msg)
+
+    monkeypatch.setattr(formatter_cache, "_hash_msg", _hash_msg)
+
+    async def _run() -> CachedOpenAIChatFormatter:
+        data = "A" * (4 * 1024 * 1024)
+        msgs = [
+            Msg("system", "You're Friday.", "system"),
+            Msg(
+                "user",
+                [
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "image/png",
+                            "data": data,
+                        },
+                    },
+                ],
+                "user",
+            ),
+        ]
+        cached = CachedOpenAIChatFormatter()
+        for _ in range(3):
+            await cached.format(msgs)
+        assert not hashed
+
+        # Changed in place with the same length
+        msgs[0].content = "You're Monday."
+        await cached.format(msgs)
+
+        msgs[0].id = ""
+        await cached.format(msgs)
+        await cached.format(msgs)
+        return cached
+
+    cached = asyncio.run(_run())
+
+    assert (cached.n_hits, cached.n_misses) == (8, 4)
+    assert len(hashed) == 2
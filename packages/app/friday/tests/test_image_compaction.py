@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""The compaction of the images of the older turns into cached captions."""
+import asyncio
+import json
+import os
+from typing import Any
+
+from agentscope.formatter import OpenAIChatFormatter
+from agentscope.memory import InMemoryMemory
+from agentscope.message import ImageBlock, Msg, TextBlock, ToolResultBlock
+
+from benchmark.fake_model import FakeChatModel
+from tool.image import view_image
+from utils.common import get_local_file_path
+from utils.image_compaction import ImageCompactor
+
+_PNG_SIGNATURE = bytes.fromhex("89504e470d0a1a0a")
+
+
+class _FailingModel(FakeChatModel):
+    """A model that fails every call."""
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls.append({})
+        raise RuntimeError("The model is down")
+
+
+def _blob(name: str) -> ImageBlock:
+    """An image block referring to a new blob."""
+    path = os.path.join(get_local_file_path("blobs"), f"{name}.png")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_PNG_SIGNATURE + name.encode())
+    return ImageBlock(type="image", source={"type": "url", "url": path})
+
+
+def _memory() -> InMemoryMemory:
+    """Three turns with an image each, the first one in a tool result."""
+    memory = InMemoryMemory()
+    asyncio.run(
+        memory.add(
+            [
+                Msg("user", "Draw a chart", "user"),
+                Msg(
+                    "system",
+                    [
+                        ToolResultBlock(
+                            type="tool_result",
+                            id="1",
+                            name="execute_python_code",
+                            output=[_blob("chart")],
+                        ),
+                    ],
+                    "system",
+                ),
+                Msg(
+                    "user",
+                    [TextBlock(type="text", text="And this?"), _blob("photo")],
+                    "user",
+                ),
+                Msg("user", [_blob("latest")], "user"),
+            ],
+        ),
+    )
+    return memory
+
+
+def _compact(model: FakeChatModel, memory: InMemoryMemory) -> int:
+    return asyncio.run(
+        ImageCompactor(
+            model,
+            OpenAIChatFormatter(),
+            keep_turns=1,
+        ).compact(memory),
+    )
+
+
+def test_older_images_compacted() -> None:
+    """The images before the kept turns are replaced by their captions,
+    generated once and shared by the later compactions."""
+    memory = _memory()
+    model = FakeChatModel(stream=False, reply_tokens=3)
+
+    assert _compact(model, memory) == 2
+    assert len(model.calls) == 2
+
+    msgs = asyncio.run(memory.get_memory())
+    (chart,) = msgs[1].content[0]["output"]
+    assert chart["type"] == "text"
+    assert chart["text"].startswith("[Image chart.png, compacted from an")
+    assert "word0 word1 word2" in chart["text"]
+    assert 'image_id="chart.png"' in chart["text"]
+    assert msgs[2].content[0]["text"] == "And this?"
+    assert msgs[2].content[1]["text"].startswith("[Image photo.png")
+    # The latest turn is kept
+    assert msgs[3].content[0]["type"] == "image"
+
+    with open(get_local_file_path("image_captions.json")) as f:
+        assert set(json.load(f)) == {"chart.png", "photo.png"}
+
+    model = FakeChatModel(stream=True)
+    assert _compact(model, _memory()) == 2
+    assert not model.calls
+
+
+def test_failed_caption_keeps_image() -> None:
+    memory = _memory()
+    assert _compact(_FailingModel(), memory) == 0
+    msgs = asyncio.run(memory.get_memory())
+    assert msgs[2].content[1]["type"] == "image"
+
+
+def test_concurrent_captions_merged(tmp_path) -> None:
+    """The captions saved by another process meanwhile aren't lost."""
+    cache_path = str(tmp_path / "captions.json")
+    compactor = ImageCompactor(
+        FakeChatModel(stream=False),
+        OpenAIChatFormatter(),
+        cache_path=cache_path,
+    )
+    compactor._load_captions()
+    with open(cache_path, "w") as f:
+        json.dump({"other.png": "Saved by another process"}, f)
+
+    assert asyncio.run(compactor.caption(_blob("mine")))
+    with open(cache_path) as f:
+        assert set(json.load(f)) == {"other.png", "mine.png"}
+
+
+def test_view_image() -> None:
+    """The compacted image is viewed again by its blob ID."""
+    path = _blob("chart")["source"]["url"]
+    content = view_image(" chart.png ").content
+    assert content[1]["source"] == {"type": "url", "url": path}
+
+    for image_id in ["missing.png", "../blobs/chart.png"]:
+        (block,) = view_image(image_id).content
+        assert "No image with the ID" in block["text"]
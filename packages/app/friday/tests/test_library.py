@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""The paginated listings of AgentScope's library."""
+import re
+
+from tool.utils import _paginate, view_agentscope_library
+
+_ENTRIES = [f"- entry {i}" for i in range(10)]
+
+
+def _text(**kwargs) -> str:
+    """The text of the listing of the given module."""
+    return view_agentscope_library(**kwargs).content[0]["text"]
+
+
+def test_pages_follow_the_cursor() -> None:
+    """Following the cursors lists each entry exactly once."""
+    listed, offset = [], 0
+    while True:
+        page = _paginate("Header", _ENTRIES, offset, 4, 4000, "agentscope")
+        listed += [_ for _ in page.splitlines() if _.startswith("- ")]
+        cursor = re.search(r"offset=(\d+)\.$", page)
+        if cursor is None:
+            break
+        offset = int(cursor.group(1))
+
+    assert listed == _ENTRIES
+    assert page.endswith("Showing 9-10 of 10.")
+
+
+def test_page_within_max_chars() -> None:
+    """A page stops at the character budget, but shows at least one
+    entry."""
+    page = _paginate("Header", _ENTRIES, 0, 10, 30, "agentscope")
+    assert page.splitlines()[1:3] == _ENTRIES[:2]
+    assert "offset=2." in page
+
+    page = _paginate("Header", _ENTRIES, 0, 10, 1, "agentscope")
+    assert page.splitlines()[1] == _ENTRIES[0]
+    assert "offset=1." in page
+
+
+def test_offset_past_the_end() -> None:
+    """An offset past the end says so instead of an empty page."""
+    page = _paginate("Header", _ENTRIES, 10, 4, 4000, "agentscope.tool")
+    assert "No more results: the offset 10 is past the 10 entries" in page
+    assert 'module="agentscope.tool" and offset=0' in page
+
+    text = _text(module="agentscope", offset=1000)
+    assert "No more results: the offset 1000 is past the" in text
+
+
+def test_library_listing() -> None:
+    """The listing of a module is paginated by the limit."""
+    text = _text(module="agentscope.tool", limit=2)
+    entries = [_ for _ in text.splitlines() if _.startswith("- agentscope.")]
+    assert len(entries) == 2
+    assert "Showing 1-2 of" in text and "offset=2." in text
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""The leveled logger, eliding the binary data and the base64 strings."""
+import base64
+import logging
+import os
+from typing import Iterator
+
+import pytest
+from agentscope.message import ImageBlock, Msg, TextBlock
+
+from utils.log import elide, is_console_output_enabled, logger, setup_logging
+
+_DATA = base64.b64encode(os.urandom(3000)).decode("ascii")
+
+
+@pytest.fixture(autouse=True)
+def _restore_logger() -> Iterator[None]:
+    """Restore the logger set up by a test."""
+    handlers, level = logger.handlers[:], logger.level
+    propagate = logger.propagate
+    yield
+    for handler in logger.handlers:
+        handler.close()
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+def test_elide() -> None:
+    """The binary data and the base64 strings are elided, the long strings
+    truncated, and the other values kept."""
+    assert elide(b"\x00" * 10) == "<10 bytes>"
+    assert elide(f"data:image/png;base64,{_DATA}") == (
+        f"<image/png base64, {len(_DATA) + 22} chars>"
+    )
+    assert elide(_DATA) == f"<base64, {len(_DATA)} chars>"
+    assert elide("x " * 150) == f"{'x ' * 100}... (+100 chars)"
+    # A short word isn't taken for base64
+    assert elide("Hello") == "Hello"
+    assert elide({"n": 1, "items": (None, 1.5)}) == {
+        "n": 1,
+        "items": (None, 1.5),
+    }
+
+
+def test_elide_message() -> None:
+    """The inline images of a message are elided, not its text."""
+    msg = Msg(
+        "user",
+        [
+            TextBlock(type="text", text="What's in the image?"),
+            ImageBlock(
+                type="image",
+                source={
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": _DATA,
+                },
+            ),
+        ],
+        "user",
+    )
+
+    elided = elide(msg)
+    assert elided["content"][0]["text"] == "What's in the image?"
+    assert elided["content"][1]["source"]["data"] == (
+        f"<base64, {len(_DATA)} chars>"
+    )
+    # The message itself is unchanged
+    assert msg.content[1]["source"]["data"] == _DATA
+
+
+def test_records_elided_and_leveled(tmp_path) -> None:
+    """The records above the level are written with their arguments elided,
+    the ones below aren't even formatted."""
+
+    class _Unformattable:
+        def __str__(self) -> str:
+            raise AssertionError("Formatted below the level")
+
+    log_file = str(tmp_path / "friday.log")
+    setup_logging("INFO", log_file)
+    logger.debug("Content: %s", _Unformattable())
+    logger.info("Content: %s", {"data": _DATA})
+    for handler in logger.handlers:
+        handler.flush()
+
+    with open(log_file, encoding="utf-8") as f:
+        (line,) = f.read().splitlines()
+    assert "| INFO    |" in line
+    assert f"Content: {{'data': '<base64, {len(_DATA)} chars>'}}" in line
+    assert is_console_output_enabled()
+
+    setup_logging("WARNING")
+    assert not is_console_output_enabled()
+
+
+def test_invalid_level() -> None:
+    with pytest.raises(ValueError):
+        setup_logging("VERBOSE")
+    assert logging.getLogger("friday") is logger
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""The opt-in memory profiling at the turn and round boundaries."""
+import json
+import tracemalloc
+
+from agentscope.message import Msg
+
+from utils import memory_profile
+from utils.memory_profile import (
+    record_memory,
+    start_memory_profiling,
+    stop_memory_profiling,
+)
+
+
+def _read(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(_) for _ in f]
+
+
+def test_not_started() -> None:
+    """Without profiling, recording does nothing."""
+    record_memory("turn", turn=1)
+    assert memory_profile._profiler is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_snapshots(tmp_path) -> None:
+    """A snapshot is appended at each boundary, with the growth and the
+    alive messages."""
+    path = str(tmp_path / "memory.jsonl")
+    start_memory_profiling(path, top=3)
+    try:
+        msgs = [Msg("user", str(i) * 1024, "user") for i in range(100)]
+        record_memory("turn", turn=1)
+    finally:
+        stop_memory_profiling()
+
+    assert memory_profile._profiler is None
+    assert not tracemalloc.is_tracing()
+
+    start, turn, stop = _read(path)
+    assert [_["boundary"] for _ in (start, turn, stop)] == [
+        "start",
+        "turn",
+        "stop",
+    ]
+    assert start["growth"] == [] and start["growth_since_start_kb"] == 0
+    assert turn["labels"] == {"turn": 1}
+    assert turn["growth_since_start_kb"] >= 100
+    assert 0 < len(turn["growth"]) <= 3 and len(turn["top"]) == 3
+    assert turn["objects"]["msgs"] >= len(msgs)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""The memories viewing the message log shared by the debate participants."""
+import asyncio
+
+from agentscope.message import Msg
+
+from utils.message_log import LogMemory, MessageLog
+
+
+async def _ids(memory: LogMemory, **kwargs: str) -> list[str]:
+    """The IDs of the messages in the memory, the log keeps copies."""
+    return [_.id for _ in await memory.get_memory(**kwargs)]
+
+
+def test_log_memory_marks() -> None:
+    """The marks belong to each memory, and deleting by a mark keeps the
+    message in the log and the other memories."""
+
+    async def _run() -> None:
+        log = MessageLog()
+        memory, other = LogMemory(log), LogMemory(log)
+        msg, hint = Msg("user", "Hi", "user"), Msg("user", "Hurry", "user")
+        await memory.add(msg)
+        await memory.add(hint, marks="hint")
+        await other.add([msg, hint])
+
+        assert len(log) == 2
+        assert await _ids(memory, mark="hint") == [hint.id]
+        assert await _ids(memory, exclude_mark="hint") == [msg.id]
+        assert await _ids(other, mark="hint") == []
+
+        assert await memory.update_messages_mark("seen", msg_ids=[msg.id]) == 1
+        assert await _ids(memory, mark="seen") == [msg.id]
+
+        assert await memory.delete_by_mark(["hint"]) == 1
+        assert await _ids(memory) == [msg.id]
+        assert len(log) == 2
+        assert await _ids(other) == [msg.id, hint.id]
+
+        # Adding a message again doesn't duplicate it
+        await memory.add(msg)
+        assert await memory.size() == 1
+
+    asyncio.run(_run())
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Routing each model request to the vision model only when its formatted
+messages carry images."""
+import asyncio
+
+import pytest
+from agentscope.formatter import (
+    AnthropicChatFormatter,
+    DashScopeChatFormatter,
+    GeminiChatFormatter,
+    OllamaChatFormatter,
+    OpenAIChatFormatter,
+)
+from agentscope.message import Msg, TextBlock, ToolResultBlock, ToolUseBlock
+
+from benchmark.fake_model import FakeChatModel
+from model import VisionRoutingChatModel, has_image_parts
+
+_FORMATTERS = [
+    OpenAIChatFormatter,
+    AnthropicChatFormatter,
+    DashScopeChatFormatter,
+    GeminiChatFormatter,
+    OllamaChatFormatter,
+]
+
+
+def _image(path: str) -> dict:
+    """An image block of a local file."""
+    return {"type": "image", "source": {"type": "url", "url": path}}
+
+
+@pytest.fixture
+def image_path(tmp_path) -> str:
+    """A local PNG file."""
+    path = str(tmp_path / "image.png")
+    with open(path, "wb") as f:
+        f.write(bytes.fromhex("89504e470d0a1a0a") + b"\0" * 64)
+    return path
+
+
+def _format(formatter, msgs: list[Msg]) -> list[dict]:
+    """Format the messages by a new formatter."""
+    return asyncio.run(formatter().format(msgs))
+
+
+@pytest.mark.parametrize("formatter", _FORMATTERS)
+def test_image_in_user_message(formatter, image_path: str) -> None:
+    """An image in the context window is found in every provider's
+    format, a text-only context has none."""
+    text = [Msg("user", "Hi", "user"), Msg("Friday", "Hello", "assistant")]
+    with_image = [
+        Msg(
+            "user",
+            [TextBlock(type="text", text="Look"), _image(image_path)],
+            "user",
+        ),
+        *text,
+    ]
+
+    assert not has_image_parts(_format(formatter, text))
+    assert has_image_parts(_format(formatter, with_image))
+
+
+def _tool_result_msgs(image_path: str) -> list[Msg]:
+    """A tool call returning an image."""
+    return [
+        Msg("user", "Show me the image", "user"),
+        Msg(
+            "Friday",
+            [
+                ToolUseBlock(
+                    type="tool_use",
+                    id="call_1",
+                    name="view_image",
+                    input={"path": image_path},
+                ),
+            ],
+            "assistant",
+        ),
+        Msg(
+            "system",
+            [
+                ToolResultBlock(
+                    type="tool_result",
+                    id="call_1",
+                    name="view_image",
+                    output=[_image(image_path)],
+                ),
+            ],
+            "system",
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "formatter",
+    [
+        AnthropicChatFormatter,
+        lambda: OpenAIChatFormatter(promote_tool_result_images=True),
+        lambda: DashScopeChatFormatter(promote_tool_result_images=True),
+        lambda: GeminiChatFormatter(promote_tool_result_images=True),
+        lambda: OllamaChatFormatter(promote_tool_result_images=True),
+    ],
+)
+def test_image_in_tool_result(formatter, image_path: str) -> None:
+    """The images returned by the tools count when they're sent to the
+    model, in the tool result or promoted into a user message."""
+    assert has_image_parts(_format(formatter, _tool_result_msgs(image_path)))
+
+
+def test_tool_result_image_as_text(image_path: str) -> None:
+    """A tool result image the formatter only refers to by its path goes to
+    the text model."""
+    msgs = _tool_result_msgs(image_path)
+    assert not has_image_parts(_format(OpenAIChatFormatter, msgs))
+
+
+@pytest.mark.parametrize(
+    "messages",
+    [None, "Hi", [None, "Hi"], [{"content": "Hi"}]],
+)
+def test_no_image_parts(messages) -> None:
+    """The malformed or text-only messages carry no images."""
+    assert not has_image_parts(messages)
+
+
+def test_route_by_request(image_path: str) -> None:
+    """Each request goes to the vision model only if it carries images."""
+    model = FakeChatModel(stream=False)
+    vision_model = FakeChatModel(stream=False)
+    routing = VisionRoutingChatModel(model, vision_model)
+    text = _format(OpenAIChatFormatter, [Msg("user", "Hi", "user")])
+    with_image = _format(
+        OpenAIChatFormatter,
+        [Msg("user", [_image(image_path)], "user")],
+    )
+
+    async def _run() -> None:
+        await routing(text)
+        await routing(messages=with_image)
+        await routing(text)
+
+    asyncio.run(_run())
+
+    assert len(model.calls) == 2
+    assert len(vision_model.calls) == 1
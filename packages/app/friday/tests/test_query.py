@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Loading the query content from the argument or the query file, with the
+large base64 data moved into the blob store."""
+import base64
+import json
+import os
+
+import pytest
+
+from utils.blob_store import BlobStore
+from utils.query import MIN_BLOB_SIZE, load_query
+
+_PNG = bytes.fromhex("89504e470d0a1a0a") + b"\x01" * MIN_BLOB_SIZE
+
+
+def _image_block(source: dict) -> dict:
+    return {"type": "image", "source": source}
+
+
+def _write(path: str, content) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(content, f)
+    return path
+
+
+def test_query_file_same_as_argument(tmp_path) -> None:
+    """The query file is parsed like the query argument."""
+    content = [{"type": "text", "text": "你好, Friday"}]
+    query_file = _write(str(tmp_path / "query.json"), content)
+
+    assert load_query(query_file=query_file) == content
+    assert load_query(query=json.dumps(content)) == content
+    # The file wins over the argument
+    assert load_query(query='"ignored"', query_file=query_file) == content
+
+
+def test_base64_offloaded(tmp_path) -> None:
+    """The large base64 sources and data URLs refer to the stored blobs,
+    the small ones are kept inline."""
+    data = base64.b64encode(_PNG).decode("ascii")
+    small = base64.b64encode(b"tiny").decode("ascii")
+    query_file = _write(
+        str(tmp_path / "query.json"),
+        [
+            _image_block(
+                {"type": "base64", "media_type": "image/png", "data": data},
+            ),
+            _image_block({"type": "url", "url": f"data:image/png;base64,{data}"}),
+            _image_block(
+                {"type": "base64", "media_type": "image/png", "data": small},
+            ),
+        ],
+    )
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+
+    content = load_query(query_file=query_file, blob_store=blob_store)
+
+    # The same image is stored once
+    assert os.listdir(blob_store.root) == [
+        os.path.basename(content[0]["source"]["url"]),
+    ]
+    for block in content[:2]:
+        assert block["source"]["type"] == "url"
+        with open(block["source"]["url"], "rb") as f:
+            assert f.read() == _PNG
+    assert content[2]["source"]["data"] == small
+
+
+def test_base64_inline_without_blob_store(tmp_path) -> None:
+    """Without a blob store the base64 data stays in the content."""
+    data = base64.b64encode(_PNG).decode("ascii")
+    query_file = _write(
+        str(tmp_path / "query.json"),
+        [
+            _image_block(
+                {"type": "base64", "media_type": "image/png", "data": data},
+            ),
+        ],
+    )
+    assert load_query(query_file=query_file)[0]["source"]["data"] == data
+
+
+def test_relaxed_json() -> None:
+    """The relaxed JSON syntax, e.g. a trailing comma, is accepted."""
+    assert load_query(query="{text: 'Hi',}") == {"text": "Hi"}
+
+
+@pytest.mark.parametrize("raw", ['[{"type": ', "", "not json"])
+def test_malformed_query(tmp_path, raw: str) -> None:
+    """A malformed query raises a ValueError, from the argument or the
+    (maybe empty) file."""
+    query_file = str(tmp_path / "query.json")
+    with open(query_file, "w", encoding="utf-8") as f:
+        f.write(raw)
+
+    with pytest.raises(ValueError):
+        load_query(
+            query_file=query_file,
+            blob_store=BlobStore(str(tmp_path / "blobs")),
+        )
+    if raw:
+        with pytest.raises(ValueError):
+            load_query(query=raw)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""The rate limiter of the model requests, with its token buckets, its AIMD
+concurrency and its retries."""
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from agentscope.message import TextBlock
+from agentscope.model import ChatModelBase, ChatResponse
+
+from utils.rate_limit import (
+    RateLimitedChatModel,
+    RateLimiter,
+    TokenBucket,
+    _is_rate_limited,
+    _is_transient,
+)
+
+
+def test_concurrency_grows_and_shrinks() -> None:
+    """The concurrency grows additively while the latency is low, and
+    shrinks multiplicatively when it surges, once per congestion."""
+    limiter = RateLimiter(initial_concurrency=4, max_concurrency=5)
+    limiter.on_success(1.0)
+    assert limiter.concurrency == 4.25
+
+    for _ in range(20):
+        limiter.on_success(1.0)
+    assert limiter.concurrency == 5
+
+    limiter.on_success(10.0)
+    limiter.on_success(10.0)
+    assert limiter.concurrency == 4
+
+
+def test_rate_limited_backoff() -> None:
+    """A 429 response halves the concurrency, and the retry waits as long as
+    the provider asks."""
+    limiter = RateLimiter(initial_concurrency=8, max_backoff=60)
+    error = SimpleNamespace(
+        status_code=429,
+        response=SimpleNamespace(headers={"retry-after": "3"}),
+    )
+
+    assert limiter.on_rate_limited(error, 0) == 3
+    assert limiter.concurrency == 4
+    assert limiter.n_rate_limited == 1
+
+
+def test_concurrency_slots() -> None:
+    """The requests beyond the concurrency wait for a released slot."""
+    limiter = RateLimiter(initial_concurrency=1)
+
+    async def _run() -> list[str]:
+        order = []
+
+        async def _request(name: str) -> None:
+            await limiter.acquire(1)
+            order.append(f"{name} started")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} finished")
+            limiter.release()
+
+        await asyncio.gather(_request("a"), _request("b"))
+        return order
+
+    assert asyncio.run(_run()) == [
+        "a started",
+        "a finished",
+        "b started",
+        "b finished",
+    ]
+
+
+def test_token_bucket_refill() -> None:
+    """A burst up to the capacity passes at once, the next request waits for
+    the bucket to refill."""
+    bucket = TokenBucket(rate=50, capacity=2)
+
+    async def _run() -> float:
+        await bucket.acquire()
+        await bucket.acquire()
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+
+    assert 0.015 <= asyncio.run(_run()) < 0.5
+
+
+def test_token_bucket_adjust() -> None:
+    """The tokens taken beyond the estimate are owed to the bucket."""
+    bucket = TokenBucket(rate=1000, capacity=1000)
+    bucket.adjust(1500)
+    assert bucket._tokens < 0
+    bucket.adjust(-1e9)
+    assert bucket._tokens == bucket.capacity
+
+
+class _StatusError(Exception):
+    """An error of a provider's HTTP response, without any retry delay."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={"retry-after": "0"})
+
+
+def test_error_classification() -> None:
+    """Only the status code makes a 429, not the digits in the message."""
+    assert _is_rate_limited(_StatusError(429))
+    assert _is_rate_limited(
+        RuntimeError('Failed: {"status_code": 429, "code": "Throttling"}'),
+    )
+    assert not _is_rate_limited(ValueError("Connection refused on port 4291"))
+    assert not _is_rate_limited(_StatusError(400))
+
+    assert _is_transient(_StatusError(503))
+    assert _is_transient(TimeoutError())
+    assert _is_transient(ConnectionResetError())
+    assert not _is_transient(_StatusError(400))
+    assert not _is_transient(ValueError("429 tokens"))
+
+
+class _FailingModel(ChatModelBase):
+    """A model raising the given errors before answering."""
+
+    def __init__(self, errors: list[Exception]) -> None:
+        super().__init__("failing-model", stream=False)
+        self.errors = errors
+        self.n_calls = 0
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> ChatResponse:
+        self.n_calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return ChatResponse(content=[TextBlock(type="text", text="Hi")])
+
+
+def _call(errors: list[Exception], max_retries: int = 5) -> tuple:
+    """Call the rate limited model, returning the wrapped model, the limiter
+    and the response or the raised error."""
+    model = _FailingModel(errors)
+    limiter = RateLimiter(initial_concurrency=4, max_retries=max_retries)
+    try:
+        res = asyncio.run(RateLimitedChatModel(model, limiter)([]))
+    except Exception as e:
+        res = e
+    return model, limiter, res
+
+
+def test_retry_rate_limited_and_transient_errors() -> None:
+    """The 429s halve the concurrency and are retried, the transient errors
+    are retried without changing it."""
+    model, limiter, res = _call([_StatusError(429)])
+    assert isinstance(res, ChatResponse)
+    assert model.n_calls == 2
+    # Halved, then increased by the successful retry
+    assert limiter.concurrency == 2.5
+
+    model, limiter, res = _call([_StatusError(503), _StatusError(504)])
+    assert isinstance(res, ChatResponse)
+    assert model.n_calls == 3
+    assert limiter.n_transient_errors == 2
+    assert limiter.concurrency == 4.25
+    assert limiter.n_active == 0
+
+
+def test_no_retry_on_other_errors() -> None:
+    """The other errors are raised at once, and the retries are bounded."""
+    model, _, res = _call([_StatusError(400)])
+    assert isinstance(res, _StatusError)
+    assert model.n_calls == 1
+
+    model, _, res = _call([ValueError("429")])
+    assert isinstance(res, ValueError)
+    assert model.n_calls == 1
+
+    model, _, res = _call([_StatusError(503)] * 3, max_retries=2)
+    assert isinstance(res, _StatusError)
+    assert model.n_calls == 3
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""The cached JSON schemas of the tool functions."""
+import json
+import os
+from typing import Iterator
+
+import pytest
+from agentscope._utils._common import _parse_tool_function
+from agentscope.tool import Toolkit
+
+import tool.schema_cache
+from tool.schema_cache import get_tool_schemas, register_tools
+from utils.common import get_local_file_path
+
+
+def _add(a: int, b: int = 1) -> int:
+    """Add two numbers.
+
+    Args:
+        a (`int`):
+            The first number.
+        b (`int`, defaults to `1`):
+            The second number.
+    """
+    return a + b
+
+
+@pytest.fixture(autouse=True)
+def _reload_cache() -> Iterator[None]:
+    """Load the cache from the local directory of each test, and don't
+    leave it to the next ones."""
+    load = tool.schema_cache._load_schema_cache
+    if hasattr(load, "cache"):
+        del load.cache
+    yield
+    if hasattr(load, "cache"):
+        del load.cache
+
+
+def _reload() -> dict:
+    """Drop the cache loaded in this process and read the cached file."""
+    del tool.schema_cache._load_schema_cache.cache
+    with open(get_local_file_path("tool_schemas.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _expected(tool_func) -> dict:
+    return _parse_tool_function(
+        tool_func,
+        include_long_description=True,
+        include_var_positional=False,
+        include_var_keyword=False,
+    )
+
+
+def test_cached_schema_matches_toolkit() -> None:
+    """The cached schema is the one the toolkit generates, and is read back
+    from the file without generating it again."""
+    (schema,) = get_tool_schemas([_add])
+    assert schema == _expected(_add)
+
+    cached = _reload()
+    cached["schemas"][f"{__name__}._add"]["schema"]["marker"] = True
+    with open(get_local_file_path("tool_schemas.json"), "w") as f:
+        json.dump(cached, f)
+    (schema,) = get_tool_schemas([_add])
+    assert schema["marker"] is True
+
+    # A copy the toolkit is free to modify
+    schema["marker"] = False
+    assert get_tool_schemas([_add])[0]["marker"] is True
+
+    toolkit = Toolkit()
+    register_tools(toolkit, [_add])
+    assert toolkit.tools["_add"].json_schema["marker"] is True
+
+
+def test_changed_docstring_regenerated(monkeypatch) -> None:
+    """A tool whose docstring changed gets its schema generated again."""
+    get_tool_schemas([_add])
+    monkeypatch.setattr(
+        _add,
+        "__doc__",
+        _add.__doc__.replace("Add two numbers", "Sum up"),
+    )
+
+    (schema,) = get_tool_schemas([_add])
+    assert schema["function"]["description"].startswith("Sum up")
+    assert _reload()["schemas"][f"{__name__}._add"]["schema"] == schema
+
+
+@pytest.mark.parametrize(
+    "field,value",
+    [("format", 0), ("version", "0.0.1"), ("pydantic_version", "1.0")],
+)
+def test_outdated_cache_dropped(field: str, value) -> None:
+    """The cache generated by another format, agentscope or pydantic is
+    dropped as a whole."""
+    get_tool_schemas([_add])
+    cached = _reload()
+    cached[field] = value
+    cached["schemas"]["stale.tool"] = cached["schemas"][f"{__name__}._add"]
+    with open(get_local_file_path("tool_schemas.json"), "w") as f:
+        json.dump(cached, f)
+
+    assert get_tool_schemas([_add])[0] == _expected(_add)
+    cached = _reload()
+    assert cached[field] != value
+    assert list(cached["schemas"]) == [f"{__name__}._add"]
+
+
+def test_corrupted_cache_dropped() -> None:
+    with open(get_local_file_path("tool_schemas.json"), "w") as f:
+        f.write("{")
+    assert get_tool_schemas([_add])[0] == _expected(_add)
+
+
+def test_failed_save_only_warns(monkeypatch) -> None:
+    """The schemas are still returned when they can't be cached."""
+
+    def _fail(*args, **kwargs) -> None:
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(tool.schema_cache, "write_file_atomic", _fail)
+    assert get_tool_schemas([_add])[0] == _expected(_add)
+    assert not os.path.exists(get_local_file_path("tool_schemas.json"))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""The serializers of the studio payloads, the session files and the debate
+checkpoints."""
+import asyncio
+import base64
+
+import pytest
+from agentscope.message import Msg, TextBlock, ToolUseBlock
+
+import utils.serializer
+from utils.serializer import (
+    SERIALIZERS,
+    SocketIOJSON,
+    estimate_size,
+    get_serializer,
+    serialize,
+)
+
+_PAYLOAD = {
+    "text": "你好, Friday 👋",
+    "numbers": [0, -1, 2**53, 1.5, True, False, None],
+    "nested": {"a": [{"b": []}], "empty": {}},
+}
+
+
+@pytest.mark.parametrize("name", list(SERIALIZERS))
+def test_round_trip(name: str) -> None:
+    """The payload and the state of a message come back unchanged."""
+    serializer = get_serializer(name)
+    msg = Msg(
+        "Friday",
+        [
+            TextBlock(type="text", text="Let me check"),
+            ToolUseBlock(type="tool_use", id="1", name="f", input={"x": 1}),
+        ],
+        "assistant",
+        metadata={"usage": {"input_tokens": 10}},
+    )
+
+    data = serializer.dumps({**_PAYLOAD, "msg": msg.to_dict()})
+
+    assert isinstance(data, bytes)
+    loaded = serializer.loads(data)
+    assert {k: v for k, v in loaded.items() if k != "msg"} == _PAYLOAD
+    assert Msg.from_dict(loaded["msg"]).to_dict() == msg.to_dict()
+
+
+def test_binary_data() -> None:
+    """msgpack keeps the binary data as-is, JSON encodes it as base64."""
+    data = bytes(range(256))
+
+    assert get_serializer("msgpack").loads(
+        get_serializer("msgpack").dumps({"data": data}),
+    ) == {"data": data}
+    assert get_serializer("json").loads(
+        get_serializer("json").dumps({"data": data}),
+    ) == {"data": base64.b64encode(data).decode("ascii")}
+
+
+def test_json_without_orjson(monkeypatch) -> None:
+    """The standard library reads and writes the same JSON as orjson."""
+    serializer = get_serializer("json")
+    data = serializer.dumps(_PAYLOAD)
+
+    monkeypatch.setattr(utils.serializer, "orjson", None)
+    assert serializer.loads(data) == _PAYLOAD
+    assert serializer.loads(serializer.dumps(_PAYLOAD)) == _PAYLOAD
+
+
+def test_unknown_serializer() -> None:
+    with pytest.raises(ValueError):
+        get_serializer("pickle")
+
+
+def test_serialize_offloaded() -> None:
+    """A large payload is serialized in a worker thread into the same
+    data."""
+    payload = {"history": ["x" * 1024] * 512}
+    assert estimate_size(payload, limit=1024) > 1024
+
+    data = asyncio.run(serialize(payload, offload_size=1024))
+    assert data == get_serializer("json").dumps(payload)
+
+
+def test_estimate_size_stops_at_limit() -> None:
+    """The estimate stops once the limit is exceeded."""
+    payload = ["x" * 100] * 1000
+    assert 100 < estimate_size(payload, limit=100) <= 300
+    assert estimate_size(payload, limit=10**6) == 100 * 1000
+
+
+def test_socketio_json() -> None:
+    """The socket.io packets are encoded as compact JSON text."""
+    text = SocketIOJSON.dumps(_PAYLOAD, separators=(",", ":"))
+    assert isinstance(text, str)
+    assert SocketIOJSON.loads(text) == _PAYLOAD
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""Saving, loading and archiving the sessions, and the session index shared
+by the Friday processes."""
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+from agentscope.agent import ReActAgent
+from agentscope.formatter import OpenAIChatFormatter
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg
+
+from benchmark.fake_model import FakeChatModel
+from utils.common import file_lock
+from utils.serializer import get_serializer
+from utils.session import NAME_ARCHIVE_DIR, SessionManager
+
+
+def _create_agent() -> ReActAgent:
+    """An agent with an empty memory."""
+    return ReActAgent(
+        name="Friday",
+        sys_prompt="",
+        model=FakeChatModel(),
+        formatter=OpenAIChatFormatter(),
+        memory=InMemoryMemory(),
+    )
+
+
+async def _save(manager: SessionManager, session_id: str) -> None:
+    """Save a session of one message."""
+    agent = _create_agent()
+    await agent.memory.add(Msg("user", f"Hi from {session_id}", "user"))
+    await manager.save(session_id, agent)
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+def test_save_and_load(tmp_path, serializer: str) -> None:
+    """The memory and the usage of all the turns are restored by another
+    process."""
+    save_dir = str(tmp_path / "sessions")
+
+    async def _run() -> tuple[list[Msg], list[dict]]:
+        manager = SessionManager(save_dir, serializer=get_serializer(serializer))
+        agent = _create_agent()
+        for i in range(2):
+            await agent.memory.add(Msg("user", f"Turn {i}", "user"))
+            await manager.save("s", agent, usage={"input_tokens": i})
+
+        restored = _create_agent()
+        other = SessionManager(save_dir, serializer=get_serializer(serializer))
+        await other.load("s", restored)
+        return await restored.memory.get_memory(), await other.get_usage("s")
+
+    msgs, usage = asyncio.run(_run())
+
+    assert [_.content for _ in msgs] == ["Turn 0", "Turn 1"]
+    assert usage == [{"input_tokens": 0}, {"input_tokens": 1}]
+
+
+def _touch_many(save_dir: str, prefix: str) -> None:
+    """Touch the sessions of one process."""
+    manager = SessionManager(save_dir)
+    for i in range(20):
+        manager._touch(f"{prefix}-{i}")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_concurrent_touch(tmp_path) -> None:
+    """The processes updating the index at once don't lose the others'
+    entries."""
+    save_dir = str(tmp_path / "sessions")
+    ctx = multiprocessing.get_context("fork")
+    processes = [
+        ctx.Process(target=_touch_many, args=(save_dir, f"p{i}"))
+        for i in range(8)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    assert len(SessionManager(save_dir).load_index()) == 8 * 20
+    assert [_ for _ in os.listdir(save_dir) if _.endswith(".tmp")] == []
+
+
+def test_archive(tmp_path) -> None:
+    """The least recently used and the stale sessions are archived, except
+    the kept ones."""
+    save_dir = str(tmp_path / "sessions")
+    manager = SessionManager(save_dir)
+
+    async def _save_all() -> None:
+        for i in range(5):
+            await _save(manager, f"s{i}")
+
+    asyncio.run(_save_all())
+
+    # s0 is the least recently used, s4 hasn't been used for 10 days
+    index = manager.load_index()
+    for i in range(5):
+        index[f"s{i}"]["last_access"] = time.time() - 100 + i
+    index["s4"]["last_access"] = time.time() - 10 * 86400
+    with open(manager._get_index_path(), "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    archived = asyncio.run(
+        manager.archive(max_sessions=2, max_age_days=7, keep=("s0",)),
+    )
+
+    assert archived == ["s1", "s2", "s4"]
+    assert sorted(manager.load_index()) == ["s0", "s3"]
+    assert sorted(os.listdir(os.path.join(save_dir, NAME_ARCHIVE_DIR))) == [
+        f"s{i}.json.gz" for i in (1, 2, 4)
+    ]
+    for i in (1, 2, 4):
+        assert not os.path.exists(os.path.join(save_dir, f"s{i}.json"))
+
+
+def test_locked_index_off_event_loop(tmp_path) -> None:
+    """Waiting for the lock of the index held by another process doesn't
+    block the event loop."""
+    save_dir = str(tmp_path / "sessions")
+    manager = SessionManager(save_dir)
+    asyncio.run(_save(manager, "s"))
+
+    locked, release = threading.Event(), threading.Event()
+
+    def _hold_lock() -> None:
+        with file_lock(manager._get_index_path()):
+            locked.set()
+            release.wait(5)
+
+    async def _run() -> int:
+        ticks = 0
+
+        async def _tick() -> None:
+            nonlocal ticks
+            while not release.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_tick())
+        await asyncio.get_running_loop().run_in_executor(None, locked.wait)
+        asyncio.get_running_loop().call_later(0.3, release.set)
+        await manager.load("s", _create_agent())
+        await manager.save("s", _create_agent())
+        await manager.archive(max_sessions=10)
+        await ticker
+        return ticks
+
+    holder = threading.Thread(target=_hold_lock)
+    holder.start()
+    ticks = asyncio.run(_run())
+    holder.join()
+
+    assert ticks >= 10
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""The indexed lookup of AgentScope's source code and examples."""
+import json
+import os
+from typing import Iterator
+
+import pytest
+
+import tool.source_index
+from tool.source_index import get_source_index, search_agentscope_source
+from utils.common import get_local_file_path
+
+_EXAMPLE = '''from agentscope.agent import ReActAgent
+
+agent = ReActAgent(name="Friday")
+'''
+
+
+@pytest.fixture(autouse=True)
+def examples_dir(tmp_path, monkeypatch) -> Iterator[str]:
+    """An examples directory with one example using ReActAgent, and the
+    index built for each test."""
+    path = tmp_path / "examples" / "react"
+    path.mkdir(parents=True)
+    (path / "main.py").write_text(_EXAMPLE, encoding="utf-8")
+    monkeypatch.setenv("AGENTSCOPE_EXAMPLES_DIR", str(tmp_path / "examples"))
+
+    get_index = tool.source_index.get_source_index
+    if hasattr(get_index, "index"):
+        del get_index.index
+    yield str(tmp_path / "examples")
+    if hasattr(get_index, "index"):
+        del get_index.index
+
+
+def _search(name: str, **kwargs) -> str:
+    return search_agentscope_source(name, **kwargs).content[0]["text"]
+
+
+def test_public_path_found_first() -> None:
+    """The public path finds the definition with its snippet, and the
+    examples using it."""
+    text = _search("agentscope.agent.ReActAgent", max_results=1)
+
+    assert "## class agentscope.agent._react_agent.ReActAgent" in text
+    assert "(public as agentscope.agent.ReActAgent)" in text
+    assert "class ReActAgent(" in text
+    source = text.split("- Source: ", 1)[1].split(":", 1)[0]
+    assert os.path.isfile(source)
+    assert "1 example file(s) use 'ReActAgent'" in text
+    assert "    3: agent = ReActAgent(name=\"Friday\")" in text
+
+
+def test_method_found() -> None:
+    text = _search("ReActAgent.reply", max_results=1, include_examples=False)
+    assert "## function agentscope.agent._react_agent.ReActAgent.reply" in text
+    assert "example" not in text
+
+
+def test_unknown_name() -> None:
+    text = _search("NoSuchThing")
+    assert "No definition of 'NoSuchThing' found" in text
+    assert "No example uses 'NoSuchThing'." in text
+
+
+def test_index_cached() -> None:
+    """The index is cached in the local directory and loaded from it."""
+    index = get_source_index()
+    with open(get_local_file_path("agentscope_source_index.json")) as f:
+        assert json.load(f) == index
+
+    del get_source_index.index
+    assert get_source_index() == index
+
+
+def test_index_rebuilt_for_other_examples(monkeypatch) -> None:
+    """The cached index is rebuilt when the examples move."""
+    get_source_index()
+    del get_source_index.index
+    monkeypatch.delenv("AGENTSCOPE_EXAMPLES_DIR")
+    monkeypatch.setattr(tool.source_index, "_find_examples_dir", lambda: None)
+
+    index = get_source_index()
+    assert index["examples_dir"] is None and not index["usages"]
+    assert "No AgentScope examples directory" in _search("ReActAgent")
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""The token usage and latency accounting of the model calls."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agentscope.message import TextBlock
+from agentscope.model import ChatResponse
+from agentscope.model._model_usage import ChatUsage
+
+from benchmark.fake_model import FakeChatModel
+from utils.rate_limit import RateLimitedChatModel, RateLimiter
+from utils.usage import (
+    UsageTracker,
+    get_usage_labels,
+    get_usage_tracker,
+    record_model_usage,
+    usage_scope,
+)
+
+
+def _response(
+    input_tokens: int,
+    output_tokens: int,
+    metadata=None,
+) -> ChatResponse:
+    return ChatResponse(
+        content=[TextBlock(type="text", text="Hi")],
+        usage=ChatUsage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            time=0,
+            metadata=metadata,
+        ),
+    )
+
+
+def test_nested_scopes() -> None:
+    """The nested scopes inherit the tracker and the labels of the outer
+    ones, and restore them on exit."""
+    tracker = UsageTracker()
+    with usage_scope(tracker, turn=1):
+        with usage_scope(agent="Alice", round=1):
+            assert get_usage_labels() == {
+                "turn": 1,
+                "agent": "Alice",
+                "round": 1,
+            }
+            record_model_usage("m", _response(10, 5), 0.1, 0.5)
+        with usage_scope(agent="Bob", round=1):
+            record_model_usage("m", _response(20, 5), None, 1.5)
+        assert get_usage_labels() == {"turn": 1}
+
+    assert get_usage_tracker() is None and get_usage_labels() == {}
+    # Not recorded outside a scope
+    record_model_usage("m", _response(1, 1), None, 1)
+
+    summary = tracker.summary()
+    assert summary["total"] == {
+        "calls": 2,
+        "input_tokens": 30,
+        "output_tokens": 10,
+        "cached_tokens": 0,
+        "mean_ttft": 0.1,
+        "latency": 2.0,
+    }
+    assert summary["by_agent"]["Alice"]["input_tokens"] == 10
+    assert summary["by_agent"]["Bob"]["mean_ttft"] is None
+    assert summary["by_round"]["1"]["calls"] == 2
+    assert list(summary["by_turn"]) == ["1"]
+
+
+@pytest.mark.parametrize(
+    "metadata",
+    [
+        # OpenAI
+        {"prompt_tokens_details": {"cached_tokens": 7}},
+        SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=7)),
+        # Anthropic
+        {"cache_read_input_tokens": 7},
+        # Gemini
+        SimpleNamespace(cached_content_token_count=7),
+    ],
+)
+def test_cached_tokens(metadata) -> None:
+    """The cached prompt tokens are read from the raw usage of each
+    provider."""
+    tracker = UsageTracker()
+    tracker.record("m", _response(10, 5, metadata), None, 1, {})
+    assert tracker.summary()["total"]["cached_tokens"] == 7
+
+
+def test_missing_usage() -> None:
+    """A call without any response or usage still counts."""
+    tracker = UsageTracker()
+    tracker.record("m", None, None, 1, {"agent": "Friday"})
+    assert tracker.summary()["by_agent"]["Friday"] == {
+        "calls": 1,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "mean_ttft": None,
+        "latency": 1,
+    }
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_model_calls_recorded(stream: bool) -> None:
+    """The rate-limited model records its calls with the usage of the last
+    streamed chunk."""
+    model = RateLimitedChatModel(
+        FakeChatModel(stream=stream),
+        RateLimiter(),
+    )
+    tracker = UsageTracker()
+
+    async def _call() -> ChatResponse:
+        with usage_scope(tracker, agent="Friday"):
+            res = await model([{"role": "user", "content": "Hi"}])
+            if stream:
+                async for chunk in res:
+                    pass
+                return chunk
+            return res
+
+    last = asyncio.run(_call())
+
+    (record,) = tracker.records
+    assert record["agent"] == "Friday"
+    assert record["model"] == "fake-model"
+    assert record["input_tokens"] == last.usage.input_tokens > 0
+    assert record["output_tokens"] == last.usage.output_tokens > 0
+    assert record["ttft"] <= record["latency"]
@@ -1,17 +1,26 @@
 # -*- coding: utf-8 -*-
 """Get the signatures of functions and classes in the agentscope library."""
 import inspect
-from typing import Literal
+from typing import Any, Iterator, Literal
 
 import agentscope
 from pydantic import BaseModel
 
 
-def get_class_signature(cls) -> str:
+def _first_line(docstring: str) -> str:
+    """The first non-empty line of a docstring."""
+    for line in docstring.strip().splitlines():
+        if line.strip():
+            return line.strip()
+    return ""
+
+
+def get_class_signature(cls, compact: bool = False) -> str:
     """Get the signature of a class.
 
     Args:
         cls: A class object.
+        compact: Only keep the first line of the docstrings.
 
     Returns:
         str: The signature of the class.
@@ -19,6 +28,8 @@ def get_class_signature(cls) -> str:
     # Obtain class name and docstring
     class_name = cls.__name__
     class_docstring = cls.__doc__ or ""
+    if compact:
+        class_docstring = _first_line(class_docstring)
 
     # Construct the class string
     class_str = f"class {class_name}:\n"
@@ -43,6 +54,8 @@ def get_class_signature(cls) -> str:
 
         # Add the method's docstring if it exists
         method_docstring = method.__doc__ or ""
+        if compact:
+            method_docstring = _first_line(method_docstring)
         if method_docstring:
             method_str += f'        """{method_docstring}"""\n'
 
@@ -51,11 +64,13 @@ def get_class_signature(cls) -> str:
     class_str += "\n".join(methods)
     return class_str
 
-def get_function_signature(func) -> str:
+def get_function_signature(func, compact: bool = False) -> str:
     sig = inspect.signature(func)
     method_str = f"def {func.__name__}{sig}:\n"
 
     method_docstring = func.__doc__ or ""
+    if compact:
+        method_docstring = _first_line(method_docstring)
     if method_docstring:
         method_str += f'   """{method_docstring}"""\n'
 
@@ -99,61 +114,68 @@ def _truncate_docstring(docstring: str, max_length: int = 200) -> str:
         return docstring[:max_length] + "..."
     return docstring
 
-def get_agentscope_module_signatures() -> list[FuncOrCls]:
-    """Get the signatures of functions and classes in the agentscope library.
-    """
-    signatures = []
+def iter_agentscope_public_objects() -> Iterator[tuple[str, Any]]:
+    """Iterate over the public functions and classes of the agentscope
+    library, i.e. the top-level functions and the members listed in the
+    `__all__` of the top-level modules, with their public module paths."""
     for module in agentscope.__all__:
         as_module = getattr(agentscope, module)
         path_module = ".".join(["agentscope", module])
 
         # Functions
         if inspect.isfunction(as_module):
-            file = inspect.getfile(as_module)
-            source_lines, start_line = inspect.getsourcelines(as_module)
+            yield path_module, as_module
+
+        # Modules with __all__ attribute
+        elif hasattr(as_module, "__all__"):
+            for name in as_module.__all__:
+                yield ".".join([path_module, name]), getattr(as_module, name)
+
+
+def get_agentscope_public_objects() -> dict[str, Any]:
+    """Get the public functions and classes of the agentscope library by
+    their public module paths. The mapping is computed once and reused."""
+    if hasattr(get_agentscope_public_objects, "objects"):
+        return get_agentscope_public_objects.objects
+
+    get_agentscope_public_objects.objects = dict(
+        iter_agentscope_public_objects(),
+    )
+    return get_agentscope_public_objects.objects
+
+
+def get_agentscope_module_signatures() -> list[FuncOrCls]:
+    """Get the signatures of functions and classes in the agentscope library.
+    The signatures are computed once and reused.
+    """
+    if hasattr(get_agentscope_module_signatures, "signatures"):
+        return get_agentscope_module_signatures.signatures
+
+    signatures = []
+    for path_func_or_cls, func_or_cls in get_agentscope_public_objects().items():
+        if inspect.isclass(func_or_cls):
             signatures.append(
                 FuncOrCls(
-                    module=path_module,
-                    signature=get_function_signature(as_module),
-                    docstring=_truncate_docstring(as_module.__doc__ or ""),
-                    reference=f"{file}: {start_line}-{start_line + len(source_lines)}",
-                    type="function",
+                    module=path_func_or_cls,
+                    signature=get_class_signature(func_or_cls),
+                    docstring=_truncate_docstring(func_or_cls.__doc__ or ""),
+                    reference=inspect.getfile(func_or_cls),
+                    type="class"
                 )
             )
 
-        else:
-            if not hasattr(as_module, "__all__"):
-                continue
-
-            # Modules with __all__ attribute
-            for name in as_module.__all__:
-                func_or_cls = getattr(as_module, name)
-                path_func_or_cls = ".".join([path_module, name])
-
-                if inspect.isclass(func_or_cls):
-                    file = inspect.getfile(func_or_cls)
-                    source_lines, start_line = inspect.getsourcelines(func_or_cls)
-                    signatures.append(
-                        FuncOrCls(
-                            module=path_func_or_cls,
-                            signature=get_class_signature(func_or_cls),
-                            docstring=_truncate_docstring(func_or_cls.__doc__ or ""),
-                            reference=inspect.getfile(func_or_cls),
-                            type="class"
-                        )
-                    )
-
-                elif inspect.isfunction(func_or_cls):
-                    file = inspect.getfile(func_or_cls)
-                    source_lines, start_line = inspect.getsourcelines(func_or_cls)
-                    signatures.append(
-                        FuncOrCls(
-                            module=path_func_or_cls,
-                            signature=get_function_signature(func_or_cls),
-                            docstring=_truncate_docstring(func_or_cls.__doc__ or ""),
-                            reference=f"{file}: {start_line}-{start_line + len(source_lines)}",
-                            type="function"
-                        )
-                    )
+        elif inspect.isfunction(func_or_cls):
+            file = inspect.getfile(func_or_cls)
+            source_lines, start_line = inspect.getsourcelines(func_or_cls)
+            signatures.append(
+                FuncOrCls(
+                    module=path_func_or_cls,
+                    signature=get_function_signature(func_or_cls),
+                    docstring=_truncate_docstring(func_or_cls.__doc__ or ""),
+                    reference=f"{file}: {start_line}-{start_line + len(source_lines)}",
+                    type="function"
+                )
+            )
 
+    get_agentscope_module_signatures.signatures = signatures
     return signatures
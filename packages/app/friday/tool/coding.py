@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""The code execution tools of Friday. They behave the same as the ones in
+AgentScope, except that the subprocess is stopped when the tool call is
+cancelled, e.g. when the user interrupts the agent."""
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+from typing import Any
+
+import shortuuid
+from agentscope.message import TextBlock
+from agentscope.tool import ToolResponse
+
+
+def _stop_process(proc: asyncio.subprocess.Process) -> None:
+    """Kill the process, together with its children on POSIX systems."""
+    if proc.returncode is not None:
+        return
+    try:
+        if sys.platform != "win32":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def _run_process(
+    proc: asyncio.subprocess.Process,
+    timeout: float,
+    timeout_message: str,
+) -> ToolResponse:
+    """Wait for the process and collect its outputs into a tool response."""
+    # Read the outputs in a separate task, so that what was printed before a
+    # timeout is kept
+    communicate = asyncio.ensure_future(proc.communicate())
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            asyncio.shield(communicate),
+            timeout=timeout,
+        )
+        stdout_str = stdout.decode("utf-8")
+        stderr_str = stderr.decode("utf-8")
+        returncode = proc.returncode
+
+    except asyncio.TimeoutError:
+        returncode = -1
+        _stop_process(proc)
+        stdout, stderr = await communicate
+        stdout_str = stdout.decode("utf-8")
+        stderr_str = stderr.decode("utf-8")
+        if stderr_str:
+            stderr_str += f"\nTimeoutError: {timeout_message}"
+        else:
+            stderr_str = f"TimeoutError: {timeout_message}"
+
+    except asyncio.CancelledError:
+        # Don't leave the process running after the interruption, and reap
+        # it even if the tool call is cancelled again meanwhile
+        _stop_process(proc)
+        communicate.cancel()
+        await asyncio.shield(proc.wait())
+        raise
+
+    return ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text=f"<returncode>{returncode}</returncode>"
+                f"<stdout>{stdout_str}</stdout>"
+                f"<stderr>{stderr_str}</stderr>",
+            ),
+        ],
+    )
+
+
+def _new_session_kwargs() -> dict:
+    """Start the subprocess in a new session on POSIX systems, so that it
+    can be killed together with its children."""
+    if sys.platform != "win32":
+        return {"start_new_session": True}
+    return {}
+
+
+async def execute_shell_command(
+    command: str,
+    timeout: int = 300,
+    **kwargs: Any,
+) -> ToolResponse:
+    """Execute given command and return the return code, standard output and
+    error within <returncode></returncode>, <stdout></stdout> and
+    <stderr></stderr> tags.
+
+    Args:
+        command (`str`):
+            The shell command to execute.
+        timeout (`float`, defaults to `300`):
+            The maximum time (in seconds) allowed for the command to run.
+
+    Returns:
+        `ToolResponse`:
+            The tool response containing the return code, standard output, and
+            standard error of the executed command.
+    """
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **_new_session_kwargs(),
+    )
+    return await _run_process(
+        proc,
+        timeout,
+        f"The command execution exceeded the timeout of {timeout} seconds.",
+    )
+
+
+async def execute_python_code(
+    code: str,
+    timeout: float = 300,
+    **kwargs: Any,
+) -> ToolResponse:
+    """Execute the given python code in a temp file and capture the return
+    code, standard output and error. Note you must `print` the output to get
+    the result, and the tmp file will be removed right after the execution.
+
+    Args:
+        code (`str`):
+            The Python code to be executed.
+        timeout (`float`, defaults to `300`):
+            The maximum time (in seconds) allowed for the code to run.
+
+    Returns:
+        `ToolResponse`:
+            The response containing the return code, standard output, and
+            standard error of the executed code.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_file = os.path.join(temp_dir, f"tmp_{shortuuid.uuid()}.py")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(code)
+
+        env = os.environ.copy()
+        env["PYTHONUTF8"] = "1"
+        env["PYTHONIOENCODING"] = "utf-8"
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-u",
+            temp_file,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            **_new_session_kwargs(),
+        )
+        return await _run_process(
+            proc,
+            timeout,
+            f"The code execution exceeded the timeout of {timeout} seconds.",
+        )
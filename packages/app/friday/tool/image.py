@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""The tool to view an image of an earlier turn again, after its pixels are
+compacted into a caption by `ImageCompactor`."""
+import os
+
+from agentscope.message import ImageBlock, TextBlock
+from agentscope.tool import ToolResponse
+
+from utils.common import get_local_file_path
+
+
+def view_image(image_id: str) -> ToolResponse:
+    """View an image from an earlier turn again, whose content was replaced by a caption in the conversation history. Only call it when the caption isn't enough to answer, e.g. to check details the caption doesn't mention.
+
+    Args:
+        image_id (`str`):
+            The ID of the image, as given in its caption, e.g. "3f2a...9c.png".
+    """
+    image_id = image_id.strip()
+    path = os.path.join(get_local_file_path("blobs"), image_id)
+    if os.path.basename(image_id) != image_id or not os.path.isfile(path):
+        return ToolResponse(
+            content=[
+                TextBlock(
+                    type="text",
+                    text=f"No image with the ID '{image_id}' is found.",
+                ),
+            ],
+        )
+
+    return ToolResponse(
+        content=[
+            TextBlock(type="text", text=f"The image {image_id}:"),
+            ImageBlock(type="image", source={"type": "url", "url": path}),
+        ],
+    )
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""The JSON schemas of the tool functions, cached in the local Friday
+directory.
+
+`Toolkit.register_tool_function` parses the docstring of each tool and
+builds its JSON schema with pydantic, for every toolkit created, i.e. every
+query. The schemas only change with the tools, so they're generated once,
+keyed by a hash of the docstring and the signature of each tool, and passed
+to the toolkit directly afterwards:
+
+    register_tools(toolkit, [execute_python_code, execute_shell_command])
+
+The whole cache is dropped when agentscope or pydantic, which generate the
+schemas, is upgraded."""
+import copy
+import hashlib
+import inspect
+import json
+import os
+from typing import Any, Callable
+
+import agentscope
+import pydantic
+from agentscope._utils._common import _parse_tool_function
+from agentscope.tool import Toolkit
+
+from utils.common import get_local_file_path, write_file_atomic
+from utils.log import logger
+
+# Bump when the layout of the cached schemas changes
+_CACHE_FORMAT = 1
+
+
+def _get_tool_key(tool_func: Callable) -> str:
+    """The key of a tool function in the cache."""
+    return f"{tool_func.__module__}.{tool_func.__qualname__}"
+
+
+def _hash_tool(tool_func: Callable) -> str:
+    """The hash of the parts of a tool function its schema is built from,
+    i.e. its docstring and its signature."""
+    return hashlib.sha256(
+        f"{tool_func.__doc__}\n{inspect.signature(tool_func)}".encode(
+            "utf-8",
+        ),
+    ).hexdigest()
+
+
+def _load_schema_cache() -> dict[str, Any]:
+    """Load the cached schemas once, dropping them if they're generated by
+    another version of agentscope or pydantic."""
+    if hasattr(_load_schema_cache, "cache"):
+        return _load_schema_cache.cache
+
+    cache_path = get_local_file_path("tool_schemas.json")
+    cache = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = None
+
+    if (
+        cache is None
+        or cache.get("format") != _CACHE_FORMAT
+        or cache.get("version") != agentscope.__version__
+        or cache.get("pydantic_version") != pydantic.VERSION
+    ):
+        cache = {
+            "format": _CACHE_FORMAT,
+            "version": agentscope.__version__,
+            "pydantic_version": pydantic.VERSION,
+            "schemas": {},
+        }
+
+    _load_schema_cache.cache = cache
+    return cache
+
+
+def _save_schema_cache() -> None:
+    """Write the cached schemas, replacing the file atomically. The schemas
+    are the same whichever process writes them, and a failed write only
+    costs generating them again, so it doesn't stop the startup."""
+    try:
+        write_file_atomic(
+            get_local_file_path("tool_schemas.json"),
+            json.dumps(_load_schema_cache(), ensure_ascii=False),
+        )
+    except OSError as e:
+        logger.warning("Failed to cache the tool schemas: %s", e)
+
+
+def get_tool_schemas(tool_funcs: list[Callable]) -> list[dict]:
+    """Get the JSON schemas of the tool functions, the same ones as
+    `Toolkit.register_tool_function` generates by default, generating and
+    caching the missing or outdated ones.
+
+    Args:
+        tool_funcs (`list[Callable]`):
+            The tool functions.
+
+    Returns:
+        `list[dict]`:
+            A copy of the schema of each tool function, which the toolkit
+            is free to modify.
+    """
+    schemas = _load_schema_cache()["schemas"]
+    updated = False
+    for tool_func in tool_funcs:
+        key, tool_hash = _get_tool_key(tool_func), _hash_tool(tool_func)
+        if schemas.get(key, {}).get("hash") != tool_hash:
+            schemas[key] = {
+                "hash": tool_hash,
+                "schema": _parse_tool_function(
+                    tool_func,
+                    include_long_description=True,
+                    include_var_positional=False,
+                    include_var_keyword=False,
+                ),
+            }
+            updated = True
+
+    if updated:
+        _save_schema_cache()
+
+    return [
+        copy.deepcopy(schemas[_get_tool_key(_)]["schema"]) for _ in tool_funcs
+    ]
+
+
+def register_tools(
+    toolkit: Toolkit,
+    tool_funcs: list[Callable],
+    group_name: str = "basic",
+) -> None:
+    """Register the tool functions in the toolkit with their cached schemas.
+
+    Args:
+        toolkit (`Toolkit`):
+            The toolkit.
+        tool_funcs (`list[Callable]`):
+            The tool functions.
+        group_name (`str`, defaults to `"basic"`):
+            The group of the tool functions, which must be created first
+            unless it's the basic group.
+    """
+    for tool_func, schema in zip(tool_funcs, get_tool_schemas(tool_funcs)):
+        toolkit.register_tool_function(
+            tool_func,
+            group_name=group_name,
+            json_schema=schema,
+        )
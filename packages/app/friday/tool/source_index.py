@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""A prebuilt index of the installed agentscope library and its examples, so
+that the agent finds where a class or function is defined and which examples
+use it in one tool call, instead of listing directories and viewing whole
+files.
+
+The index holds the files, the definitions with their line ranges, the
+public paths of the definitions (the same ones as
+`get_agentscope_module_signatures`) and the names used by each example. It's
+built with `ast` without importing the indexed code, and cached in the local
+Friday directory by the agentscope version."""
+import ast
+import json
+import os
+from typing import Any
+
+import agentscope
+from agentscope.message import TextBlock
+from agentscope.tool import ToolResponse
+
+from tool.agentscope_tools import iter_agentscope_public_objects
+from utils.common import get_local_file_path, write_file_atomic
+from utils.log import logger
+
+# Bump when the layout of the cached index changes
+_INDEX_FORMAT = 1
+
+# The longest snippet of a definition in lines
+_MAX_SNIPPET_LINES = 30
+
+
+def _find_examples_dir() -> str | None:
+    """Find the examples of agentscope, either given by the
+    `AGENTSCOPE_EXAMPLES_DIR` environment variable, or next to the package
+    if it's installed from a source checkout."""
+    examples_dir = os.getenv("AGENTSCOPE_EXAMPLES_DIR")
+    if examples_dir:
+        return examples_dir if os.path.isdir(examples_dir) else None
+
+    package_dir = os.path.dirname(agentscope.__file__)
+    for parent in (
+        os.path.dirname(package_dir),
+        os.path.dirname(os.path.dirname(package_dir)),
+    ):
+        candidate = os.path.join(parent, "examples")
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def _iter_python_files(root: str) -> list[str]:
+    """List the Python files under the root directory."""
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(
+            _ for _ in dir_names if not _.startswith((".", "__pycache__"))
+        )
+        files.extend(
+            os.path.join(dir_path, _) for _ in sorted(file_names)
+            if _.endswith(".py")
+        )
+    return files
+
+
+def _get_module_name(path: str, package_dir: str) -> str:
+    """The dotted module name of a file of the agentscope package."""
+    relative = os.path.relpath(path, os.path.dirname(package_dir))
+    parts = relative[: -len(".py")].split(os.sep)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _index_definitions(
+    tree: ast.Module,
+    module: str,
+    file_id: int,
+) -> list[dict[str, Any]]:
+    """Collect the classes, functions and methods defined in a module."""
+    definitions = []
+
+    def _visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(
+                child,
+                (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef),
+            ):
+                qualname = f"{prefix}{child.name}"
+                docstring = ast.get_docstring(child) or ""
+                # The header spans the decorators, the signature and the
+                # docstring
+                body_start = child.body[0]
+                header_end = (
+                    body_start.end_lineno
+                    if docstring
+                    else body_start.lineno - 1
+                )
+                definitions.append(
+                    {
+                        "name": child.name,
+                        "qualname": qualname,
+                        "module": module,
+                        "kind": "class"
+                        if isinstance(child, ast.ClassDef)
+                        else "function",
+                        "file": file_id,
+                        "start": min(
+                            [child.lineno]
+                            + [_.lineno for _ in child.decorator_list],
+                        ),
+                        "end": child.end_lineno,
+                        "header_end": max(header_end, child.lineno),
+                        "doc": docstring.split("\n", 1)[0],
+                    },
+                )
+                # Methods, but not the functions nested in functions
+                if isinstance(child, ast.ClassDef):
+                    _visit(child, f"{qualname}.")
+
+    _visit(tree, "")
+    return definitions
+
+
+def _get_used_names(tree: ast.Module) -> list[str]:
+    """Collect the names an example imports and refers to."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.update(alias.name.split("."))
+    return sorted(names)
+
+
+def build_source_index() -> dict[str, Any]:
+    """Build the index of the installed agentscope library and its examples.
+
+    Returns:
+        `dict[str, Any]`:
+            The index, with the indexed "files", the "definitions" referring
+            to the files by position, the "public" paths of the definitions,
+            and the "usages" (the used names) of the examples.
+    """
+    package_dir = os.path.dirname(agentscope.__file__)
+    examples_dir = _find_examples_dir()
+
+    files: list[str] = []
+    definitions: list[dict[str, Any]] = []
+    usages: dict[str, list[str]] = {}
+
+    roots = [(package_dir, False)]
+    if examples_dir:
+        roots.append((examples_dir, True))
+
+    for root, is_example in roots:
+        for path in _iter_python_files(root):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    tree = ast.parse(f.read(), filename=path)
+            except (SyntaxError, UnicodeDecodeError, OSError):
+                continue
+
+            file_id = len(files)
+            files.append(path)
+            if is_example:
+                usages[str(file_id)] = _get_used_names(tree)
+            else:
+                definitions.extend(
+                    _index_definitions(
+                        tree,
+                        _get_module_name(path, package_dir),
+                        file_id,
+                    ),
+                )
+
+    # The public paths, e.g. "agentscope.agent.ReActAgent" for the class
+    # "ReActAgent" in the module "agentscope.agent._react_agent"
+    positions = {
+        (_["module"], _["qualname"]): i for i, _ in enumerate(definitions)
+    }
+    public = {}
+    for path, obj in iter_agentscope_public_objects():
+        position = positions.get(
+            (
+                getattr(obj, "__module__", None),
+                getattr(obj, "__qualname__", None),
+            ),
+        )
+        if position is not None:
+            public[path] = position
+
+    return {
+        "format": _INDEX_FORMAT,
+        "version": agentscope.__version__,
+        "package_dir": package_dir,
+        "examples_dir": examples_dir,
+        "files": files,
+        "definitions": definitions,
+        "public": public,
+        "usages": usages,
+    }
+
+
+def get_source_index() -> dict[str, Any]:
+    """Get the index, loading it from the local cache if it's built for the
+    installed agentscope, otherwise building and caching it."""
+    if hasattr(get_source_index, "index"):
+        return get_source_index.index
+
+    cache_path = get_local_file_path("agentscope_source_index.json")
+    index = None
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+
+    if (
+        index is None
+        or index.get("format") != _INDEX_FORMAT
+        or index.get("version") != agentscope.__version__
+        or index.get("package_dir") != os.path.dirname(agentscope.__file__)
+        or index.get("examples_dir") != _find_examples_dir()
+    ):
+        index = build_source_index()
+        # The index is the same whichever process writes it, and a failed
+        # write only costs building it again
+        try:
+            write_file_atomic(cache_path, json.dumps(index))
+        except OSError as e:
+            logger.warning("Failed to cache the source index: %s", e)
+
+    get_source_index.index = index
+    return index
+
+
+def _read_lines(path: str, start: int, end: int) -> list[str]:
+    """Read the lines from start to end (1-based and inclusive)."""
+    lines = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no > end:
+                break
+            if line_no >= start:
+                lines.append(line.rstrip("\n"))
+    return lines
+
+
+def _match_definitions(index: dict[str, Any], name: str) -> list[int]:
+    """Find the definitions of the name, ranked from the exact public path
+    or qualified name to the case-insensitive partial matches."""
+    definitions = index["definitions"]
+    lowered = name.lower()
+    short = name.rsplit(".", 1)[-1]
+
+    ranked: dict[int, int] = {}
+    if name in index["public"]:
+        ranked[index["public"][name]] = 0
+    for i, definition in enumerate(definitions):
+        full = f"{definition['module']}.{definition['qualname']}"
+        if name in (full, definition["qualname"]):
+            rank = 1
+        elif full.endswith(f".{name}") or definition["name"] == short:
+            rank = 2
+        elif lowered in definition["qualname"].lower():
+            rank = 3
+        else:
+            continue
+        ranked.setdefault(i, rank)
+
+    # The public classes and functions before the private ones
+    return sorted(
+        ranked,
+        key=lambda i: (
+            ranked[i],
+            definitions[i]["qualname"].rsplit(".", 1)[-1].startswith("_"),
+            definitions[i]["module"].count("._"),
+            len(definitions[i]["qualname"]),
+        ),
+    )
+
+
+def search_agentscope_source(
+    name: str,
+    max_results: int = 3,
+    include_examples: bool = True,
+) -> ToolResponse:
+    """Find where a class, function or method of AgentScope is defined and which examples use it in one call, returning the file paths, the line ranges and the relevant snippets (signature and docstring) only. Prefer this tool over listing directories or viewing whole source files.
+
+    Args:
+        name (`str`):
+            The name to look up, e.g. "ReActAgent", "ReActAgent.reply", or the public path "agentscope.agent.ReActAgent". A partial name finds the definitions containing it.
+        max_results (`int`, defaults to `3`):
+            The maximum number of definitions and of examples to return.
+        include_examples (`bool`, defaults to `True`):
+            Whether to list the examples using the name.
+    """
+    name = name.strip()
+    if not name:
+        return ToolResponse(
+            content=[
+                TextBlock(
+                    type="text",
+                    text="The name to look up is empty.",
+                ),
+            ],
+        )
+
+    index = get_source_index()
+    files = index["files"]
+    definitions = index["definitions"]
+    public_paths = {}
+    for path, position in index["public"].items():
+        public_paths.setdefault(position, path)
+
+    matches = _match_definitions(index, name)
+    sections = []
+    if matches:
+        sections.append(
+            f"Found {len(matches)} definition(s) of '{name}', showing "
+            f"{min(len(matches), max_results)}:",
+        )
+    else:
+        sections.append(f"No definition of '{name}' found in AgentScope.")
+
+    for position in matches[:max_results]:
+        definition = definitions[position]
+        path = files[definition["file"]]
+        end = min(
+            definition["header_end"],
+            definition["start"] + _MAX_SNIPPET_LINES - 1,
+        )
+        snippet = "\n".join(_read_lines(path, definition["start"], end))
+        if end < definition["end"]:
+            snippet += "\n    ..."
+
+        title = f"{definition['module']}.{definition['qualname']}"
+        if position in public_paths:
+            title += f" (public as {public_paths[position]})"
+        sections.append(
+            f"## {definition['kind']} {title}\n"
+            f"- Source: {path}: {definition['start']}-{definition['end']}\n"
+            f"```python\n{snippet}\n```",
+        )
+
+    if include_examples:
+        short = name.rsplit(".", 1)[-1]
+        if index["examples_dir"] is None:
+            sections.append(
+                "No AgentScope examples directory is available locally, set "
+                "the AGENTSCOPE_EXAMPLES_DIR environment variable to index "
+                "them.",
+            )
+        else:
+            examples = [
+                files[int(file_id)]
+                for file_id, names in index["usages"].items()
+                if short in names
+            ]
+            if not examples:
+                sections.append(f"No example uses '{short}'.")
+            else:
+                lines = [
+                    f"{len(examples)} example file(s) use '{short}', "
+                    f"showing {min(len(examples), max_results)}:",
+                ]
+                for path in examples[:max_results]:
+                    lines.append(f"- {path}")
+                    with open(path, "r", encoding="utf-8") as f:
+                        occurrences = [
+                            (line_no, line.strip())
+                            for line_no, line in enumerate(f, start=1)
+                            if short in line
+                        ]
+                    for line_no, line in occurrences[:3]:
+                        lines.append(f"    {line_no}: {line}")
+                sections.append("\n".join(lines))
+
+    return ToolResponse(
+        content=[
+            TextBlock(
+                type="text",
+                text="\n\n".join(sections),
+            ),
+        ],
+    )
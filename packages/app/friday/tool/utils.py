@@ -5,7 +5,13 @@ import requests
 from agentscope.message import TextBlock
 from agentscope.tool import ToolResponse
 
-from tool.agentscope_tools import get_agentscope_module_signatures
+from tool.agentscope_tools import (
+    _first_line,
+    get_agentscope_module_signatures,
+    get_agentscope_public_objects,
+    get_class_signature,
+    get_function_signature,
+)
 
 
 def view_agentscope_readme() -> ToolResponse:
@@ -66,16 +72,66 @@ def view_agentscope_faq() -> ToolResponse:
         ]
     )
 
+def _paginate(
+    header: str,
+    entries: list[str],
+    offset: int,
+    limit: int,
+    max_chars: int,
+    module: str,
+) -> str:
+    """Render a page of the entries within the limit and the character
+    budget, ending with the cursor of the next page if there are more."""
+    if offset >= len(entries):
+        return (
+            f"{header}\nNo more results: the offset {offset} is past the "
+            f"{len(entries)} entries, call this function with "
+            f"module=\"{module}\" and offset=0 to start over."
+        )
+
+    lines = [header]
+    n_chars = len(header)
+    end = offset
+    for entry in entries[offset : offset + limit]:
+        # Always show at least one entry
+        if end > offset and n_chars + len(entry) + 1 > max_chars:
+            break
+        lines.append(entry)
+        n_chars += len(entry) + 1
+        end += 1
+
+    if end < len(entries):
+        lines.append(
+            f"Showing {offset + 1}-{end} of {len(entries)}. More results: "
+            f"call this function with module=\"{module}\" and offset={end}."
+        )
+    elif offset > 0:
+        lines.append(f"Showing {offset + 1}-{end} of {len(entries)}.")
+    return "\n".join(lines)
+
+
 def view_agentscope_library(
-    module: str = "agentscope"
+    module: str = "agentscope",
+    limit: int = 20,
+    offset: int = 0,
+    max_chars: int = 4000,
+    detailed: bool = False,
 ) -> ToolResponse:
     """View AgentScope's Python library by given a module name (e.g. agentscope), and return the module's submodules, classes, and functions. Given a class name, return the class's documentation, methods, and their signatures. Given a function name, return the function's documentation and signature. If you don't have any information about AgentScope library, try to use "agentscope" to view the available top modules.
 
-    Note this function only provide the module's brief information. For more information, you should view the source code.
+    Note this function only provide the module's brief information. For more information, you should view the source code. The listings are paginated, call again with the given offset to view more results.
 
     Args:
         module (`str`):
             The module name to view, which should be a module path separated by dots (e.g. "agentscope.models"). It can refer to a module, a class, or a function.
+        limit (`int`, defaults to `20`):
+            The maximum number of the listed modules, classes or functions.
+        offset (`int`, defaults to `0`):
+            The number of the listed entries to skip, i.e. the cursor given by the previous call.
+        max_chars (`int`, defaults to `4000`):
+            The maximum number of characters of the output.
+        detailed (`bool`, defaults to `False`):
+            Whether to show the full docstrings instead of their first lines.
     """
     if not module.startswith("agentscope"):
         return ToolResponse(
@@ -89,6 +145,13 @@ def view_agentscope_library(
             ]
         )
 
+    limit = max(limit, 1)
+    offset = max(offset, 0)
+
+    def _describe(docstring: str | None) -> str:
+        docstring = docstring or ""
+        return repr(docstring.strip()) if detailed else _first_line(docstring)
+
     agentscope_top_modules = {}
     for as_module in agentscope.__all__:
         if as_module in ["__version__", "logger"]:
@@ -98,15 +161,20 @@ def view_agentscope_library(
     # top modules
     if module == "agentscope":
         top_modules_description = [
-            "The top-level modules in AgentScope library:"
-        ] + [
-            f"- agentscope.{k}: {v}" for k, v in agentscope_top_modules.items()
-        ] + ["You can further view the classes/function within above modules by calling this function with the above module name."]
+            f"- agentscope.{k}: {_describe(v)}" for k, v in agentscope_top_modules.items()
+        ]
         return ToolResponse(
             content=[
                 TextBlock(
                     type="text",
-                    text="\n".join(top_modules_description)
+                    text=_paginate(
+                        "The top-level modules in AgentScope library:",
+                        top_modules_description,
+                        offset,
+                        limit,
+                        max_chars,
+                        module,
+                    ) + "\nYou can further view the classes/function within above modules by calling this function with the above module name."
                 )
             ]
         )
@@ -115,15 +183,28 @@ def view_agentscope_library(
     modules = get_agentscope_module_signatures()
     for as_module in modules:
         if as_module.module == module:
+            signature = as_module.signature
+            if not detailed:
+                func_or_cls = get_agentscope_public_objects()[module]
+                if as_module.type == "class":
+                    signature = get_class_signature(func_or_cls, compact=True)
+                else:
+                    signature = get_function_signature(func_or_cls, compact=True)
+                signature = signature.strip()
+
+            truncated = ""
+            if len(signature) > max_chars:
+                signature = signature[:max_chars]
+                truncated = "\n- The signature is truncated, view the source code by the reference for the rest."
             return ToolResponse(
                 content=[
                     TextBlock(
                         type="text",
                         text=f"""- The signature of '{module}':
 ```python
-{as_module.signature}
+{signature}
 ```
-- Source code reference: {as_module.reference}"""
+- Source code reference: {as_module.reference}{truncated}"""
                     )
                 ]
             )
@@ -135,17 +216,20 @@ def view_agentscope_library(
             collected_modules.append(as_module)
 
     if len(collected_modules) > 0:
-        collected_modules_content = [
-            f"The classes/functions and their truncated docstring in '{module}' module:"
-        ] + [f"- {_.module}: {repr(_.docstring)}" for _ in collected_modules] + [
-            "The docstring is truncated for limited context. For detailed signature and methods, call this function with the above module name"
-        ]
+        collected_modules_content = _paginate(
+            f"The classes/functions and their {'truncated docstring' if detailed else 'brief description'} in '{module}' module:",
+            [f"- {_.module}: {_describe(_.docstring)}" for _ in collected_modules],
+            offset,
+            limit,
+            max_chars,
+            module,
+        )
 
         return ToolResponse(
             content=[
                 TextBlock(
                     type="text",
-                    text="\n".join(collected_modules_content)
+                    text=collected_modules_content + "\nFor detailed signature and methods, call this function with the above module name"
                 )
             ]
         )
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""A content-addressed store of the binary data (e.g. images) of Friday's
+messages in the local Friday data directory. The messages refer to the
+stored files by their local paths, which the AgentScope formatters read
+when sending them to the model, so the sessions don't keep the base64 data
+inline."""
+import binascii
+import hashlib
+import os
+import tempfile
+from typing import Iterable, Iterator
+
+import filetype
+
+# The number of base64 characters decoded at a time, a multiple of 4
+_CHUNK_SIZE = 4 * 64 * 1024
+
+
+class BlobStore:
+    """The blob store, where each blob is a file named by the SHA-256 of its
+    content, so the same image sent twice is stored once."""
+
+    def __init__(self, root: str) -> None:
+        """Initialize the blob store.
+
+        Args:
+            root (`str`):
+                The directory of the blobs.
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _write(self, chunks: Iterable[bytes]) -> str:
+        """Write the chunks of a blob into the store, naming it by the hash
+        of its content and the extension of its detected file type."""
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        head = b""
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    if not head:
+                        head = chunk[:512]
+                    digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        kind = filetype.guess(head)
+        extension = f".{kind.extension}" if kind is not None else ".bin"
+        path = os.path.join(self.root, digest.hexdigest() + extension)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return path
+
+    def put_base64(self, data: str | bytes | memoryview) -> str:
+        """Decode the base64 data into the store chunk by chunk, without
+        holding the decoded content in memory.
+
+        Args:
+            data (`str | bytes | memoryview`):
+                The base64 encoded data, e.g. a slice of the memory-mapped
+                query file.
+
+        Returns:
+            `str`:
+                The path of the stored blob, with the extension of its
+                detected file type.
+        """
+        if isinstance(data, str):
+            data = data.encode("ascii")
+        return self._write(
+            binascii.a2b_base64(bytes(data[start : start + _CHUNK_SIZE]))
+            for start in range(0, len(data), _CHUNK_SIZE)
+        )
+
+    def put_file(self, path: str) -> str:
+        """Copy a local file into the store, unless it's a blob already.
+
+        Args:
+            path (`str`):
+                The path of the local file.
+
+        Returns:
+            `str`:
+                The path of the stored blob.
+        """
+        if self.is_blob(path):
+            return path
+
+        def _read() -> Iterator[bytes]:
+            with open(path, "rb") as f:
+                while chunk := f.read(_CHUNK_SIZE):
+                    yield chunk
+
+        return self._write(_read())
+
+    def is_blob(self, path: str) -> bool:
+        """Whether the path is a blob of the store."""
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(
+            self.root,
+        ) and os.path.isfile(path)
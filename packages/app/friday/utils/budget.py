@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""The per-turn budget of the agent's reasoning-acting loop, limiting the
+wall-clock time, the model tokens and the tool calls of one reply.
+
+The budget is latency-aware: it runs low once the next iteration, estimated
+by the mean of the past ones, would cross the reserve kept for the final
+response, so the agent is forced to respond before the budget is exceeded
+rather than after."""
+import time
+from typing import Any
+
+from utils.usage import UsageTracker
+
+
+class TurnBudget:
+    """The budget of one turn. A limit of None is unbounded."""
+
+    def __init__(
+        self,
+        max_seconds: float | None = None,
+        max_tokens: int | None = None,
+        max_tool_calls: int | None = None,
+        reserve: float = 0.2,
+    ) -> None:
+        """Initialize the budget.
+
+        Args:
+            max_seconds (`float | None`, optional):
+                The wall-clock time of the turn in seconds.
+            max_tokens (`int | None`, optional):
+                The input and output tokens of the model calls of the turn.
+            max_tool_calls (`int | None`, optional):
+                The number of the tool calls of the turn.
+            reserve (`float`, defaults to `0.2`):
+                The fraction of the time and the tokens kept for the final
+                response.
+        """
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.max_tool_calls = max_tool_calls
+        self.reserve = reserve
+
+        self._start = time.perf_counter()
+        self._tracker: UsageTracker | None = None
+        self._first_record = 0
+        self.iterations = 0
+        self.tool_calls = 0
+        self.executed_tool_calls = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set."""
+        return any(
+            _ is not None
+            for _ in (self.max_seconds, self.max_tokens, self.max_tool_calls)
+        )
+
+    def start(self, tracker: UsageTracker) -> None:
+        """Start the budget of a new turn, counting the tokens of the model
+        calls recorded into the tracker from now on."""
+        self._start = time.perf_counter()
+        self._tracker = tracker
+        self._first_record = len(tracker.records)
+        self.iterations = 0
+        self.tool_calls = 0
+        self.executed_tool_calls = 0
+
+    @property
+    def elapsed(self) -> float:
+        """The time spent in the turn in seconds."""
+        return time.perf_counter() - self._start
+
+    @property
+    def tokens(self) -> int:
+        """The tokens spent in the turn."""
+        if self._tracker is None:
+            return 0
+        return sum(
+            _["input_tokens"] + _["output_tokens"]
+            for _ in self._tracker.records[self._first_record :]
+        )
+
+    def remaining_seconds(self) -> float | None:
+        """The time left before the reserve kept for the final response, or
+        None without a time limit."""
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds * (1 - self.reserve) - self.elapsed)
+
+    def record_iteration(self, n_tool_calls: int) -> None:
+        """Record a finished reasoning step and the tool calls it made."""
+        self.iterations += 1
+        self.tool_calls += n_tool_calls
+
+    def acquire_tool_call(self) -> bool:
+        """Count a tool call about to be executed. False if the tool calls
+        of the turn are used up, in which case it mustn't be executed, e.g.
+        the ones beyond the limit requested in a single reasoning step."""
+        if (
+            self.max_tool_calls is not None
+            and self.executed_tool_calls >= self.max_tool_calls
+        ):
+            return False
+        self.executed_tool_calls += 1
+        return True
+
+    def is_low(self) -> bool:
+        """Whether the agent should respond now. True if the next iteration
+        is expected to cross the reserve of the time or the tokens, or the
+        tool calls are used up."""
+        if not self.enabled:
+            return False
+
+        if (
+            self.max_tool_calls is not None
+            and self.tool_calls >= self.max_tool_calls
+        ):
+            return True
+
+        def _expected(spent: float) -> float:
+            # The spent amount after the next iteration, which costs the mean
+            # of the past ones
+            if self.iterations == 0:
+                return spent
+            return spent + spent / self.iterations
+
+        if self.max_seconds is not None and _expected(
+            self.elapsed,
+        ) >= self.max_seconds * (1 - self.reserve):
+            return True
+
+        if self.max_tokens is not None and _expected(
+            self.tokens,
+        ) >= self.max_tokens * (1 - self.reserve):
+            return True
+
+        return False
+
+    def progress(self) -> dict[str, Any]:
+        """The consumption of the budget, e.g. to show in the studio."""
+        return {
+            "elapsed": round(self.elapsed, 3),
+            "max_seconds": self.max_seconds,
+            "tokens": self.tokens,
+            "max_tokens": self.max_tokens,
+            "tool_calls": self.tool_calls,
+            "max_tool_calls": self.max_tool_calls,
+            "iterations": self.iterations,
+        }
@@ -2,9 +2,18 @@
 """Utility functions for file path management in AgentScope Studio."""
 import platform
 import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
 
 from utils.constants import NAME_STUDIO, NAME_APP
 
+if platform.system() == "Windows":
+    import msvcrt
+else:
+    import fcntl
+
 
 def get_local_file_path(filename: str) -> str:
     """Obtain the local file path for a given filename based on the operating system."""
@@ -26,3 +35,61 @@ def get_local_file_path(filename: str) -> str:
         os.makedirs(os.path.join(local_path, NAME_APP), exist_ok=True)
 
     return os.path.join(local_path, NAME_APP, filename)
+
+
+def write_file_atomic(path: str, content: bytes | str) -> None:
+    """Write the file atomically, through a temporary file of its own in the
+    same directory, so that the concurrent Friday processes writing the same
+    file never interleave or move each other's temporary files.
+
+    Args:
+        path (`str`):
+            The path of the file.
+        content (`bytes | str`):
+            The content, encoded in UTF-8 if it's a string.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        suffix=".tmp",
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on the file across the processes, e.g. around
+    reading, updating and writing a file shared by them. The lock is taken
+    on a `.lock` file next to it, which is never replaced.
+
+    Args:
+        path (`str`):
+            The path of the locked file.
+    """
+    with open(f"{path}.lock", "a+b") as f:
+        if platform.system() == "Windows":
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.01)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if platform.system() == "Windows":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -1,10 +1,30 @@
 # -*- coding: utf-8 -*-
-"""WebSocket connection used to interrupt the agent's replying in AgentScope
-Studio"""
+"""WebSocket connection to AgentScope Studio, multiplexing the control
+signals (interrupt and accepting a debate) from the studio and the data (messages and finished
+signals) pushed to the studio."""
+import asyncio
+import base64
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
 import socketio
-from agentscope.agent import ReActAgent
+from agentscope.agent import AgentBase
+
+from hook import _post_to_studio, push_finished_signal
+from utils.log import logger
+from utils.serializer import (
+    OFFLOAD_SIZE,
+    Serializer,
+    SocketIOJSON,
+    estimate_size,
+    get_serializer,
+)
 
-from hook import studio_post_reply_hook
+# The times the data the studio failed to save is emitted again, before
+# it's left to the replay after reconnecting or the HTTP fallback
+_MAX_RETRIES = 3
 
 
 class StudioConnect:
@@ -12,33 +32,328 @@ class StudioConnect:
 
     _friday_namespace = "/friday"
 
-    def __init__(self, url: str, agent: ReActAgent):
-        """Initialize the connection with the studio URL."""
+    def __init__(
+        self,
+        url: str,
+        targets: list[Any] | None = None,
+        serializer: Serializer | None = None,
+        offload_size: int = OFFLOAD_SIZE,
+    ):
+        """Initialize the connection with the studio URL.
+
+        Args:
+            url (`str`):
+                The URL of the studio.
+            targets (`list[Any] | None`, optional):
+                The objects to interrupt when the studio asks to, i.e. agents
+                or debate orchestrators. An orchestrator exposes the agents it
+                runs by its `agents` attribute, and is accepted (stopped with
+                its interim conclusion) by its `accept` method.
+            serializer (`Serializer | None`, optional):
+                The serializer of the large payloads, JSON by default.
+            offload_size (`int`, defaults to `OFFLOAD_SIZE`):
+                The estimated payload size in bytes above which the payload
+                is serialized in a worker thread and sent as a binary
+                attachment, which the studio decodes. The smaller payloads
+                are encoded by socket.io with orjson.
+        """
         self.url = url
+        self.serializer = serializer or get_serializer()
+        self.offload_size = offload_size
+        # Reconnect with jittered exponential backoff (0.5s, 1s, 2s, ... up
+        # to 5s), until the connection is closed by `disconnect`
         self.sio = socketio.AsyncClient(
             reconnection=True,
-            reconnection_attempts=5,
-            reconnection_delay=5,
-            reconnection_delay_max=3,
+            reconnection_attempts=0,
+            reconnection_delay=0.5,
+            reconnection_delay_max=5,
+            randomization_factor=0.5,
+            json=SocketIOJSON,
         )
 
-        self.agent = agent
+        self.targets = list(targets or [])
+
+        # The latency from receiving the last interrupt to all the agents
+        # being stopped, in seconds
+        self.last_interrupt_latency: float | None = None
+        self._background_tasks: set[asyncio.Task] = set()
+
+        # The pushed data that is not acknowledged by the studio yet, which is
+        # replayed in order after (re)connecting
+        self._outbox: OrderedDict[int, tuple[str, dict]] = OrderedDict()
+        self._seq = itertools.count()
+        # The number of the failed saves of the data in the outbox, i.e.
+        # acknowledged with `false` by the studio
+        self._failures: dict[int, int] = {}
+        # Keep the data in order while a large payload is being serialized
+        self._emit_lock = asyncio.Lock()
+        self._connect_task: asyncio.Task | None = None
+
+        # The blobs pushed to the studio already, see `send_blob`
+        self._sent_blobs: set[str] = set()
 
         @self.sio.on("connect", namespace=self._friday_namespace)
         async def on_connect():
-            print(f"Connect to the studio at {self.url} successfully.")
+            logger.info("Connected to the studio at %s.", self.url)
+            await self._replay()
 
         @self.sio.on("disconnect", namespace=self._friday_namespace)
         async def on_disconnect():
-            print(f"Disconnected from the studio at {self.url}.")
+            logger.info("Disconnected from the studio at %s.", self.url)
 
         @self.sio.on("interrupt", namespace=self._friday_namespace)
         async def on_interrupt():
-            print("Interrupt received, stopping the agent...")
-            await self.agent.interrupt()
+            logger.info("Interrupt received, stopping the agent...")
+            await self.interrupt()
+
+        @self.sio.on("acceptDebate", namespace=self._friday_namespace)
+        async def on_accept_debate():
+            logger.info("Accept received, finishing the debate...")
+            await self.accept()
+
+    @staticmethod
+    def _get_agents(targets: list[Any]) -> list[AgentBase]:
+        """Get all the agents run by the targets."""
+        agents = []
+        for target in targets:
+            agents.extend(getattr(target, "agents", [target]))
+        return agents
+
+    async def interrupt(self) -> None:
+        """Interrupt all the targets. The handler returns once the
+        cancellation is requested, while waiting for the agents to stop and
+        notifying the studio are done in the background."""
+        await self._stop(list(self.targets), lambda target: target.interrupt())
+
+    async def accept(self) -> None:
+        """Accept the interim conclusions of the debates among the targets,
+        which stop early as if interrupted but finish with the judge's best
+        answer so far. The other targets keep running."""
+        await self._stop(
+            [_ for _ in self.targets if hasattr(_, "accept")],
+            lambda target: target.accept(),
+        )
 
-            # Finish the reply and notify the studio
-            studio_post_reply_hook(self.agent)
+    async def _stop(
+        self,
+        targets: list[Any],
+        stop: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        """Stop the targets, then finish the replies of their agents in the
+        background."""
+        start = time.perf_counter()
+
+        # Only the agents that are replying need a finished signal
+        replying_agents = [
+            agent
+            for agent in self._get_agents(targets)
+            if agent._reply_task is not None and not agent._reply_task.done()
+        ]
+
+        await asyncio.gather(*[stop(target) for target in targets])
+
+        task = asyncio.create_task(
+            self._finish_interrupted(replying_agents, start),
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _finish_interrupted(
+        self,
+        agents: list[AgentBase],
+        start: float,
+        timeout: float = 30,
+    ) -> None:
+        """Wait for the interrupted agents to stop, then send their finished
+        signals to the studio."""
+        deadline = start + timeout
+        while (
+            any(agent._reply_task is not None for agent in agents)
+            and time.perf_counter() < deadline
+        ):
+            await asyncio.sleep(0.005)
+
+        self.last_interrupt_latency = time.perf_counter() - start
+        logger.info(
+            "Stopped %d agent(s) in %.1f ms after the interrupt.",
+            len(agents),
+            self.last_interrupt_latency * 1000,
+        )
+
+        # Finish the replies and notify the studio
+        await asyncio.gather(
+            *[push_finished_signal(agent) for agent in agents],
+            return_exceptions=True,
+        )
+
+    def _on_ack(self, seq: int, *args: Any) -> None:
+        """Drop the data from the outbox once the studio saved it. If the
+        studio failed to, the data is emitted again after a backoff, up to
+        `_MAX_RETRIES` times, and kept for the replay and the HTTP fallback
+        anyway."""
+        if not args or args[0]:
+            self._outbox.pop(seq, None)
+            self._failures.pop(seq, None)
+            return
+
+        n_failures = self._failures.get(seq, 0) + 1
+        self._failures[seq] = n_failures
+        logger.warning(
+            "The studio failed to save the data %d (attempt %d).",
+            seq,
+            n_failures,
+        )
+        if n_failures <= _MAX_RETRIES:
+            task = asyncio.create_task(
+                self._retry(seq, 0.5 * 2 ** (n_failures - 1)),
+            )
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _retry(self, seq: int, delay: float) -> None:
+        """Emit the data the studio failed to save again after the delay,
+        unless it's superseded or acknowledged meanwhile."""
+        await asyncio.sleep(delay)
+        if seq not in self._outbox or not self.sio.connected:
+            return
+        event, payload = self._outbox[seq]
+        try:
+            await self._emit(seq, event, payload)
+        except socketio.exceptions.BadNamespaceError:
+            # Disconnected meanwhile, the data will be replayed
+            pass
+
+    def _is_pending(self, seq: int) -> bool:
+        """If the data may still be saved by the studio over the socket,
+        i.e. it's not failed more than `_MAX_RETRIES` times."""
+        return self._failures.get(seq, 0) <= _MAX_RETRIES
+
+    async def _emit(self, seq: int, event: str, payload: dict) -> None:
+        """Emit the data, and drop it from the outbox once the studio
+        acknowledges saving it. A large payload is serialized off the event loop
+        and emitted as {"encoding": ..., "body": <bytes>}."""
+        async with self._emit_lock:
+            if not any(
+                isinstance(_, bytes) for _ in payload.values()
+            ) and estimate_size(payload, self.offload_size) > self.offload_size:
+                payload = {
+                    "encoding": self.serializer.name,
+                    "body": await asyncio.to_thread(
+                        self.serializer.dumps,
+                        payload,
+                    ),
+                }
+            await self.sio.emit(
+                event,
+                payload,
+                namespace=self._friday_namespace,
+                callback=lambda *args: self._on_ack(seq, *args),
+            )
+
+    async def _replay(self) -> None:
+        """Replay the unacknowledged data in order after (re)connecting."""
+        for seq, (event, payload) in list(self._outbox.items()):
+            # Skip the data superseded or acknowledged meanwhile
+            if seq not in self._outbox:
+                continue
+            try:
+                await self._emit(seq, event, payload)
+            except socketio.exceptions.BadNamespaceError:
+                # Disconnected again, replay after the next connection
+                return
+
+    def _drop_superseded(self, event: str, payload: dict) -> None:
+        """A streamed message is pushed as accumulated snapshots, so the
+        unacknowledged older snapshots of the same message are superseded
+        and mustn't be replayed after the newer one."""
+        if event != "pushMessageToFridayApp":
+            return
+        msg_id = payload["msg"]["id"]
+        for seq, (queued_event, queued_payload) in list(self._outbox.items()):
+            if (
+                queued_event == event
+                and queued_payload["msg"]["id"] == msg_id
+            ):
+                self._outbox.pop(seq, None)
+                self._failures.pop(seq, None)
+
+    async def send(self, event: str, payload: dict[str, Any]) -> None:
+        """Push the data to the studio. It's buffered while the connection is
+        not (yet) established, and replayed after connecting.
+
+        Args:
+            event (`str`):
+                The event name, i.e. the studio procedure to call, e.g.
+                "pushMessageToFridayApp".
+            payload (`dict[str, Any]`):
+                The data to push.
+        """
+        self._drop_superseded(event, payload)
+        seq = next(self._seq)
+        self._outbox[seq] = (event, payload)
+        if self.sio.connected and self._friday_namespace in self.sio.namespaces:
+            try:
+                await self._emit(seq, event, payload)
+            except socketio.exceptions.BadNamespaceError:
+                # Disconnected meanwhile, the data will be replayed
+                pass
+
+    async def send_blob(self, blob_id: str, path: str) -> None:
+        """Push a blob to the studio as a binary attachment, once. The
+        messages refer to the blob by its ID,
+        and it's pushed before them as the data is sent in order.
+
+        Args:
+            blob_id (`str`):
+                The ID of the blob, i.e. its file name in the blob store.
+            path (`str`):
+                The path of the blob file.
+        """
+        if blob_id in self._sent_blobs:
+            return
+        self._sent_blobs.add(blob_id)
+
+        def _read() -> bytes:
+            with open(path, "rb") as f:
+                return f.read()
+
+        data = await asyncio.to_thread(_read)
+        await self.send("pushBlobToFridayApp", {"blobId": blob_id, "data": data})
+
+    def start(self) -> None:
+        """Connect to the studio in the background, so that the connection
+        time overlaps with the initialization of the models and the agents.
+        The pushed data is buffered until connected."""
+        self._connect_task = asyncio.create_task(self.connect())
+
+    async def _flush(self, timeout: float = 10) -> None:
+        """Wait for the studio to acknowledge all the pushed data. The data
+        that can't be sent, or that the studio failed to save over the
+        socket, is sent over HTTP instead."""
+        if self._connect_task is not None:
+            try:
+                await self._connect_task
+            except RuntimeError as e:
+                logger.warning("%s Falling back to HTTP.", e)
+
+        deadline = time.perf_counter() + timeout
+        while (
+            any(self._is_pending(_) for _ in self._outbox)
+            and self.sio.connected
+            and time.perf_counter() < deadline
+        ):
+            await asyncio.sleep(0.01)
+
+        for seq, (event, payload) in list(self._outbox.items()):
+            # The binary data is sent as base64 over HTTP
+            if isinstance(payload.get("data"), bytes):
+                payload = {
+                    **payload,
+                    "data": base64.b64encode(payload["data"]).decode("ascii"),
+                }
+            await asyncio.to_thread(_post_to_studio, event, payload)
+            self._outbox.pop(seq, None)
+            self._failures.pop(seq, None)
 
     async def connect(self) -> None:
         try:
@@ -54,10 +369,14 @@ class StudioConnect:
 
     async def disconnect(self) -> None:
         try:
-            print("Disconnecting from the studio...")
+            # Don't drop the pending finished signals and messages
+            if self._background_tasks:
+                await asyncio.gather(*self._background_tasks)
+            await self._flush()
+
+            logger.debug("Disconnecting from the studio...")
             await self.sio.disconnect()
-            print("Successfully disconnected.")
         except Exception as e:
             raise RuntimeError(
                 f"Failed to disconnect from the studio at {self.url}."
-            ) from e
\ No newline at end of file
+            ) from e
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""The chat formatters of Friday, which cache the formatted output of each
+message.
+
+The ReAct agent formats its whole memory again in each iteration of a turn,
+reading and encoding the images of the earlier messages every time. The
+chat formatters format each message on its own, so the output of a message
+is cached by its ID and a stamp of its role, name and content, and an
+iteration only formats the messages it hasn't seen yet:
+
+    formatter = CachedOpenAIChatFormatter()
+    prompt = await formatter.format(msgs)
+
+The stamp is the Python hash of the content, whose strings cache their own
+hashes, so a message seen before isn't read again, however large its inline
+data. A message changed in place, e.g. when its images are compacted, has
+another stamp and is formatted again. The messages without an ID are cached
+by a hash of their serialized fields instead. The cached outputs are shared
+by the returned prompts, so they mustn't be modified by the callers.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any
+
+from agentscope.formatter import (
+    AnthropicChatFormatter,
+    DashScopeChatFormatter,
+    GeminiChatFormatter,
+    OllamaChatFormatter,
+    OpenAIChatFormatter,
+)
+from agentscope.message import Msg
+
+from utils.serializer import get_serializer
+
+
+def _hash_msg(msg: Msg) -> bytes:
+    """The hash of the fields of a message the formatters read."""
+    return hashlib.blake2b(
+        get_serializer("json").dumps([msg.role, msg.name, msg.content]),
+        digest_size=16,
+    ).digest()
+
+
+def _freeze(value: Any) -> Any:
+    """A hashable copy of the value, sharing its strings and bytes."""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(_) for _ in value)
+    return value
+
+
+def _get_cache_key(msg: Msg, index: int) -> tuple:
+    """The key of the formatted output of a message at the index."""
+    if msg.id:
+        try:
+            return (
+                index == 0,
+                msg.id,
+                hash((msg.role, msg.name, _freeze(msg.content))),
+            )
+        except TypeError:
+            # An unhashable value in the content
+            pass
+    return index == 0, _hash_msg(msg)
+
+
+class CachedFormatterMixin:
+    """Cache the formatted output of each message, to be mixed into a chat
+    formatter whose `_format` formats the messages one by one."""
+
+    def __init__(self, *args: Any, max_cached: int = 1024, **kwargs: Any):
+        """Initialize the formatter.
+
+        Args:
+            *args (`Any`):
+                The arguments of the formatter.
+            max_cached (`int`, defaults to `1024`):
+                The number of the formatted messages cached, the least
+                recently used ones are dropped first.
+            **kwargs (`Any`):
+                The keyword arguments of the formatter.
+        """
+        super().__init__(*args, **kwargs)
+        self.max_cached = max_cached
+        self._cache: OrderedDict[tuple, list[dict]] = OrderedDict()
+        self.n_hits = 0
+        self.n_misses = 0
+
+    async def _format(self, msgs: list[Msg]) -> list[dict[str, Any]]:
+        """Format the messages, reusing the cached output of the messages
+        formatted before."""
+        self.assert_list_of_msgs(msgs)
+
+        formatted = []
+        for index, msg in enumerate(msgs):
+            key = _get_cache_key(msg, index)
+            output = self._cache.get(key)
+            if output is None:
+                self.n_misses += 1
+                output = await self._format_msg(msg, index)
+                self._cache[key] = output
+                if len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+            else:
+                self.n_hits += 1
+                self._cache.move_to_end(key)
+            formatted.extend(output)
+        return formatted
+
+    async def _format_msg(self, msg: Msg, index: int) -> list[dict[str, Any]]:
+        """Format a message at the index, into zero or more messages of the
+        API, e.g. with the tool results and their promoted images."""
+        return await super()._format([msg])
+
+
+class CachedDashScopeChatFormatter(CachedFormatterMixin, DashScopeChatFormatter):
+    """`DashScopeChatFormatter` caching the formatted messages."""
+
+
+class CachedOpenAIChatFormatter(CachedFormatterMixin, OpenAIChatFormatter):
+    """`OpenAIChatFormatter` caching the formatted messages."""
+
+
+class CachedOllamaChatFormatter(CachedFormatterMixin, OllamaChatFormatter):
+    """`OllamaChatFormatter` caching the formatted messages."""
+
+
+class CachedGeminiChatFormatter(CachedFormatterMixin, GeminiChatFormatter):
+    """`GeminiChatFormatter` caching the formatted messages."""
+
+
+class CachedAnthropicChatFormatter(CachedFormatterMixin, AnthropicChatFormatter):
+    """`AnthropicChatFormatter` caching the formatted messages."""
+
+    async def _format_msg(self, msg: Msg, index: int) -> list[dict[str, Any]]:
+        """Format a message, as a user message if it's a system message but
+        not the first one, which is all that Claude accepts."""
+        output = await super()._format_msg(msg, index)
+        if index != 0 and msg.role == "system":
+            output = [
+                {**_, "role": "user"} if _["role"] == "system" else _
+                for _ in output
+            ]
+        return output
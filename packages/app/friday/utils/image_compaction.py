@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Compact the images of the older turns in the memory of an agent into
+textual captions.
+
+The images are kept in the memory as references to the blob store, but the
+formatters read and encode every one of them again for each model call, so
+the images discussed turns ago dominate the prompt size and the upload time.
+At the end of a turn, the images older than the kept turns are replaced by a
+caption, generated once per blob by the model and cached on disk, together
+with the ID of the blob, which the agent passes to the `view_image` tool to
+see the image again:
+
+    compactor = ImageCompactor(model, formatter, keep_turns=2)
+    ...
+    await agent(msg)
+    await compactor.compact(agent.memory)
+"""
+import json
+import os
+
+from agentscope.formatter import FormatterBase
+from agentscope.memory import MemoryBase
+from agentscope.message import ImageBlock, Msg, TextBlock
+from agentscope.model import ChatModelBase, ChatResponse
+
+from utils.common import file_lock, get_local_file_path, write_file_atomic
+from utils.log import logger
+
+_CAPTION_PROMPT = (
+    "Describe this image for someone who can't see it, in at most 100 "
+    "words. Include all the visible text, numbers, code and the layout that "
+    "matter, without any preamble."
+)
+
+
+def _get_blob_id(block: dict) -> str | None:
+    """The blob ID of an image block referring to a local blob file."""
+    source = block.get("source")
+    if (
+        block.get("type") != "image"
+        or not isinstance(source, dict)
+        or source.get("type") != "url"
+        or not os.path.isfile(source.get("url", ""))
+    ):
+        return None
+    return os.path.basename(source["url"])
+
+
+class ImageCompactor:
+    """Replace the images of the older turns in a memory by their cached
+    captions and blob IDs."""
+
+    def __init__(
+        self,
+        model: ChatModelBase,
+        formatter: FormatterBase,
+        keep_turns: int = 2,
+        cache_path: str | None = None,
+    ) -> None:
+        """Initialize the compactor.
+
+        Args:
+            model (`ChatModelBase`):
+                The model generating the captions, which must accept images,
+                e.g. the model routing the images to the vision model.
+            formatter (`FormatterBase`):
+                The formatter of the model.
+            keep_turns (`int`, defaults to `2`):
+                The number of the latest turns whose images are kept.
+            cache_path (`str | None`, optional):
+                The JSON file of the captions by blob ID, shared by the
+                sessions. Defaults to one in the local Friday directory.
+        """
+        self.model = model
+        self.formatter = formatter
+        self.keep_turns = keep_turns
+        self.cache_path = cache_path or get_local_file_path(
+            "image_captions.json",
+        )
+        self._captions: dict[str, str] | None = None
+
+    def _read_captions(self) -> dict[str, str]:
+        """Read the captions saved in the cache file."""
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _load_captions(self) -> dict[str, str]:
+        """Load the cached captions once."""
+        if self._captions is None:
+            self._captions = self._read_captions()
+        return self._captions
+
+    def _save_captions(self) -> None:
+        """Merge the cached captions into the ones saved by the other
+        processes meanwhile, and write them atomically under a lock, so that
+        no caption is lost. A failed write only costs generating the caption
+        again later."""
+        try:
+            with file_lock(self.cache_path):
+                captions = {**self._read_captions(), **self._captions}
+                write_file_atomic(
+                    self.cache_path,
+                    json.dumps(captions, ensure_ascii=False),
+                )
+            self._captions = captions
+        except OSError as e:
+            logger.warning("Failed to save the image captions: %s", e)
+
+    async def caption(self, block: dict) -> str | None:
+        """Get the caption of an image block referring to a blob, generating
+        and caching it if needed.
+
+        Args:
+            block (`dict`):
+                The image block.
+
+        Returns:
+            `str | None`:
+                The caption, or None if the block doesn't refer to a blob or
+                the caption can't be generated, in which case the image is
+                kept.
+        """
+        blob_id = _get_blob_id(block)
+        if blob_id is None:
+            return None
+
+        captions = self._load_captions()
+        if blob_id not in captions:
+            try:
+                prompt = await self.formatter.format(
+                    [
+                        Msg(
+                            "user",
+                            [
+                                TextBlock(type="text", text=_CAPTION_PROMPT),
+                                ImageBlock(
+                                    type="image",
+                                    source=block["source"],
+                                ),
+                            ],
+                            "user",
+                        ),
+                    ],
+                )
+                res = await self.model(prompt)
+                if not isinstance(res, ChatResponse):
+                    # The streamed chunks are accumulated
+                    async for res in res:
+                        pass
+            except Exception as e:
+                logger.warning("Failed to caption the image %s: %s", blob_id, e)
+                return None
+
+            text = "".join(
+                _["text"] for _ in res.content if _.get("type") == "text"
+            ).strip()
+            if not text:
+                return None
+            captions[blob_id] = text
+            self._save_captions()
+            return text
+
+        return captions[blob_id]
+
+    async def _compact_blocks(self, blocks: list[dict]) -> tuple[list, int]:
+        """Replace the image blocks, including the ones of the tool results,
+        returning the new blocks and the number of the replaced images."""
+        compacted, n_images = [], 0
+        for block in blocks:
+            if block.get("type") == "tool_result" and isinstance(
+                block.get("output"),
+                list,
+            ):
+                output, n = await self._compact_blocks(block["output"])
+                if n:
+                    block = {**block, "output": output}
+                    n_images += n
+            else:
+                caption = await self.caption(block)
+                if caption is not None:
+                    blob_id = _get_blob_id(block)
+                    block = TextBlock(
+                        type="text",
+                        text=f"[Image {blob_id}, compacted from an earlier "
+                        f"turn] {caption}\n(Call `view_image` with "
+                        f'image_id="{blob_id}" to view it again.)',
+                    )
+                    n_images += 1
+            compacted.append(block)
+        return compacted, n_images
+
+    async def compact(self, memory: MemoryBase) -> int:
+        """Compact the images of the messages before the latest
+        `keep_turns` turns, each starting with a user message. The messages
+        are changed in place.
+
+        Args:
+            memory (`MemoryBase`):
+                The memory of the agent, e.g. after its turn.
+
+        Returns:
+            `int`:
+                The number of the compacted images.
+        """
+        msgs = await memory.get_memory(prepend_summary=False)
+        turn_starts = [i for i, msg in enumerate(msgs) if msg.role == "user"]
+        if len(turn_starts) <= self.keep_turns:
+            return 0
+        end = turn_starts[-self.keep_turns] if self.keep_turns else len(msgs)
+
+        n_images = 0
+        for msg in msgs[:end]:
+            if not isinstance(msg.content, list):
+                continue
+            content, n = await self._compact_blocks(msg.content)
+            if n:
+                msg.content = content
+                n_images += n
+        return n_images
@@ -1,14 +1,39 @@
 # -*- coding: utf-8 -*-
 """Image converter utility for converting frontend ImageBlock format to AgentScope format."""
+import os
+from collections import OrderedDict
 from typing import Any, Dict
 
+from utils.blob_store import BlobStore
+
+# The block types that carry binary data in their sources
+_BINARY_BLOCK_TYPES = ("image", "audio", "video")
+
 
 class ImageConverter:
-    """Pass through frontend ImageBlock format to AgentScope (formatters handle conversion)."""
+    """Exchange the binary data of the content blocks as references to the
+    blob store instead of inline base64 data. The blocks going into the agent
+    refer to the local blob files, which the AgentScope formatters read, and
+    the blocks pushed to the studio refer to the blobs served by the studio,
+    which receives them once over the binary channel."""
 
-    def __init__(self):
-        """Initialize the image converter."""
-        pass
+    def __init__(self, blob_store: BlobStore | None = None, max_cached: int = 64):
+        """Initialize the image converter.
+
+        Args:
+            blob_store (`BlobStore | None`, optional):
+                The store of the binary data. The blocks are passed through
+                as-is if not given.
+            max_cached (`int`, defaults to `64`):
+                The number of the stored base64 data and files remembered, so
+                that the same image pushed with every streamed chunk is only
+                stored once.
+        """
+        self.blob_store = blob_store
+        self.max_cached = max_cached
+        # The base64 data (or the local file with its modified time) to the
+        # path of its blob
+        self._blob_paths: OrderedDict[Any, str] = OrderedDict()
 
     def convert_content_blocks(self, content: Any) -> Any:
         """
@@ -43,12 +68,95 @@ class ImageConverter:
             block: A single content block from frontend
 
         Returns:
-            Converted block (passed through as-is, AgentScope formatters handle the conversion)
+            Converted block, whose inline base64 data is moved into the blob
+            store. AgentScope formatters read the local blob files themselves
+        """
+        source = block.get("source")
+        if (
+            self.blob_store is None
+            or block.get("type") not in _BINARY_BLOCK_TYPES
+            or not isinstance(source, dict)
+            or source.get("type") != "base64"
+        ):
+            return block
+
+        path = self._get_blob_path(source)
+        return {**block, "source": {"type": "url", "url": path}}
+
+    def _get_blob_path(self, source: Dict[str, Any]) -> str | None:
+        """Get the blob of a base64 or local file source, storing it if
+        needed. Returns None for the remote URLs."""
+        if source.get("type") == "base64":
+            key = source["data"]
+        elif os.path.isfile(source.get("url", "")):
+            stat = os.stat(source["url"])
+            key = (source["url"], stat.st_mtime_ns, stat.st_size)
+        else:
+            return None
+
+        path = self._blob_paths.get(key)
+        if path is None or not os.path.exists(path):
+            if source["type"] == "base64":
+                path = self.blob_store.put_base64(source["data"])
+            else:
+                path = self.blob_store.put_file(source["url"])
+            self._blob_paths[key] = path
+            if len(self._blob_paths) > self.max_cached:
+                self._blob_paths.popitem(last=False)
+        self._blob_paths.move_to_end(key)
+        return path
+
+    def to_references(
+        self,
+        content: list[Dict[str, Any]],
+        base_url: str,
+    ) -> tuple[list[Dict[str, Any]], dict[str, str]]:
+        """Replace the inline base64 data and the local files of the content
+        blocks (including the tool results) by the URLs of their blobs.
+
+        Args:
+            content (`list[Dict[str, Any]]`):
+                The content blocks of a message.
+            base_url (`str`):
+                The URL under which the blobs are served, e.g.
+                "http://localhost:3000/friday/blobs".
+
+        Returns:
+            `tuple[list[Dict[str, Any]], dict[str, str]]`:
+                The converted blocks, and the referenced blobs by their IDs,
+                i.e. the paths of the blob files.
         """
-        # AgentScope formatters handle the image source conversion themselves
-        # We just pass through the blocks as-is
-        return block
+        blobs: dict[str, str] = {}
+        if self.blob_store is None:
+            return content, blobs
+
+        def _convert(block: Dict[str, Any]) -> Dict[str, Any]:
+            if block.get("type") == "tool_result" and isinstance(
+                block.get("output"),
+                list,
+            ):
+                return {**block, "output": [_convert(_) for _ in block["output"]]}
+
+            source = block.get("source")
+            if block.get("type") not in _BINARY_BLOCK_TYPES or not isinstance(
+                source,
+                dict,
+            ):
+                return block
+
+            path = self._get_blob_path(source)
+            if path is None:
+                return block
+
+            blob_id = os.path.basename(path)
+            blobs[blob_id] = path
+            return {
+                **block,
+                "source": {"type": "url", "url": f"{base_url}/{blob_id}"},
+            }
+
+        return [_convert(block) for block in content], blobs
 
     def cleanup(self):
-        """Cleanup method (no-op since we don't create temporary files anymore)."""
+        """Cleanup method (no-op since the blobs are kept with the sessions)."""
         pass
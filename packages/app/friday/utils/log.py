@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""The leveled logger of Friday.
+
+The studio reads the stdout and stderr of the Friday process, so everything
+printed there costs I/O and parsing on both sides, and a message with images
+dumps megabytes of base64. The logger writes to stderr (and optionally a
+file) above the configured level only, WARNING by default, and formats the
+records lazily: the arguments are only rendered when a record is emitted,
+with the binary data and the base64 strings elided and the long strings
+truncated:
+
+    logger.debug("Converted content: %s", content)
+
+Below INFO, the agents don't print their messages to the console either,
+as the studio receives them through the hooks.
+"""
+import logging
+import re
+from typing import Any, Mapping
+
+logger = logging.getLogger("friday")
+
+_FORMAT = "%(asctime)s | %(levelname)-7s | %(module)s:%(lineno)s - %(message)s"
+
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+# The shortest string checked for being base64 data
+_MIN_BASE64_LENGTH = 256
+
+_BASE64_PATTERN = re.compile(r"[A-Za-z0-9+/=\r\n]+")
+
+
+def elide(value: Any, max_length: int = 200) -> Any:
+    """Elide the binary data and the base64 strings from the value, and
+    truncate the long strings, e.g. before logging a message.
+
+    Args:
+        value (`Any`):
+            The value, e.g. a message, its content blocks or a payload.
+        max_length (`int`, defaults to `200`):
+            The length beyond which the strings are truncated.
+
+    Returns:
+        `Any`:
+            A copy of the value with the elided strings and data, the other
+            values are kept as-is.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str):
+        if value.startswith("data:") and ";base64," in value[:100]:
+            media_type = value[len("data:") : value.index(";base64,")]
+            return f"<{media_type} base64, {len(value)} chars>"
+        if len(value) >= _MIN_BASE64_LENGTH and _BASE64_PATTERN.fullmatch(
+            value,
+        ):
+            return f"<base64, {len(value)} chars>"
+        if len(value) > max_length:
+            return f"{value[:max_length]}... (+{len(value) - max_length} chars)"
+        return value
+    if isinstance(value, Mapping):
+        return {k: elide(v, max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(elide(_, max_length) for _ in value)
+    if hasattr(value, "to_dict"):
+        # E.g. the messages
+        return elide(value.to_dict(), max_length)
+    return value
+
+
+class _ElidingFormatter(logging.Formatter):
+    """Elide the arguments of the records when they're formatted."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if isinstance(record.args, Mapping):
+            record.args = elide(record.args)
+        elif record.args:
+            record.args = tuple(elide(_) for _ in record.args)
+        return super().format(record)
+
+
+def setup_logging(level: str = "WARNING", log_file: str | None = None) -> None:
+    """Set up the logger of Friday, and the one of AgentScope to the same
+    level.
+
+    Args:
+        level (`str`, defaults to `"WARNING"`):
+            The level, one of `LEVELS`.
+        log_file (`str | None`, optional):
+            The file the records are appended to, besides stderr.
+    """
+    if level not in LEVELS:
+        raise ValueError(
+            f"Invalid logging level: {level}, expected one of {LEVELS}.",
+        )
+
+    formatter = _ElidingFormatter(_FORMAT)
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+
+    logger.handlers.clear()
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    logging.getLogger("as").setLevel(level)
+
+
+def is_console_output_enabled() -> bool:
+    """If the agents print their messages to the console, i.e. when logging
+    at INFO or below."""
+    return logger.isEnabledFor(logging.INFO)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Opt-in memory profiling of the long-running Friday processes.
+
+The session histories, the images and the debate histories accumulate in
+Python objects. When profiling is started, a snapshot is taken at each turn
+and debate round boundary, recording the traced memory, the top allocators,
+the growth since the previous snapshot and the sizes of the message holders
+and the caches, one JSON line per snapshot:
+
+    start_memory_profiling("memory.jsonl")
+    ...
+    record_memory("turn", turn=1)
+
+`record_memory` does nothing unless profiling is started, while tracing the
+allocations slows the process down, so it's meant for finding leaks and
+sizing the caches rather than for production runs.
+"""
+import gc
+import json
+import os
+import time
+import tracemalloc
+from typing import Any
+
+from agentscope.memory import InMemoryMemory
+from agentscope.message import Msg
+
+from tool.agentscope_tools import get_agentscope_module_signatures
+from tool.source_index import get_source_index
+from utils.formatter_cache import CachedFormatterMixin
+from utils.image_converter import ImageConverter
+from utils.message_log import LogMemory, MessageLog
+from utils.session import SessionManager
+
+# The allocations of the profiler itself and the import machinery
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _count_objects() -> dict[str, int]:
+    """Count the messages, the entries of the memories and the logs, and the
+    items of the caches alive in the process."""
+    counts = {
+        "msgs": 0,
+        "memory_entries": 0,
+        "log_msgs": 0,
+        "loaded_sessions": 0,
+        "cached_blob_paths": 0,
+        "cached_formatted_msgs": 0,
+    }
+    for obj in gc.get_objects():
+        # By the type rather than isinstance, which reads the `__class__` of
+        # the lazy proxies, e.g. the ones of openai, and loads what they
+        # proxy
+        cls = type(obj)
+        if issubclass(cls, Msg):
+            counts["msgs"] += 1
+        elif issubclass(cls, InMemoryMemory):
+            counts["memory_entries"] += len(obj.content)
+        elif issubclass(cls, LogMemory):
+            counts["memory_entries"] += len(obj.entries)
+        elif issubclass(cls, MessageLog):
+            counts["log_msgs"] += len(obj.msgs)
+        elif issubclass(cls, SessionManager):
+            counts["loaded_sessions"] += len(obj._usage)
+        elif issubclass(cls, ImageConverter):
+            counts["cached_blob_paths"] += len(obj._blob_paths)
+        elif issubclass(cls, CachedFormatterMixin):
+            counts["cached_formatted_msgs"] += len(obj._cache)
+
+    # The catalogs cached by the tools once loaded
+    counts["cached_signatures"] = len(
+        getattr(get_agentscope_module_signatures, "signatures", []),
+    )
+    counts["cached_index_definitions"] = len(
+        getattr(get_source_index, "index", {}).get("definitions", []),
+    )
+    return counts
+
+
+class MemoryProfiler:
+    """Take the memory snapshots and append them to a JSONL file."""
+
+    def __init__(self, path: str, top: int = 10) -> None:
+        """Initialize the profiler.
+
+        Args:
+            path (`str`):
+                The JSONL file the snapshots are appended to.
+            top (`int`, defaults to `10`):
+                The number of the top allocators and of the largest growths
+                reported per snapshot.
+        """
+        self.path = path
+        self.top = top
+        self._first_size: int | None = None
+        self._last: tracemalloc.Snapshot | None = None
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start tracing the allocations and take the baseline snapshot."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.snapshot("start")
+
+    def stop(self) -> None:
+        """Take the last snapshot and stop tracing if started by this
+        profiler."""
+        self.snapshot("stop")
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def snapshot(self, boundary: str, **labels: Any) -> dict[str, Any]:
+        """Take a snapshot and append it to the file.
+
+        Args:
+            boundary (`str`):
+                Where the snapshot is taken, e.g. "turn" or "round".
+            **labels (`Any`):
+                The labels of the snapshot, e.g. the turn or the round.
+
+        Returns:
+            `dict[str, Any]`:
+                The recorded snapshot, with the traced memory in KiB, the
+                top allocators, the largest growths since the previous
+                snapshot, and the object counts.
+        """
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        current, peak = tracemalloc.get_traced_memory()
+
+        size = sum(_.size for _ in snapshot.traces)
+        if self._first_size is None:
+            self._first_size = size
+
+        def _where(stat: Any) -> str:
+            frame = stat.traceback[0]
+            return f"{frame.filename}:{frame.lineno}"
+
+        growth = []
+        if self._last is not None:
+            growth = [
+                {
+                    "where": _where(stat),
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(self._last, "lineno")[
+                    : self.top
+                ]
+                if stat.size_diff > 0
+            ]
+        self._last = snapshot
+
+        record = {
+            "time": time.time(),
+            "pid": os.getpid(),
+            "boundary": boundary,
+            "labels": labels,
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "growth_since_start_kb": round(
+                (size - self._first_size) / 1024, 1,
+            ),
+            "top": [
+                {
+                    "where": _where(stat),
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[: self.top]
+            ],
+            "growth": growth,
+            "objects": _count_objects(),
+        }
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        return record
+
+
+# The profiler of the process, if profiling is started
+_profiler: MemoryProfiler | None = None
+
+
+def start_memory_profiling(path: str, top: int = 10) -> MemoryProfiler:
+    """Start profiling the memory of the process, see `MemoryProfiler`."""
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler(path, top)
+        _profiler.start()
+    return _profiler
+
+
+def stop_memory_profiling() -> None:
+    """Stop profiling the memory, if started."""
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+        _profiler = None
+
+
+def record_memory(boundary: str, **labels: Any) -> None:
+    """Take a memory snapshot at a turn or round boundary if profiling is
+    started, otherwise do nothing."""
+    if _profiler is not None:
+        _profiler.snapshot(boundary, **labels)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""A message log shared by the participants of a conversation, e.g. a
+debate, with the memory of each participant being a view into it.
+
+`MsgHub` broadcasts each message into the memory of every other
+participant, which `InMemoryMemory` deep-copies, so a message of a debate is
+stored (and serialized into the checkpoint) once per participant. With the
+log, it's stored and serialized once, while each memory only keeps the
+positions of its messages in the log:
+
+    log = MessageLog()
+    agents = [DebaterAgent(..., memory=LogMemory(log)) for ...]
+"""
+from copy import deepcopy
+from typing import Any
+
+from agentscope.memory import MemoryBase
+from agentscope.message import Msg
+from agentscope.module import StateModule
+
+
+class MessageLog(StateModule):
+    """An append-only log of messages, deduplicated by their IDs."""
+
+    def __init__(self) -> None:
+        """Initialize an empty log."""
+        super().__init__()
+        self.msgs: list[Msg] = []
+        self._positions: dict[str, int] = {}
+
+    def append(self, msg: Msg) -> int:
+        """Append a copy of the message unless it's logged already.
+
+        Args:
+            msg (`Msg`):
+                The message.
+
+        Returns:
+            `int`:
+                The position of the message in the log.
+        """
+        position = self._positions.get(msg.id)
+        if position is None:
+            position = len(self.msgs)
+            self.msgs.append(deepcopy(msg))
+            self._positions[msg.id] = position
+        return position
+
+    def __len__(self) -> int:
+        return len(self.msgs)
+
+    def state_dict(self) -> dict:
+        """Get the state dictionary for serialization."""
+        return {"msgs": [msg.to_dict() for msg in self.msgs]}
+
+    def load_state_dict(self, state_dict: dict, strict: bool = True) -> None:
+        """Load the state dictionary for deserialization."""
+        if strict and "msgs" not in state_dict:
+            raise KeyError(
+                "The state_dict does not contain 'msgs' keys required for "
+                "MessageLog.",
+            )
+        self.msgs = [Msg.from_dict(_) for _ in state_dict.get("msgs", [])]
+        self._positions = {msg.id: i for i, msg in enumerate(self.msgs)}
+
+
+class LogMemory(MemoryBase):
+    """The memory of a participant, as the positions of its messages in the
+    shared log together with their marks. Deleting a message only removes it
+    from this memory, the log keeps it for the other participants."""
+
+    def __init__(self, log: MessageLog) -> None:
+        """Initialize an empty view into the log.
+
+        Args:
+            log (`MessageLog`):
+                The shared message log.
+        """
+        super().__init__()
+        self.log = log
+        self.entries: list[tuple[int, list[str]]] = []
+        self._positions: set[int] = set()
+
+    async def get_memory(
+        self,
+        mark: str | None = None,
+        exclude_mark: str | None = None,
+        prepend_summary: bool = True,
+        **kwargs: Any,
+    ) -> list[Msg]:
+        """Get the messages with the mark and without the excluded mark, see
+        `InMemoryMemory.get_memory`."""
+        msgs = [
+            self.log.msgs[position]
+            for position, marks in self.entries
+            if (mark is None or mark in marks)
+            and (exclude_mark is None or exclude_mark not in marks)
+        ]
+        if prepend_summary and self._compressed_summary:
+            return [Msg("user", self._compressed_summary, "user"), *msgs]
+        return msgs
+
+    async def add(
+        self,
+        memories: Msg | list[Msg] | None,
+        marks: str | list[str] | None = None,
+        allow_duplicates: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Add the message(s) into the log and this memory, with the
+        mark(s) if given."""
+        if memories is None:
+            return
+        if isinstance(memories, Msg):
+            memories = [memories]
+
+        if marks is None:
+            marks = []
+        elif isinstance(marks, str):
+            marks = [marks]
+
+        for msg in memories:
+            position = self.log.append(msg)
+            if position in self._positions and not allow_duplicates:
+                continue
+            self._positions.add(position)
+            self.entries.append((position, list(marks)))
+
+    def _keep(self, entries: list[tuple[int, list[str]]]) -> int:
+        """Keep the given entries, returning the number of removed ones."""
+        n_removed = len(self.entries) - len(entries)
+        self.entries = entries
+        self._positions = {position for position, _ in entries}
+        return n_removed
+
+    async def delete(self, msg_ids: list[str], **kwargs: Any) -> int:
+        """Remove the message(s) from this memory by their IDs."""
+        return self._keep(
+            [
+                (position, marks)
+                for position, marks in self.entries
+                if self.log.msgs[position].id not in msg_ids
+            ],
+        )
+
+    async def delete_by_mark(self, mark: str | list[str], **kwargs: Any) -> int:
+        """Remove the messages with the mark(s) from this memory."""
+        if isinstance(mark, str):
+            mark = [mark]
+        return self._keep(
+            [
+                (position, marks)
+                for position, marks in self.entries
+                if not any(_ in marks for _ in mark)
+            ],
+        )
+
+    async def clear(self) -> None:
+        """Clear this memory, the log is kept."""
+        self._keep([])
+
+    async def size(self) -> int:
+        """Get the number of the messages in this memory."""
+        return len(self.entries)
+
+    async def update_messages_mark(
+        self,
+        new_mark: str | None,
+        old_mark: str | None = None,
+        msg_ids: list[str] | None = None,
+    ) -> int:
+        """Add, remove or change the marks of the messages, see
+        `InMemoryMemory.update_messages_mark`."""
+        updated_count = 0
+        for position, marks in self.entries:
+            if msg_ids is not None and self.log.msgs[position].id not in msg_ids:
+                continue
+            if old_mark is not None and old_mark not in marks:
+                continue
+
+            if new_mark is None:
+                if old_mark in marks:
+                    marks.remove(old_mark)
+                    updated_count += 1
+            else:
+                if old_mark is not None and old_mark in marks:
+                    marks.remove(old_mark)
+                if new_mark not in marks:
+                    marks.append(new_mark)
+                    updated_count += 1
+        return updated_count
+
+    def state_dict(self) -> dict:
+        """Get the state dictionary, i.e. the positions in the log, which is
+        serialized on its own."""
+        return {
+            "_compressed_summary": self._compressed_summary,
+            "entries": [[position, marks] for position, marks in self.entries],
+        }
+
+    def load_state_dict(self, state_dict: dict, strict: bool = True) -> None:
+        """Load the state dictionary after the log is loaded. The state of an
+        `InMemoryMemory` (with the messages themselves) is accepted too, and
+        its messages are added into the log."""
+        self._compressed_summary = state_dict.get("_compressed_summary", "")
+
+        if "content" in state_dict:
+            entries = []
+            for item in state_dict["content"]:
+                msg_dict, marks = (
+                    item if isinstance(item, (tuple, list)) else (item, [])
+                )
+                entries.append((self.log.append(Msg.from_dict(msg_dict)), marks))
+        elif strict and "entries" not in state_dict:
+            raise KeyError(
+                "The state_dict does not contain 'entries' keys required for "
+                "LogMemory.",
+            )
+        else:
+            entries = [
+                (position, marks)
+                for position, marks in state_dict.get("entries", [])
+            ]
+        self._keep(entries)
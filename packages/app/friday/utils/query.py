@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Parse the query content of Friday from the command line or a query file.
+
+Large multimodal queries carry their images as base64 strings. Before
+parsing, these strings are decoded from the raw (memory-mapped) query into
+the blob store, and the image sources refer to the stored files instead, so
+the parsed content, the agent memory and the session stay small."""
+import json
+import mmap
+import os
+import re
+from typing import Any
+
+import json5
+
+from utils.blob_store import BlobStore
+from utils.serializer import get_serializer
+
+# The base64 strings shorter than this are kept inline
+MIN_BLOB_SIZE = 4096
+
+# The "data" field of a base64 source, or a base64 data URL
+_BASE64_STRING = re.compile(
+    rb'(?P<key>"data"\s*:\s*)"(?P<data>[A-Za-z0-9+/]{%d,}={0,2})"'
+    rb'|"data:[\w.+-]+/[\w.+-]+;base64,(?P<url>[A-Za-z0-9+/]{%d,}={0,2})"'
+    % (MIN_BLOB_SIZE, MIN_BLOB_SIZE),
+)
+
+# The placeholder of an offloaded base64 source, followed by the blob path
+_BLOB_PREFIX = "friday-blob:"
+
+
+def _offload_base64(raw: bytes | mmap.mmap, blob_store: BlobStore) -> bytes:
+    """Move the large base64 strings of the raw JSON into the blob store,
+    returning the JSON with references to the stored files."""
+    parts = []
+    pos = 0
+    with memoryview(raw) as view:
+        for match in _BASE64_STRING.finditer(raw):
+            parts.append(raw[pos : match.start()])
+            if match.group("key") is not None:
+                path = blob_store.put_base64(
+                    view[match.start("data") : match.end("data")],
+                )
+                parts.append(match.group("key"))
+                parts.append(json.dumps(_BLOB_PREFIX + path).encode("utf-8"))
+            else:
+                path = blob_store.put_base64(
+                    view[match.start("url") : match.end("url")],
+                )
+                parts.append(json.dumps(path).encode("utf-8"))
+            pos = match.end()
+    parts.append(raw[pos:])
+    return b"".join(parts)
+
+
+def _resolve_blobs(content: Any) -> Any:
+    """Turn the offloaded base64 sources into URL sources of the blobs."""
+    if isinstance(content, list):
+        return [_resolve_blobs(_) for _ in content]
+    if isinstance(content, dict):
+        data = content.get("data")
+        if (
+            content.get("type") == "base64"
+            and isinstance(data, str)
+            and data.startswith(_BLOB_PREFIX)
+        ):
+            return {"type": "url", "url": data[len(_BLOB_PREFIX) :]}
+        return {key: _resolve_blobs(value) for key, value in content.items()}
+    return content
+
+
+def parse_json(raw: bytes | str) -> Any:
+    """Parse strict JSON by the JSON serializer, falling back to json5 for
+    the relaxed syntax."""
+    try:
+        return get_serializer("json").loads(raw)
+    except ValueError:
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8")
+        return json5.loads(raw)
+
+
+def load_query(
+    query: str | None = None,
+    query_file: str | None = None,
+    blob_store: BlobStore | None = None,
+) -> Any:
+    """Load the query content from the argument or the query file.
+
+    Args:
+        query (`str | None`, optional):
+            The query content in JSON.
+        query_file (`str | None`, optional):
+            The path to a file of the query content in JSON, used if given.
+        blob_store (`BlobStore | None`, optional):
+            The store of the large base64 data, kept inline if not given.
+
+    Returns:
+        `Any`:
+            The parsed query content, i.e. a string or content blocks.
+    """
+    if query_file:
+        with open(query_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raw = b""
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if blob_store is not None:
+                        raw = _offload_base64(mm, blob_store)
+                    else:
+                        raw = mm[:]
+    else:
+        raw = query.encode("utf-8")
+        if blob_store is not None:
+            raw = _offload_base64(raw, blob_store)
+
+    return _resolve_blobs(parse_json(raw))
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+"""Client-side rate limiting of the model requests, so that the concurrent
+agents sharing one provider account stay under its rate limits.
+
+The requests to the same provider and model share one `RateLimiter`, which
+bounds the requests and tokens per minute by token buckets, and adjusts the
+number of concurrent requests AIMD-style: it grows additively while the
+latency stays close to the best observed one, and shrinks multiplicatively
+when the provider answers 429 or the latency surges."""
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, AsyncGenerator
+
+from agentscope.model import ChatModelBase, ChatResponse
+
+from utils.usage import record_model_usage
+
+# The status code in the error of a failed DashScope response
+_DASHSCOPE_STATUS = re.compile(r'"status_code":\s*(\d{3})\b')
+
+
+class TokenBucket:
+    """A token bucket refilled at a constant rate. Each request takes one
+    token, and waits until one is available, so bursts up to the bucket
+    capacity pass immediately while the average rate is bounded."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Initialize the token bucket.
+
+        Args:
+            rate (`float`):
+                The number of tokens refilled per second.
+            capacity (`float | None`, optional):
+                The maximum number of tokens in the bucket, i.e. the largest
+                burst. Defaults to one second worth of tokens, at least 1.
+        """
+        if rate <= 0:
+            raise ValueError(f"The rate must be positive, got {rate}.")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """The lock of the waiters, created for the running event loop, as
+        the bucket may outlive an `asyncio.run` call."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated_at) * self.rate,
+        )
+        self._updated_at = now
+
+    async def acquire(self, n: float = 1) -> None:
+        """Take `n` tokens from the bucket, waiting until they're available.
+        The waiters are served in arrival order. A request larger than the
+        bucket waits for a full bucket.
+
+        Args:
+            n (`float`, defaults to `1`):
+                The number of tokens to take.
+        """
+        async with self._get_lock():
+            self._refill()
+            needed = min(n, self.capacity)
+            while self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= n
+
+    def adjust(self, n: float) -> None:
+        """Take (or give back, if negative) `n` tokens without waiting, e.g.
+        to correct an estimated amount once the actual one is known. The
+        bucket may go into debt, which delays the following requests."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - n)
+
+
+def _estimate_tokens(value: Any) -> int:
+    """Roughly estimate the number of tokens of the formatted messages, as
+    4 characters per token. Inline (base64) data is counted as a flat amount,
+    since providers bill images by their size in pixels."""
+    if isinstance(value, str):
+        if value.startswith("data:"):
+            return 1000
+        return len(value) // 4 + 1
+    if isinstance(value, dict):
+        return sum(_estimate_tokens(_) for _ in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_tokens(_) for _ in value)
+    if value is None:
+        return 0
+    return len(json.dumps(value, default=str)) // 4 + 1
+
+
+def _get_status_code(error: Exception) -> int | None:
+    """The HTTP status code of the provider's error response, if any."""
+    for obj in (error, getattr(error, "response", None)):
+        # OpenAI, Anthropic and Ollama errors (and their httpx responses)
+        # carry `status_code`, Gemini errors carry `code`
+        for name in ("status_code", "code"):
+            status = getattr(obj, name, None)
+            if isinstance(status, int):
+                return status
+    # DashScope raises a RuntimeError with the failed response
+    match = _DASHSCOPE_STATUS.search(str(error))
+    if match is not None:
+        return int(match.group(1))
+    return None
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """If the error is the provider's 429 (Too Many Requests) response."""
+    return _get_status_code(error) == 429
+
+
+def _is_transient(error: Exception) -> bool:
+    """If the request may succeed when sent again, i.e. the error is a
+    timeout, a lost connection or a 408, 409 or 5xx response."""
+    status = _get_status_code(error)
+    if status is not None:
+        return status in (408, 409) or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # The connection errors of the OpenAI and Anthropic SDKs (including
+    # their timeouts) and of httpx, matched by name as the SDKs are optional
+    return any(
+        cls.__name__ in ("APIConnectionError", "TransportError")
+        for cls in type(error).__mro__
+    )
+
+
+def _get_retry_after(error: Exception) -> float | None:
+    """The delay in seconds the provider asks for, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """The rate limiter of a provider and model, shared by all the models
+    sending requests to it."""
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 32,
+        latency_tolerance: float = 2.0,
+        max_retries: int = 5,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            requests_per_minute (`float | None`, optional):
+                The maximum number of requests per minute, unlimited if not
+                given.
+            tokens_per_minute (`float | None`, optional):
+                The maximum number of (prompt and completion) tokens per
+                minute, unlimited if not given.
+            initial_concurrency (`int`, defaults to `4`):
+                The number of concurrent requests to start with.
+            max_concurrency (`int`, defaults to `32`):
+                The upper bound of the concurrent requests.
+            latency_tolerance (`float`, defaults to `2.0`):
+                The concurrency shrinks when the latency (to the first chunk
+                for streaming) exceeds this multiple of the best observed one.
+            max_retries (`int`, defaults to `5`):
+                The number of retries of a request answered with 429 or
+                failed by a transient error.
+            max_backoff (`float`, defaults to `60.0`):
+                The maximum delay in seconds before a retry.
+        """
+        self.request_bucket: TokenBucket | None = None
+        self.token_bucket: TokenBucket | None = None
+        self.set_limits(requests_per_minute, tokens_per_minute)
+
+        self.concurrency = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.latency_tolerance = latency_tolerance
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+
+        self.n_active = 0
+        self.n_rate_limited = 0
+        self.n_transient_errors = 0
+        self._base_latency: float | None = None
+        self._last_decrease = 0.0
+        self._waiters: list[asyncio.Future] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def set_limits(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ) -> None:
+        """Set the requests and tokens per minute. The limits not given are
+        left unchanged."""
+        if requests_per_minute and (
+            self.request_bucket is None
+            or self.request_bucket.rate != requests_per_minute / 60
+        ):
+            self.request_bucket = TokenBucket(rate=requests_per_minute / 60)
+        if tokens_per_minute and (
+            self.token_bucket is None
+            or self.token_bucket.rate != tokens_per_minute / 60
+        ):
+            self.token_bucket = TokenBucket(
+                rate=tokens_per_minute / 60,
+                capacity=tokens_per_minute,
+            )
+
+    async def _acquire_slot(self) -> None:
+        """Wait for a concurrency slot."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The limiter may outlive an `asyncio.run` call
+            self._loop = loop
+            self._waiters = []
+            self.n_active = 0
+
+        while self.n_active >= max(1, int(self.concurrency)):
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.n_active += 1
+
+    async def acquire(self, n_tokens: int) -> None:
+        """Wait for a concurrency slot and the rate limits.
+
+        Args:
+            n_tokens (`int`):
+                The estimated number of tokens of the request.
+        """
+        await self._acquire_slot()
+        try:
+            if self.request_bucket is not None:
+                await self.request_bucket.acquire()
+            if self.token_bucket is not None:
+                await self.token_bucket.acquire(n_tokens)
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Release the concurrency slot. It doesn't wait, so that a cancelled
+        request always gives its slot back."""
+        self.n_active = max(0, self.n_active - 1)
+        # The waiters check the (maybe changed) concurrency again
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    def _decrease(self, factor: float) -> None:
+        """Shrink the concurrency, at most once per the base latency, as the
+        requests in flight at the time report the same congestion."""
+        now = time.monotonic()
+        if now - self._last_decrease < max(1.0, self._base_latency or 0):
+            return
+        self._last_decrease = now
+        self.concurrency = max(1.0, self.concurrency * factor)
+
+    def on_success(self, latency: float) -> None:
+        """Adjust the concurrency by the observed latency of a request.
+
+        Args:
+            latency (`float`):
+                The time in seconds until the first (streamed) response.
+        """
+        if self._base_latency is None or latency < self._base_latency:
+            self._base_latency = latency
+        else:
+            # Let the baseline follow a slower provider over time
+            self._base_latency += 0.01 * (latency - self._base_latency)
+
+        if latency > self.latency_tolerance * self._base_latency:
+            self._decrease(0.8)
+        else:
+            # About one more request per round trip of all the slots
+            self.concurrency = min(
+                float(self.max_concurrency),
+                self.concurrency + 1 / self.concurrency,
+            )
+
+    def on_rate_limited(self, error: Exception, n_retry: int) -> float:
+        """Halve the concurrency after a 429 response.
+
+        Args:
+            error (`Exception`):
+                The error of the 429 response.
+            n_retry (`int`):
+                The number of the retries so far.
+
+        Returns:
+            `float`:
+                The delay in seconds before retrying, as asked by the
+                provider, or an exponential backoff with jitter.
+        """
+        self.n_rate_limited += 1
+        self._decrease(0.5)
+        return self._get_backoff(error, n_retry)
+
+    def on_transient_error(self, error: Exception, n_retry: int) -> float:
+        """Count a request failed by a transient error, e.g. a 5xx response,
+        a timeout or a reset connection, which leaves the concurrency as is.
+
+        Args:
+            error (`Exception`):
+                The transient error.
+            n_retry (`int`):
+                The number of the retries so far.
+
+        Returns:
+            `float`:
+                The delay in seconds before retrying, see `on_rate_limited`.
+        """
+        self.n_transient_errors += 1
+        return self._get_backoff(error, n_retry)
+
+    def _get_backoff(self, error: Exception, n_retry: int) -> float:
+        """The delay before a retry, as asked by the provider, or an
+        exponential backoff with jitter."""
+        delay = _get_retry_after(error)
+        if delay is None:
+            delay = random.uniform(0.5, 1.0) * 2**n_retry
+        return min(delay, self.max_backoff)
+
+    def record_usage(self, n_estimated: int, n_actual: int | None) -> None:
+        """Correct the estimated tokens of a request by its usage."""
+        if self.token_bucket is not None and n_actual is not None:
+            self.token_bucket.adjust(n_actual - n_estimated)
+
+
+# The rate limiters by provider and model name
+_rate_limiters: dict[tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(
+    provider: str,
+    model_name: str,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+) -> RateLimiter:
+    """Get the rate limiter shared by the models of the provider and model
+    name, creating it if needed. The given limits update the existing one.
+
+    Args:
+        provider (`str`):
+            The model provider, e.g. "openai".
+        model_name (`str`):
+            The model name.
+        requests_per_minute (`float | None`, optional):
+            The maximum number of requests per minute.
+        tokens_per_minute (`float | None`, optional):
+            The maximum number of tokens per minute.
+
+    Returns:
+        `RateLimiter`:
+            The shared rate limiter.
+    """
+    key = (provider.lower(), model_name)
+    if key not in _rate_limiters:
+        _rate_limiters[key] = RateLimiter(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
+    else:
+        _rate_limiters[key].set_limits(requests_per_minute, tokens_per_minute)
+    return _rate_limiters[key]
+
+
+class RateLimitedChatModel(ChatModelBase):
+    """A chat model that sends the requests to the wrapped model through a
+    rate limiter, retrying the ones rejected with 429 or failed by a
+    transient error, in place of the retries of the provider clients. For
+    streaming, the concurrency slot is held until the stream ends. The usage
+    and latency of each request are recorded into the current
+    `usage_scope`."""
+
+    def __init__(self, model: ChatModelBase, limiter: RateLimiter) -> None:
+        """Initialize the rate limited model.
+
+        Args:
+            model (`ChatModelBase`):
+                The model to send the requests.
+            limiter (`RateLimiter`):
+                The rate limiter, shared by the models of the same provider
+                and model name.
+        """
+        super().__init__(model.model_name, model.stream)
+        self.model = model
+        self.limiter = limiter
+
+    async def __call__(
+        self,
+        *args: Any,
+        **kwargs: Any,
+    ) -> ChatResponse | AsyncGenerator[ChatResponse, None]:
+        messages = kwargs.get("messages", args[0] if args else None)
+        n_estimated = _estimate_tokens(messages) + _estimate_tokens(
+            kwargs.get("tools"),
+        )
+
+        n_retry = 0
+        while True:
+            await self.limiter.acquire(n_estimated)
+            start = time.monotonic()
+            try:
+                res = await self.model(*args, **kwargs)
+            except Exception as e:
+                self.limiter.release()
+                if n_retry >= self.limiter.max_retries:
+                    raise
+                if _is_rate_limited(e):
+                    delay = self.limiter.on_rate_limited(e, n_retry)
+                elif _is_transient(e):
+                    delay = self.limiter.on_transient_error(e, n_retry)
+                else:
+                    raise
+                await asyncio.sleep(delay)
+                n_retry += 1
+                continue
+            except BaseException:
+                self.limiter.release()
+                raise
+            break
+
+        if isinstance(res, ChatResponse):
+            latency = time.monotonic() - start
+            self.limiter.on_success(latency)
+            self.limiter.record_usage(n_estimated, self._get_n_tokens(res))
+            self.limiter.release()
+            record_model_usage(self.model_name, res, latency, latency)
+            return res
+
+        return self._stream(res, start, n_estimated)
+
+    @staticmethod
+    def _get_n_tokens(res: ChatResponse | None) -> int | None:
+        """The number of tokens used by the request, if reported."""
+        if res is None or res.usage is None:
+            return None
+        return res.usage.input_tokens + res.usage.output_tokens
+
+    async def _stream(
+        self,
+        res: AsyncGenerator[ChatResponse, None],
+        start: float,
+        n_estimated: int,
+    ) -> AsyncGenerator[ChatResponse, None]:
+        """Forward the stream, measuring the latency to its first chunk."""
+        last, ttft = None, None
+        try:
+            async for chunk in res:
+                if last is None:
+                    ttft = time.monotonic() - start
+                    self.limiter.on_success(ttft)
+                last = chunk
+                yield chunk
+        finally:
+            self.limiter.record_usage(n_estimated, self._get_n_tokens(last))
+            self.limiter.release()
+            record_model_usage(
+                self.model_name,
+                last,
+                ttft,
+                time.monotonic() - start,
+            )
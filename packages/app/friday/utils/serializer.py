@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""The serializers of the payloads pushed to the studio, the session files,
+the debate checkpoints and the queries.
+
+JSON is encoded by orjson if it's installed (otherwise by the standard
+library), and msgpack is available with the `msgpack` package. Serializing
+a large payload, e.g. a long session history or a message with inline
+images, takes long enough to stall the event loop, so `serialize` runs it in
+a worker thread above `OFFLOAD_SIZE`:
+
+    serializer = get_serializer("msgpack")
+    data = await serialize(session_state, serializer)
+"""
+import asyncio
+import base64
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# The estimated payload size in bytes above which it's serialized off the
+# event loop
+OFFLOAD_SIZE = 256 * 1024
+
+
+def _default(obj: Any) -> Any:
+    """Encode the values without a native representation, i.e. the binary
+    data as base64 and the others as strings."""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    return str(obj)
+
+
+class Serializer:
+    """The base of the serializers."""
+
+    name: str
+    """The name of the format, e.g. "json"."""
+
+    extension: str
+    """The file extension of the format, e.g. ".json"."""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize the object."""
+        raise NotImplementedError
+
+    def loads(self, data: bytes | str) -> Any:
+        """Deserialize the data."""
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+    """JSON by orjson, or by the standard library if it isn't installed."""
+
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize the object into UTF-8 JSON."""
+        if orjson is not None:
+            return orjson.dumps(
+                obj,
+                default=_default,
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(obj, ensure_ascii=False, default=_default).encode(
+            "utf-8",
+        )
+
+    def loads(self, data: bytes | str) -> Any:
+        """Deserialize the JSON data."""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack, which keeps the binary data as-is and is more compact than
+    JSON."""
+
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def __init__(self) -> None:
+        """Initialize the serializer, requiring the msgpack package."""
+        if msgpack is None:
+            raise ImportError(
+                "The msgpack serializer requires the msgpack package, "
+                "install it by `pip install msgpack`.",
+            )
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize the object into msgpack."""
+        return msgpack.packb(obj, default=str, use_bin_type=True)
+
+    def loads(self, data: bytes | str) -> Any:
+        """Deserialize the msgpack data."""
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+SERIALIZERS: dict[str, type[Serializer]] = {
+    "json": JSONSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+_instances: dict[str, Serializer] = {}
+
+
+def get_serializer(name: str = "json") -> Serializer:
+    """Get the serializer of the format.
+
+    Args:
+        name (`str`, defaults to `"json"`):
+            The format, one of `SERIALIZERS`.
+
+    Returns:
+        `Serializer`:
+            The serializer, shared by the callers.
+    """
+    if name not in _instances:
+        if name not in SERIALIZERS:
+            raise ValueError(
+                f"Unknown serializer '{name}', expected one of "
+                f"{list(SERIALIZERS)}.",
+            )
+        _instances[name] = SERIALIZERS[name]()
+    return _instances[name]
+
+
+def estimate_size(obj: Any, limit: int = OFFLOAD_SIZE) -> int:
+    """Estimate the serialized size of the object by its strings and binary
+    data, stopping once the limit is exceeded."""
+    size = 0
+    stack = [obj]
+    while stack and size <= limit:
+        item = stack.pop()
+        if isinstance(item, (str, bytes, bytearray)):
+            size += len(item)
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        else:
+            size += 8
+    return size
+
+
+async def serialize(
+    obj: Any,
+    serializer: Serializer | None = None,
+    offload_size: int = OFFLOAD_SIZE,
+) -> bytes:
+    """Serialize the object, in a worker thread if it's large so that the
+    event loop isn't blocked.
+
+    Args:
+        obj (`Any`):
+            The object to serialize. It mustn't be modified until serialized.
+        serializer (`Serializer | None`, optional):
+            The serializer, JSON by default.
+        offload_size (`int`, defaults to `OFFLOAD_SIZE`):
+            The estimated size in bytes above which the object is serialized
+            in a worker thread.
+
+    Returns:
+        `bytes`:
+            The serialized data.
+    """
+    serializer = serializer or get_serializer()
+    if estimate_size(obj, offload_size) > offload_size:
+        return await asyncio.to_thread(serializer.dumps, obj)
+    return serializer.dumps(obj)
+
+
+class SocketIOJSON:
+    """The JSON module given to python-socketio, which encodes the packets
+    by orjson instead of the standard library."""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        """Serialize the packet data, the separators are always compact."""
+        return get_serializer("json").dumps(obj).decode("utf-8")
+
+    @staticmethod
+    def loads(data: str | bytes, **kwargs: Any) -> Any:
+        """Deserialize the packet data."""
+        return get_serializer("json").loads(data)
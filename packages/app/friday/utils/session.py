@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""The dialog sessions of Friday, stored as one JSON (or msgpack) file per
+session next to an index with their size and last-access time. Besides the
+agent state, a session file keeps the token usage of each turn."""
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import time
+
+from agentscope.agent import AgentBase
+
+from utils.common import file_lock, write_file_atomic
+from utils.serializer import SERIALIZERS, Serializer, get_serializer, serialize
+
+NAME_INDEX_FILE = "sessions_index.json"
+NAME_ARCHIVE_DIR = "archive"
+
+
+class SessionManager:
+    """Load and save the agent state by session ID. The token usage of the
+    turns of a loaded session is kept, so that the session file is read
+    once per turn. The session index is locked across the processes, so
+    it's only accessed in a worker thread, off the event loop."""
+
+    def __init__(
+        self,
+        save_dir: str,
+        serializer: Serializer | None = None,
+    ) -> None:
+        """Initialize the session manager.
+
+        Args:
+            save_dir (`str`):
+                The directory of the session files.
+            serializer (`Serializer | None`, optional):
+                The format of the saved session files, JSON by default. The
+                sessions saved in another format are still loaded, and
+                converted when saved next time.
+        """
+        self.save_dir = save_dir
+        self.serializer = serializer or get_serializer()
+
+        # session_id -> the usage of the turns of the loaded sessions
+        self._usage: dict[str, list[dict]] = {}
+
+    def _get_save_path(self, session_id: str) -> str:
+        """The path of the session file, the same as `JSONSession`'s in
+        JSON."""
+        return os.path.join(
+            self.save_dir,
+            f"{session_id}{self.serializer.extension}",
+        )
+
+    def _find_session_file(self, session_id: str) -> str | None:
+        """Find the session file, in the current format or else in the
+        others."""
+        paths = [self._get_save_path(session_id)] + [
+            os.path.join(self.save_dir, f"{session_id}{_.extension}")
+            for _ in SERIALIZERS.values()
+            if _.extension != self.serializer.extension
+        ]
+        for path in paths:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _get_index_path(self) -> str:
+        """The path of the session index file."""
+        return os.path.join(self.save_dir, NAME_INDEX_FILE)
+
+    def load_index(self) -> dict[str, dict]:
+        """Load the session index, mapping session IDs to their metadata."""
+        path = self._get_index_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, index: dict[str, dict]) -> None:
+        """Save the session index atomically. The index is shared by the
+        Friday processes, so it must be read, updated and saved under
+        `file_lock`."""
+        os.makedirs(self.save_dir, exist_ok=True)
+        write_file_atomic(
+            self._get_index_path(),
+            json.dumps(index, ensure_ascii=False, indent=2),
+        )
+
+    def _touch(self, session_id: str, size: int | None = None) -> None:
+        """Update the last-access time (and size) of the session."""
+        os.makedirs(self.save_dir, exist_ok=True)
+        with file_lock(self._get_index_path()):
+            index = self.load_index()
+            now = time.time()
+            meta = index.setdefault(
+                session_id,
+                {"created_at": now, "size": 0},
+            )
+            meta["last_access"] = now
+            if size is not None:
+                meta["size"] = size
+            self._save_index(index)
+
+    async def load(self, session_id: str, agent: AgentBase) -> None:
+        """Load the session into the agent.
+
+        Args:
+            session_id (`str`):
+                The session ID.
+            agent (`AgentBase`):
+                The agent to load the state into.
+        """
+        path = self._find_session_file(session_id)
+        if path is None:
+            return
+
+        states = await asyncio.to_thread(self._read, path)
+        if "friday" in states:
+            agent.load_state_dict(states["friday"])
+        self._usage[session_id] = states.get("usage", [])
+        await asyncio.to_thread(self._touch, session_id)
+
+    @staticmethod
+    def _read(path: str) -> dict:
+        """Read a session file by the serializer of its extension."""
+        extension = os.path.splitext(path)[1]
+        serializer = next(
+            get_serializer(name)
+            for name, cls in SERIALIZERS.items()
+            if cls.extension == extension
+        )
+        with open(path, "rb") as f:
+            return serializer.loads(f.read())
+
+    async def get_usage(self, session_id: str) -> list[dict]:
+        """Get the token usage of each turn of the session.
+
+        Args:
+            session_id (`str`):
+                The session ID.
+
+        Returns:
+            `list[dict]`:
+                The usage summaries of the turns, in order.
+        """
+        if session_id in self._usage:
+            return list(self._usage[session_id])
+
+        path = self._find_session_file(session_id)
+        if path is None:
+            return []
+        states = await asyncio.to_thread(self._read, path)
+        return states.get("usage", [])
+
+    async def save(
+        self,
+        session_id: str,
+        agent: AgentBase,
+        usage: dict | None = None,
+    ) -> None:
+        """Save the agent state into the session.
+
+        Args:
+            session_id (`str`):
+                The session ID.
+            agent (`AgentBase`):
+                The agent whose state is saved.
+            usage (`dict | None`, optional):
+                The token usage of the turn, appended to the ones of the
+                previous turns.
+        """
+        path = self._get_save_path(session_id)
+        old_path = self._find_session_file(session_id)
+        turns = await self.get_usage(session_id)
+        if usage is not None:
+            turns.append(usage)
+        # A long history is serialized off the event loop
+        content = await serialize(
+            {"friday": agent.state_dict(), "usage": turns},
+            self.serializer,
+        )
+
+        def _write() -> None:
+            os.makedirs(self.save_dir, exist_ok=True)
+            write_file_atomic(path, content)
+            # Converted from another format
+            if old_path is not None and old_path != path:
+                os.remove(old_path)
+            self._touch(session_id, size=os.path.getsize(path))
+
+        await asyncio.to_thread(_write)
+        self._usage[session_id] = turns
+
+    async def archive(
+        self,
+        max_sessions: int | None = None,
+        max_age_days: float | None = None,
+        keep: tuple[str, ...] = (),
+    ) -> list[str]:
+        """Compress the old sessions into the archive directory and remove
+        them from the index.
+
+        Args:
+            max_sessions (`int | None`, optional):
+                The maximum number of sessions to keep, the least recently
+                accessed ones are archived first.
+            max_age_days (`float | None`, optional):
+                Archive the sessions not accessed for this many days.
+            keep (`tuple[str, ...]`, defaults to `()`):
+                The session IDs that are never archived, e.g. the current one.
+
+        Returns:
+            `list[str]`:
+                The archived session IDs.
+        """
+
+        def _archive_locked() -> list[str]:
+            os.makedirs(self.save_dir, exist_ok=True)
+            # The other processes don't touch the index while it's archived
+            # from
+            with file_lock(self._get_index_path()):
+                return self._archive(max_sessions, max_age_days, keep)
+
+        return await asyncio.to_thread(_archive_locked)
+
+    def _archive(
+        self,
+        max_sessions: int | None,
+        max_age_days: float | None,
+        keep: tuple[str, ...],
+    ) -> list[str]:
+        """Archive the old sessions, holding the lock of the index."""
+        index = self.load_index()
+        candidates = sorted(
+            (_ for _ in index if _ not in keep),
+            key=lambda _: index[_]["last_access"],
+        )
+
+        to_archive = set()
+        if max_age_days is not None:
+            deadline = time.time() - max_age_days * 86400
+            to_archive.update(
+                _ for _ in candidates if index[_]["last_access"] < deadline
+            )
+        if max_sessions is not None:
+            n_over = len(index) - len(to_archive) - max_sessions
+            remaining = [_ for _ in candidates if _ not in to_archive]
+            to_archive.update(remaining[: max(0, n_over)])
+
+        archive_dir = os.path.join(self.save_dir, NAME_ARCHIVE_DIR)
+        os.makedirs(archive_dir, exist_ok=True)
+        for session_id in to_archive:
+            path = self._find_session_file(session_id)
+            if path is not None:
+                with open(path, "rb") as f_in, gzip.open(
+                    os.path.join(archive_dir, f"{os.path.basename(path)}.gz"),
+                    "wb",
+                ) as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                os.remove(path)
+            index.pop(session_id)
+            self._usage.pop(session_id, None)
+
+        if to_archive:
+            self._save_index(index)
+        return sorted(to_archive)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Token usage and latency accounting of the model calls.
+
+The model calls are attributed by the labels of the enclosing
+`usage_scope`, e.g. the agent and the debate round, and recorded into the
+tracker of the scope:
+
+    tracker = UsageTracker()
+    with usage_scope(tracker, agent="Friday", turn=1):
+        await agent(msg)
+    tracker.summary()
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Generator
+
+from agentscope.model import ChatResponse
+
+# The tracker and the labels of the running model calls
+_usage_scope: ContextVar[tuple["UsageTracker | None", dict]] = ContextVar(
+    "usage_scope",
+    default=(None, {}),
+)
+
+# The grouping labels reported by the summary
+USAGE_LABELS = ("agent", "round", "turn")
+
+
+def _get_cached_tokens(metadata: Any) -> int:
+    """The number of prompt tokens served from the provider's cache, read
+    from the raw usage of OpenAI, Anthropic, DashScope or Gemini."""
+    if metadata is None:
+        return 0
+
+    def _get(obj: Any, key: str) -> Any:
+        if isinstance(obj, dict):
+            return obj.get(key)
+        return getattr(obj, key, None)
+
+    details = _get(metadata, "prompt_tokens_details")
+    for value in (
+        _get(details, "cached_tokens") if details is not None else None,
+        _get(metadata, "cache_read_input_tokens"),
+        _get(metadata, "cached_content_token_count"),
+    ):
+        if isinstance(value, int):
+            return value
+    return 0
+
+
+class UsageTracker:
+    """Collect the usage of the model calls and aggregate it by label."""
+
+    def __init__(self) -> None:
+        """Initialize an empty tracker."""
+        self.records: list[dict[str, Any]] = []
+
+    def record(
+        self,
+        model_name: str,
+        response: ChatResponse | None,
+        ttft: float | None,
+        latency: float,
+        labels: dict[str, Any],
+    ) -> None:
+        """Record a model call.
+
+        Args:
+            model_name (`str`):
+                The name of the called model.
+            response (`ChatResponse | None`):
+                The (last streamed) response, whose usage is recorded.
+            ttft (`float | None`):
+                The time to the first streamed chunk in seconds.
+            latency (`float`):
+                The total time of the call in seconds.
+            labels (`dict[str, Any]`):
+                The labels of the call, e.g. the agent name.
+        """
+        usage = response.usage if response is not None else None
+        self.records.append(
+            {
+                **labels,
+                "model": model_name,
+                "input_tokens": usage.input_tokens if usage else 0,
+                "output_tokens": usage.output_tokens if usage else 0,
+                "cached_tokens": _get_cached_tokens(
+                    usage.metadata if usage else None,
+                ),
+                "ttft": ttft,
+                "latency": latency,
+            },
+        )
+
+    @staticmethod
+    def _aggregate(records: list[dict[str, Any]]) -> dict[str, Any]:
+        """Sum up the tokens and the latencies of the records."""
+        ttfts = [_["ttft"] for _ in records if _["ttft"] is not None]
+        return {
+            "calls": len(records),
+            "input_tokens": sum(_["input_tokens"] for _ in records),
+            "output_tokens": sum(_["output_tokens"] for _ in records),
+            "cached_tokens": sum(_["cached_tokens"] for _ in records),
+            "mean_ttft": sum(ttfts) / len(ttfts) if ttfts else None,
+            "latency": sum(_["latency"] for _ in records),
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the usage in total and grouped by each label.
+
+        Returns:
+            `dict[str, Any]`:
+                The "total" usage, and for each label present in the
+                records, e.g. "by_agent", the usage of each of its values.
+        """
+        summary = {"total": self._aggregate(self.records)}
+        for label in USAGE_LABELS:
+            groups: dict[str, list] = {}
+            for record in self.records:
+                if label in record:
+                    groups.setdefault(str(record[label]), []).append(record)
+            if groups:
+                summary[f"by_{label}"] = {
+                    key: self._aggregate(value)
+                    for key, value in groups.items()
+                }
+        return summary
+
+
+@contextmanager
+def usage_scope(
+    tracker: UsageTracker | None = None,
+    **labels: Any,
+) -> Generator[None, None, None]:
+    """Attribute the model calls within the scope to the labels, and record
+    them into the tracker. The nested scopes inherit the tracker and the
+    labels of the outer ones.
+
+    Args:
+        tracker (`UsageTracker | None`, optional):
+            The tracker to record into, the outer one if not given.
+        **labels (`Any`):
+            The labels, e.g. `agent`, `round` or `turn`.
+    """
+    outer_tracker, outer_labels = _usage_scope.get()
+    token = _usage_scope.set(
+        (tracker or outer_tracker, {**outer_labels, **labels}),
+    )
+    try:
+        yield
+    finally:
+        _usage_scope.reset(token)
+
+
+def get_usage_tracker() -> UsageTracker | None:
+    """Get the tracker of the current scope, if any."""
+    return _usage_scope.get()[0]
+
+
+def get_usage_labels() -> dict[str, Any]:
+    """Get the labels of the current scope, e.g. the calling agent."""
+    return dict(_usage_scope.get()[1])
+
+
+def record_model_usage(
+    model_name: str,
+    response: ChatResponse | None,
+    ttft: float | None,
+    latency: float,
+) -> None:
+    """Record a model call into the tracker of the current scope, if any."""
+    tracker, labels = _usage_scope.get()
+    if tracker is not None:
+        tracker.record(model_name, response, ttft, latency, labels)
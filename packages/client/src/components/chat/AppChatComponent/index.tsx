@@ -1,5 +1,12 @@
 import { memo, useCallback, useEffect, useRef, useState } from 'react';
-import { BlockType, ContentBlocks, ImageBlock, ReplyData, SourceType } from '@shared/types';
+import {
+    BlockType,
+    ContentBlocks,
+    DebateEventData,
+    ImageBlock,
+    ReplyData,
+    SourceType,
+} from '@shared/types';
 import { Button, Flex, Switch, Tooltip, Upload, UploadFile } from 'antd';
 import ArrowDownIcon from '../../../assets/svgs/arrow-down.svg?react';
 import DeleteIcon from '../../../assets/svgs/delete.svg?react';
@@ -10,6 +17,7 @@ import { useMessageApi } from '@/context/MessageApiContext.tsx';
 import Lottie from 'lottie-react';
 import loadingData from '@/assets/lottie/loading.json';
 import UserInputComponent from '@/components/chat/UserInput';
+import DebateProgress from '@/components/chat/DebateProgress';
 import { useFridaySettingRoom } from '@/context/FridaySettingRoomContext.tsx';
 
 import type { GetProp, UploadProps } from 'antd';
@@ -32,6 +40,9 @@ interface Props {
     onInterruptReply: () => void;
     onCleanHistory: () => void;
     isCleaningHistory: boolean;
+    debateEvents?: DebateEventData[];
+    onAcceptDebate?: () => void;
+    onResumeDebate?: () => void;
 }
 
 const AppChatComponent = ({
@@ -42,6 +53,9 @@ const AppChatComponent = ({
     onInterruptReply,
     onCleanHistory,
     isCleaningHistory,
+    debateEvents = [],
+    onAcceptDebate,
+    onResumeDebate,
 }: Props) => {
     const { t } = useTranslation();
     const [attachment, setAttachment] = useState<ContentBlocks>([]);
@@ -246,6 +260,16 @@ const AppChatComponent = ({
                 gap={'small'}
                 align={'center'}
             >
+                {/* The rounds of the latest debate, with the interim verdict to accept */}
+                {onAcceptDebate ? (
+                    <DebateProgress
+                        debateEvents={debateEvents}
+                        isReplying={isReplying}
+                        onAcceptDebate={onAcceptDebate}
+                        onResumeDebate={onResumeDebate}
+                    />
+                ) : null}
+
                 {/* Debate mode controls */}
                 {fridayConfig?.debateConfig?.enabled && (
                     <Flex
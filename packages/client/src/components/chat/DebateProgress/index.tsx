@@ -0,0 +1,192 @@
+import { memo, useEffect, useState } from 'react';
+import { Button, Collapse, Flex, Tag, Tooltip } from 'antd';
+import { useTranslation } from 'react-i18next';
+import { DebateEvent, DebateEventData } from '@shared/types';
+
+interface Props {
+    debateEvents: DebateEventData[];
+    isReplying: boolean;
+    onAcceptDebate: () => void;
+    onResumeDebate?: () => void;
+}
+
+const TextSection = ({ title, text }: { title: string; text: unknown }) => {
+    if (!text) {
+        return null;
+    }
+    return (
+        <Flex vertical={true} gap={2}>
+            <div style={{ fontWeight: 550 }}>{title}</div>
+            <div style={{ whiteSpace: 'pre-wrap' }}>{String(text)}</div>
+        </Flex>
+    );
+};
+
+const RoundDiv = ({ events }: { events: DebateEvent[] }) => {
+    const { t } = useTranslation();
+    const verdict = events.find((event) => event.type === 'judge_verdict');
+    return (
+        <Flex vertical={true} gap={'small'} style={{ fontSize: 12 }}>
+            {events
+                .filter((event) => event.type === 'speaker_finished')
+                .map((event) => (
+                    <Flex key={String(event.speaker)} gap={'small'}>
+                        <div style={{ fontWeight: 550 }}>
+                            {String(event.speaker)}
+                        </div>
+                        <div style={{ color: 'var(--muted-foreground)' }}>
+                            {String(event.role ?? '')}
+                        </div>
+                        <div style={{ color: 'var(--muted-foreground)' }}>
+                            {t('debate.latency', {
+                                latency: event.latency,
+                            })}
+                        </div>
+                        {event.interrupted ? (
+                            <Tag color={'warning'}>
+                                {t('debate.interrupted')}
+                            </Tag>
+                        ) : null}
+                    </Flex>
+                ))}
+            {verdict ? (
+                <>
+                    <TextSection
+                        title={t('debate.judge-reasoning')}
+                        text={verdict.reasoning}
+                    />
+                    <TextSection
+                        title={t('debate.best-answer')}
+                        text={verdict.best_answer}
+                    />
+                </>
+            ) : null}
+        </Flex>
+    );
+};
+
+/**
+ * The progress of the latest debate, round by round, with the judge's
+ * reasoning and best answer so far, which the user can accept to finish the
+ * debate early. An interrupted debate can be resumed from its last completed
+ * round.
+ */
+const DebateProgress = ({
+    debateEvents,
+    isReplying,
+    onAcceptDebate,
+    onResumeDebate,
+}: Props) => {
+    const { t } = useTranslation();
+    const [accepted, setAccepted] = useState<boolean>(false);
+    const debateId = debateEvents[0]?.debateId;
+
+    useEffect(() => {
+        setAccepted(false);
+    }, [debateId]);
+
+    if (debateEvents.length === 0) {
+        return null;
+    }
+
+    const events = debateEvents.map((data) => data.event);
+    const rounds = new Map<number, DebateEvent[]>();
+    events
+        .filter((event) => event.type !== 'debate_finished')
+        .forEach((event) => {
+            rounds.set(event.round, [...(rounds.get(event.round) ?? []), event]);
+        });
+    const finished = events.find((event) => event.type === 'debate_finished');
+    const verdicts = events.filter(
+        (event) => event.type === 'judge_verdict' && event.best_answer,
+    );
+    const latestVerdict = verdicts[verdicts.length - 1];
+    const latestRound = Math.max(0, ...rounds.keys());
+
+    return (
+        <Flex
+            vertical={true}
+            gap={'small'}
+            style={{
+                width: '100%',
+                maxWidth: 'var(--chat-max-width)',
+                border: '1px solid var(--border)',
+                borderRadius: 8,
+                padding: 8,
+            }}
+        >
+            <Flex justify={'space-between'} align={'center'}>
+                <div style={{ fontWeight: 550 }}>
+                    {finished
+                        ? t('debate.title-finished', {
+                              rounds: finished.round,
+                          })
+                        : t('debate.title-running', { round: latestRound })}
+                </div>
+                {finished?.reason === 'interrupted' && onResumeDebate ? (
+                    <Tooltip title={t('tooltip.button.resume-debate')}>
+                        <Button
+                            size={'small'}
+                            disabled={isReplying}
+                            onClick={onResumeDebate}
+                        >
+                            {t('action.resume-debate')}
+                        </Button>
+                    </Tooltip>
+                ) : null}
+                {finished ? null : (
+                    <Tooltip title={t('tooltip.button.accept-debate')}>
+                        <Button
+                            size={'small'}
+                            type={'primary'}
+                            disabled={!isReplying || !latestVerdict}
+                            loading={accepted && isReplying}
+                            onClick={() => {
+                                setAccepted(true);
+                                onAcceptDebate();
+                            }}
+                        >
+                            {t('action.accept-debate')}
+                        </Button>
+                    </Tooltip>
+                )}
+            </Flex>
+            <Collapse
+                size={'small'}
+                style={{ maxHeight: 240, overflow: 'auto' }}
+                defaultActiveKey={[String(latestRound)]}
+                items={[...rounds.entries()].map(([round, roundEvents]) => ({
+                    key: String(round),
+                    label: (
+                        <Flex gap={'small'} align={'center'}>
+                            {t('debate.round', { round })}
+                            {roundEvents.some(
+                                (event) => event.type === 'judge_verdict',
+                            ) ? (
+                                <Tag color={'processing'}>
+                                    {t('debate.judged')}
+                                </Tag>
+                            ) : null}
+                        </Flex>
+                    ),
+                    children: <RoundDiv events={roundEvents} />,
+                }))}
+            />
+            {finished ? (
+                <Flex vertical={true} gap={'small'} style={{ fontSize: 12 }}>
+                    <div style={{ color: 'var(--muted-foreground)' }}>
+                        {t('debate.finish-reason', {
+                            reason: String(finished.reason),
+                        })}
+                    </div>
+                    <TextSection
+                        title={t('debate.conclusion')}
+                        text={finished.conclusion}
+                    />
+                </Flex>
+            ) : null}
+        </Flex>
+    );
+};
+
+export default memo(DebateProgress);
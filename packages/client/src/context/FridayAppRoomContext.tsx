@@ -1,6 +1,8 @@
 import {
     BackendResponse,
+    BlockType,
     ContentBlocks,
+    DebateEventData,
     ReplyData,
     SocketEvents,
     SocketRoomName,
@@ -10,6 +12,7 @@ import {
     ReactNode,
     useContext,
     useEffect,
+    useRef,
     useState,
 } from 'react';
 import { useSocket } from '@/context/SocketContext.tsx';
@@ -18,6 +21,15 @@ import { useNotification } from '@/context/NotificationContext.tsx';
 import { useTranslation } from 'react-i18next';
 import stripAnsi from 'strip-ansi';
 
+interface DebateConfig {
+    enabled: boolean;
+    agentCount: number;
+    rounds: number;
+    topic: string;
+    // Continue the latest debate of the session from its checkpoint
+    resume?: boolean;
+}
+
 interface FridayAppRoomContextType {
     replies: ReplyData[];
     isReplying: boolean;
@@ -25,15 +37,13 @@ interface FridayAppRoomContextType {
         name: string,
         role: string,
         content: ContentBlocks,
-        debateConfig?: {
-            enabled: boolean;
-            agentCount: number;
-            rounds: number;
-            topic: string;
-        } | null,
+        debateConfig?: DebateConfig | null,
     ) => void;
     moreReplies: boolean;
     interruptReply: () => void;
+    debateEvents: DebateEventData[];
+    acceptDebate: () => void;
+    resumeDebate: () => void;
     cleanCurrentHistory: () => void;
     cleaningHistory: boolean;
 }
@@ -54,6 +64,10 @@ export function FridayAppRoomContextProvider({ children }: Props) {
     const { messageApi } = useMessageApi();
     const [moreReplies, setMoreReplies] = useState(false);
     const [cleaningHistory, setCleaningHistory] = useState(false);
+    // The progress events of the latest debate
+    const [debateEvents, setDebateEvents] = useState<DebateEventData[]>([]);
+    // The config of the latest debate started, to resume it
+    const lastDebateConfig = useRef<DebateConfig | null>(null);
     const { t } = useTranslation();
 
     useEffect(() => {
@@ -108,7 +122,20 @@ export function FridayAppRoomContextProvider({ children }: Props) {
             },
         );
 
+        socket.on(
+            SocketEvents.server.pushDebateEventOfFridayApp,
+            (data: DebateEventData) => {
+                setDebateEvents((prevEvents) =>
+                    prevEvents.length > 0 &&
+                    prevEvents[0].debateId !== data.debateId
+                        ? [data]
+                        : [...prevEvents, data],
+                );
+            },
+        );
+
         return () => {
+            socket.off(SocketEvents.server.pushDebateEventOfFridayApp);
             socket.off(SocketEvents.server.pushReplyingState);
             socket.off(SocketEvents.server.pushReplies);
             socket.emit(
@@ -122,16 +149,14 @@ export function FridayAppRoomContextProvider({ children }: Props) {
         name: string,
         role: string,
         content: ContentBlocks,
-        debateConfig?: {
-            enabled: boolean;
-            agentCount: number;
-            rounds: number;
-            topic: string;
-        } | null,
+        debateConfig?: DebateConfig | null,
     ) => {
         if (!socket) {
             messageApi.error('Socket not connected. Please refresh the page.');
         } else {
+            if (debateConfig?.enabled) {
+                lastDebateConfig.current = debateConfig;
+            }
             socket.emit(
                 SocketEvents.client.sendUserInputToFridayApp,
                 name,
@@ -164,6 +189,30 @@ export function FridayAppRoomContextProvider({ children }: Props) {
         }
     };
 
+    // Stop the debate early with the judge's best answer so far
+    const acceptDebate = () => {
+        if (!socket) {
+            messageApi.error('Socket not connected. Please refresh the page.');
+        } else {
+            socket.emit(SocketEvents.client.acceptDebateOfFridayApp);
+        }
+    };
+
+    // Continue the latest debate from its last completed round, e.g. after
+    // it's interrupted. Without a checkpoint, the debate starts over
+    const resumeDebate = () => {
+        const debateConfig = lastDebateConfig.current;
+        if (!debateConfig) {
+            return;
+        }
+        handleUserInput(
+            'user',
+            'user',
+            [{ type: BlockType.TEXT, text: debateConfig.topic }] as ContentBlocks,
+            { ...debateConfig, resume: true },
+        );
+    };
+
     const cleanCurrentHistory = () => {
         if (!socket) {
             messageApi.error('Socket not connected. Please refresh the page.');
@@ -182,6 +231,9 @@ export function FridayAppRoomContextProvider({ children }: Props) {
                 handleUserInput,
                 moreReplies,
                 interruptReply,
+                debateEvents,
+                acceptDebate,
+                resumeDebate,
                 cleanCurrentHistory,
                 cleaningHistory,
             }}
@@ -13,6 +13,9 @@ const ChatPage = () => {
         handleUserInput,
         moreReplies,
         interruptReply,
+        debateEvents,
+        acceptDebate,
+        resumeDebate,
         cleaningHistory,
         cleanCurrentHistory,
     } = useFridayAppRoom();
@@ -28,6 +31,9 @@ const ChatPage = () => {
                     handleUserInput('user', 'user', contentBlocks, debateConfig);
                 }}
                 onInterruptReply={interruptReply}
+                debateEvents={debateEvents}
+                onAcceptDebate={acceptDebate}
+                onResumeDebate={resumeDebate}
                 onCleanHistory={cleanCurrentHistory}
                 isCleaningHistory={cleaningHistory}
             />
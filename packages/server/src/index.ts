@@ -4,6 +4,7 @@ import * as trpcExpress from '@trpc/server/adapters/express';
 import { initializeDatabase } from './database';
 import { appRouter } from './trpc/router';
 import { SocketManager } from './trpc/socket';
+import { FridayBlobStore } from './services/FridayBlobStore';
 import { ConfigManager } from '../../shared/src/config';
 import path from 'path';
 import opener from 'opener';
@@ -61,6 +62,22 @@ async function initializeServer() {
             otelRouter,
         );
 
+        // Serve the blobs (e.g. images) of the Friday app messages
+        app.get('/friday/blobs/:blobId', (req, res) => {
+            const blobPath = FridayBlobStore.getInstance().getBlobPath(
+                req.params.blobId,
+            );
+            if (blobPath) {
+                res.sendFile(blobPath, {
+                    headers: {
+                        'Cache-Control': 'public, max-age=31536000, immutable',
+                    },
+                });
+            } else {
+                res.sendStatus(404);
+            }
+        });
+
         // Initialize SocketManager
         SocketManager.init(httpServer);
 
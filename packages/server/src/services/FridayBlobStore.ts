@@ -0,0 +1,110 @@
+import * as fs from 'node:fs';
+import * as path from 'node:path';
+import { createHash } from 'node:crypto';
+import { PATHS } from '../../../shared/src';
+import {
+    BlockType,
+    ContentBlock,
+    ContentType,
+    SourceType,
+} from '../../../shared/src/types/messageForm';
+
+// The blob IDs are the SHA-256 of the content with a file extension
+const BLOB_ID_PATTERN = /^[0-9a-f]{64}\.[0-9a-z]+$/;
+
+/**
+ * The blobs (e.g. images) of the Friday app messages, stored as files named
+ * by their content hash. The messages refer to them by URL instead of
+ * carrying the base64 data inline.
+ */
+export class FridayBlobStore {
+    private static instance: FridayBlobStore;
+    private readonly blobsDir: string;
+
+    private constructor() {
+        this.blobsDir = PATHS.getFridayBlobsDir();
+        fs.mkdirSync(this.blobsDir, { recursive: true });
+    }
+
+    public static getInstance(): FridayBlobStore {
+        if (!FridayBlobStore.instance) {
+            FridayBlobStore.instance = new FridayBlobStore();
+        }
+        return FridayBlobStore.instance;
+    }
+
+    public getBlobPath(blobId: string): string | null {
+        if (!BLOB_ID_PATTERN.test(blobId)) {
+            return null;
+        }
+        const blobPath = path.join(this.blobsDir, blobId);
+        return fs.existsSync(blobPath) ? blobPath : null;
+    }
+
+    public async saveBlob(blobId: string, data: Buffer): Promise<void> {
+        if (!BLOB_ID_PATTERN.test(blobId)) {
+            throw new Error(`Invalid blob ID: ${blobId}`);
+        }
+        const blobPath = path.join(this.blobsDir, blobId);
+        if (fs.existsSync(blobPath)) {
+            return;
+        }
+        // Write atomically, the blob may be requested while being written
+        const tmpPath = `${blobPath}.${crypto.randomUUID()}.tmp`;
+        await fs.promises.writeFile(tmpPath, data);
+        await fs.promises.rename(tmpPath, blobPath);
+    }
+
+    /**
+     * Move the inline base64 data of the content into the blob store.
+     * Returns the content referring to the blobs by the URLs served by the
+     * studio, to save and broadcast, and by their local paths, to pass to
+     * the Friday app on the same machine.
+     */
+    public async offloadContent(
+        content: ContentType,
+        baseUrl: string,
+    ): Promise<{ served: ContentType; local: ContentType }> {
+        if (typeof content === 'string') {
+            return { served: content, local: content };
+        }
+
+        const served: ContentBlock[] = [];
+        const local: ContentBlock[] = [];
+        for (const block of content) {
+            if (
+                (block.type === BlockType.IMAGE ||
+                    block.type === BlockType.AUDIO ||
+                    block.type === BlockType.VIDEO) &&
+                block.source.type === SourceType.BASE64
+            ) {
+                const data = Buffer.from(block.source.data, 'base64');
+                const extension =
+                    (block.source.media_type.split('/').at(-1) || '').replace(
+                        /[^0-9a-z]/g,
+                        '',
+                    ) || 'bin';
+                const blobId = `${createHash('sha256')
+                    .update(data)
+                    .digest('hex')}.${extension}`;
+                await this.saveBlob(blobId, data);
+
+                served.push({
+                    ...block,
+                    source: { type: SourceType.URL, url: `${baseUrl}/${blobId}` },
+                } as ContentBlock);
+                local.push({
+                    ...block,
+                    source: {
+                        type: SourceType.URL,
+                        url: path.join(this.blobsDir, blobId),
+                    },
+                } as ContentBlock);
+            } else {
+                served.push(block);
+                local.push(block);
+            }
+        }
+        return { served, local };
+    }
+}
@@ -13,6 +13,7 @@ import { MessageDao } from '../dao/Message';
 import { SocketManager } from './socket';
 import { FridayConfigManager } from '../../../shared/src/config/friday';
 import { FridayAppMessageDao } from '../dao/FridayAppMessage';
+import { FridayBlobStore } from '../services/FridayBlobStore';
 
 const textBlock = z.object({
     text: z.string(),
@@ -283,6 +284,67 @@ export const appRouter = t.router({
                 });
         }),
 
+    pushUsageToFridayApp: t.procedure
+        .input(
+            z.object({
+                replyId: z.string().nullable().optional(),
+                usage: z.record(z.unknown()),
+            }),
+        )
+        .mutation(async ({ input }) => {
+            // Broadcast to all the clients in the FridayAppRoom
+            SocketManager.broadcastUsageToFridayAppRoom(input);
+        }),
+
+    pushBudgetToFridayApp: t.procedure
+        .input(
+            z.object({
+                replyId: z.string(),
+                budget: z.record(z.unknown()),
+            }),
+        )
+        .mutation(async ({ input }) => {
+            // Broadcast to all the clients in the FridayAppRoom
+            SocketManager.broadcastBudgetToFridayAppRoom(input);
+        }),
+
+    pushDebateEventToFridayApp: t.procedure
+        .input(
+            z.object({
+                debateId: z.string(),
+                event: z
+                    .object({
+                        type: z.enum([
+                            'round_started',
+                            'speaker_finished',
+                            'judge_verdict',
+                            'debate_finished',
+                        ]),
+                        round: z.number(),
+                    })
+                    .passthrough(),
+            }),
+        )
+        .mutation(async ({ input }) => {
+            // Broadcast to all the clients in the FridayAppRoom
+            SocketManager.broadcastDebateEventToFridayAppRoom(input);
+        }),
+
+    // The fallback of the binary channel, with the data in base64
+    pushBlobToFridayApp: t.procedure
+        .input(
+            z.object({
+                blobId: z.string(),
+                data: z.string(),
+            }),
+        )
+        .mutation(async ({ input }) => {
+            await FridayBlobStore.getInstance().saveBlob(
+                input.blobId,
+                Buffer.from(input.data, 'base64'),
+            );
+        }),
+
     clientGetFridayConfig: t.procedure.query(async () => {
         return FridayConfigManager.getInstance().getConfig();
     }),
@@ -3,6 +3,7 @@ import { Server as HttpServer } from 'http';
 import { RunDao } from '../dao/Run';
 import {
     BackendResponse,
+    DebateEventData,
     InputRequestData,
     MessageData,
     OverviewData,
@@ -24,12 +25,44 @@ import { FridayAppMessageDao } from '../dao/FridayAppMessage';
 import dayjs from 'dayjs';
 import { ConfigManager, PATHS } from '../../../shared/src';
 import { ReplyingStateManager } from '../services/ReplyingStateManager';
+import { FridayBlobStore } from '../services/FridayBlobStore';
 import * as fs from 'node:fs';
+import * as os from 'node:os';
+import * as path from 'node:path';
 import {
     FridayConfig,
     FridayConfigManager,
 } from '../../../shared/src/config/friday';
 import { SpanDao } from '../dao/Trace';
+import { decode as decodeMsgpack } from '@msgpack/msgpack';
+
+// The longest query passed as a command line argument, in characters
+const MAX_QUERY_ARG_LENGTH = 64 * 1024;
+
+/**
+ * Decode a large payload of the Friday app, which arrives pre-serialized as
+ * {encoding, body} with the body as a binary attachment. The other payloads
+ * are returned as-is.
+ */
+function decodeFridayPayload(payload: unknown): unknown {
+    if (
+        typeof payload !== 'object' ||
+        payload === null ||
+        !('encoding' in payload) ||
+        !('body' in payload) ||
+        !Buffer.isBuffer(payload.body)
+    ) {
+        return payload;
+    }
+    switch (payload.encoding) {
+        case 'json':
+            return JSON.parse(payload.body.toString('utf8'));
+        case 'msgpack':
+            return decodeMsgpack(payload.body);
+        default:
+            throw new Error(`Unsupported encoding: ${payload.encoding}`);
+    }
+}
 
 export class SocketManager {
     private static io: Server;
@@ -44,6 +77,10 @@ export class SocketManager {
         this.io.of('/friday').emit(SocketEvents.server.interruptReply);
     }
 
+    static async sendAcceptDebateSignalToFriday() {
+        this.io.of('/friday').emit(SocketEvents.server.acceptDebate);
+    }
+
     static init(httpServer: HttpServer) {
         this.io = new Server(httpServer, {
             cors: {
@@ -56,6 +93,121 @@ export class SocketManager {
         fridayNamespace.on('connection', (socket) => {
             console.debug(`${socket.id}: Friday app client connected`);
 
+            // Decode the pre-serialized large payloads before the handlers
+            socket.use((packet, next) => {
+                try {
+                    packet[1] = decodeFridayPayload(packet[1]);
+                    next();
+                } catch (error) {
+                    console.error(error);
+                    next(error as Error);
+                }
+            });
+
+            // The Friday app pushes its messages and finished signals over
+            // the socket, and resends the ones not acknowledged after
+            // reconnecting. Both are idempotent.
+            socket.on(
+                SocketEvents.friday.pushMessageToFridayApp,
+                async (
+                    input: {
+                        replyId: string;
+                        msg: {
+                            id: string;
+                            name: string;
+                            role: string;
+                            content: ContentBlocks;
+                            metadata: object;
+                            timestamp: string;
+                        };
+                    },
+                    callback?: (success: boolean) => void,
+                ) => {
+                    FridayAppMessageDao.saveReplyMessage(
+                        input.replyId,
+                        input.msg,
+                        false,
+                    )
+                        .then((reply) => {
+                            this.broadcastReplyToFridayAppRoom(reply);
+                            callback?.(true);
+                        })
+                        .catch((error) => {
+                            console.error(error);
+                            callback?.(false);
+                        });
+                },
+            );
+
+            socket.on(
+                SocketEvents.friday.pushFinishedSignalToFridayApp,
+                async (
+                    input: { replyId: string },
+                    callback?: (success: boolean) => void,
+                ) => {
+                    FridayAppMessageDao.finishReply(input.replyId)
+                        .then((reply) => {
+                            this.broadcastReplyToFridayAppRoom(reply);
+                            callback?.(true);
+                        })
+                        .catch((error) => {
+                            console.error(error);
+                            callback?.(false);
+                        });
+                },
+            );
+
+            socket.on(
+                SocketEvents.friday.pushUsageToFridayApp,
+                async (
+                    input: { replyId?: string | null; usage: object },
+                    callback?: (success: boolean) => void,
+                ) => {
+                    this.broadcastUsageToFridayAppRoom(input);
+                    callback?.(true);
+                },
+            );
+
+            socket.on(
+                SocketEvents.friday.pushBudgetToFridayApp,
+                async (
+                    input: { replyId: string; budget: object },
+                    callback?: (success: boolean) => void,
+                ) => {
+                    this.broadcastBudgetToFridayAppRoom(input);
+                    callback?.(true);
+                },
+            );
+
+            socket.on(
+                SocketEvents.friday.pushDebateEventToFridayApp,
+                async (
+                    input: DebateEventData,
+                    callback?: (success: boolean) => void,
+                ) => {
+                    this.broadcastDebateEventToFridayAppRoom(input);
+                    callback?.(true);
+                },
+            );
+
+            // The images of the messages arrive as binary attachments, once
+            // before the messages referring to them
+            socket.on(
+                SocketEvents.friday.pushBlobToFridayApp,
+                async (
+                    input: { blobId: string; data: Buffer },
+                    callback?: (success: boolean) => void,
+                ) => {
+                    FridayBlobStore.getInstance()
+                        .saveBlob(input.blobId, input.data)
+                        .then(() => callback?.(true))
+                        .catch((error) => {
+                            console.error(error);
+                            callback?.(false);
+                        });
+                },
+            );
+
             socket.on('disconnect', () => {
                 console.debug(`${socket.id}: Friday app client disconnected`);
             });
@@ -404,6 +556,7 @@ export class SocketManager {
                         agentCount: number;
                         rounds: number;
                         topic: string;
+                        resume?: boolean;
                     } | null,
                     callback: (response: BackendResponse) => void,
                 ) => {
@@ -412,13 +565,25 @@ export class SocketManager {
                     const replyId = crypto.randomUUID();
                     const msgId = crypto.randomUUID();
 
+                    // TODO: move somewhere
+                    const config = ConfigManager.getInstance().getConfig();
+
+                    // The images are kept in the blob store, referred to by
+                    // URL in the saved message and by the local path in the
+                    // query of the Friday app, instead of inline base64
+                    const { served, local } =
+                        await FridayBlobStore.getInstance().offloadContent(
+                            content,
+                            `http://localhost:${config.port}/friday/blobs`,
+                        );
+
                     FridayAppMessageDao.saveReplyMessage(
                         replyId,
                         {
                             id: msgId,
                             name: name,
                             role: role,
-                            content: content,
+                            content: served as ContentBlocks,
                             metadata: {},
                             timestamp: dayjs().format(
                                 'YYYY-MM-DD HH:mm:ss.SSS',
@@ -438,9 +603,6 @@ export class SocketManager {
                         });
 
                     // Send the message to the python client
-                    // TODO: move somewhere
-                    const config = ConfigManager.getInstance().getConfig();
-
                     // Broad the replying state to the Friday app room
                     replyingManager.setReplyingState(true);
                     this.broadcastReplyingStateToFridayAppRoom();
@@ -461,10 +623,22 @@ export class SocketManager {
                     const mainScriptPath = fridayConfig.mainScriptPath
                         ? fridayConfig.mainScriptPath
                         : fridayConfigManager.getDefaultMainScriptPath();
+                    // The large queries (e.g. with base64 images) exceed the
+                    // command line limit, so they're passed by a file
+                    const query = JSON.stringify(local);
+                    let queryFile: string | null = null;
+                    const queryArgs = ['--query', query];
+                    if (query.length > MAX_QUERY_ARG_LENGTH) {
+                        queryFile = path.join(
+                            os.tmpdir(),
+                            `friday-query-${msgId}.json`,
+                        );
+                        fs.writeFileSync(queryFile, query, 'utf-8');
+                        queryArgs.splice(0, 2, '--query-file', queryFile);
+                    }
                     const args = [
                         mainScriptPath,
-                        '--query',
-                        JSON.stringify(content),
+                        ...queryArgs,
                         '--studio_url',
                         `http://localhost:${config.port}`,
                     ];
@@ -474,6 +648,15 @@ export class SocketManager {
                             args.push(`--${key}`, value);
                         }
                     }
+                    // The studio keeps a single conversation, saved as the
+                    // session of the dialog history file
+                    args.push(
+                        '--sessionId',
+                        path.basename(
+                            PATHS.getFridayDialogHistoryPath(),
+                            '.json',
+                        ),
+                    );
 
                     // Add debate configuration parameters
                     if (debateConfig && debateConfig.enabled) {
@@ -483,6 +666,10 @@ export class SocketManager {
                         if (debateConfig.topic) {
                             args.push('--debateTopic', debateConfig.topic);
                         }
+                        // Continue the latest debate from its last completed round
+                        if (debateConfig.resume) {
+                            args.push('--resumeDebate', 'true');
+                        }
                     }
 
                     runPythonScript(fridayConfig.pythonEnv, args)
@@ -511,6 +698,9 @@ export class SocketManager {
                             } as BackendResponse);
                         })
                         .finally(() => {
+                            if (queryFile) {
+                                fs.rmSync(queryFile, { force: true });
+                            }
                             replyingManager.setReplyingState(false);
                             this.broadcastReplyingStateToFridayAppRoom();
                         });
@@ -524,15 +714,14 @@ export class SocketManager {
                 },
             );
 
+            // Stop the debate early with the judge's best answer so far
+            socket.on(SocketEvents.client.acceptDebateOfFridayApp, async () => {
+                await this.sendAcceptDebateSignalToFriday();
+            });
+
             socket.on(SocketEvents.client.cleanHistoryOfFridayApp, async () => {
                 FridayAppMessageDao.cleanHistoryMessages().then(() => {
-                    const filePath = PATHS.getFridayDialogHistoryPath();
-                    if (fs.existsSync(filePath)) {
-                        fs.unlinkSync(filePath);
-                        console.debug(`Deleted file: ${filePath}`);
-                    } else {
-                        console.warn(`File not found: ${filePath}`);
-                    }
+                    this.cleanFridaySessions();
                     // TODO: 告知client
                     this.broadcastReplyToFridayAppRoom(undefined, true);
                 });
@@ -544,6 +733,58 @@ export class SocketManager {
         });
     }
 
+    /*
+     * Delete all the sessions of Friday: the session files listed in the
+     * session index and the default one, in JSON or msgpack, the index, the
+     * archived sessions and the debate checkpoints, so that no cleaned
+     * conversation is loaded or resumed again. The config, the blobs and the
+     * caches in the Friday directory are kept.
+     */
+    static cleanFridaySessions() {
+        const fridayDir = PATHS.getFridayDir();
+        const indexPath = path.join(fridayDir, 'sessions_index.json');
+
+        const sessionIds = new Set<string>([
+            path.basename(PATHS.getFridayDialogHistoryPath(), '.json'),
+        ]);
+        if (fs.existsSync(indexPath)) {
+            try {
+                const index = JSON.parse(fs.readFileSync(indexPath, 'utf-8'));
+                Object.keys(index).forEach((id) => sessionIds.add(id));
+            } catch (error) {
+                console.warn(`Failed to read ${indexPath}:`, error);
+            }
+        }
+
+        const filePaths = [indexPath];
+        sessionIds.forEach((id) => {
+            filePaths.push(
+                path.join(fridayDir, `${id}.json`),
+                path.join(fridayDir, `${id}.msgpack`),
+            );
+        });
+        // The checkpoints of the debates, including the unindexed sessions
+        if (fs.existsSync(fridayDir)) {
+            fs.readdirSync(fridayDir)
+                .filter((name) => /^debate_[\w-]+\.json$/.test(name))
+                .forEach((name) => filePaths.push(path.join(fridayDir, name)));
+        }
+
+        const configPath = PATHS.getFridayConfigPath();
+        for (const filePath of new Set(filePaths)) {
+            if (filePath !== configPath && fs.existsSync(filePath)) {
+                fs.unlinkSync(filePath);
+                console.debug(`Deleted file: ${filePath}`);
+            }
+        }
+
+        const archiveDir = path.join(fridayDir, 'archive');
+        if (fs.existsSync(archiveDir)) {
+            fs.rmSync(archiveDir, { recursive: true, force: true });
+            console.debug(`Deleted directory: ${archiveDir}`);
+        }
+    }
+
     /*
      * Emit events to the project list room.
      */
@@ -714,6 +955,33 @@ export class SocketManager {
             );
     }
 
+    static broadcastUsageToFridayAppRoom(input: {
+        replyId?: string | null;
+        usage: object;
+    }) {
+        this.io
+            .of('/client')
+            .to(SocketRoomName.FridayAppRoom)
+            .emit(SocketEvents.server.pushUsageOfFridayApp, input);
+    }
+
+    static broadcastBudgetToFridayAppRoom(input: {
+        replyId: string;
+        budget: object;
+    }) {
+        this.io
+            .of('/client')
+            .to(SocketRoomName.FridayAppRoom)
+            .emit(SocketEvents.server.pushBudgetOfFridayApp, input);
+    }
+
+    static broadcastDebateEventToFridayAppRoom(input: DebateEventData) {
+        this.io
+            .of('/client')
+            .to(SocketRoomName.FridayAppRoom)
+            .emit(SocketEvents.server.pushDebateEventOfFridayApp, input);
+    }
+
     static broadcastReplyingStateToFridayAppRoom() {
         const replyingManager = ReplyingStateManager.getInstance();
         this.io
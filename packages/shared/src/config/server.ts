@@ -38,6 +38,7 @@ export const PATHS = {
         path.join(PATHS.getAppDataDir(), 'Friday', 'config.json'),
     getFridayDialogHistoryPath: () =>
         path.join(PATHS.getAppDataDir(), 'Friday', 'session.json'),
+    getFridayBlobsDir: () => path.join(PATHS.getAppDataDir(), 'Friday', 'blobs'),
 } as const;
 
 export const ServerConfig = {
@@ -29,11 +29,24 @@ export const SocketEvents = {
         // Friday app room
         pushReplies: 'pushReplies',
         pushReplyingState: 'pushReplyingState',
+        pushUsageOfFridayApp: 'pushUsageOfFridayApp',
+        pushBudgetOfFridayApp: 'pushBudgetOfFridayApp',
+        pushDebateEventOfFridayApp: 'pushDebateEventOfFridayApp',
         interruptReply: 'interrupt',
+        acceptDebate: 'acceptDebate',
         // To python:
         //  send the user input
         forwardUserInput: 'forwardUserInput',
     },
+    friday: {
+        // From the Friday app, the same as the tRPC procedures
+        pushMessageToFridayApp: 'pushMessageToFridayApp',
+        pushFinishedSignalToFridayApp: 'pushFinishedSignalToFridayApp',
+        pushUsageToFridayApp: 'pushUsageToFridayApp',
+        pushBlobToFridayApp: 'pushBlobToFridayApp',
+        pushBudgetToFridayApp: 'pushBudgetToFridayApp',
+        pushDebateEventToFridayApp: 'pushDebateEventToFridayApp',
+    },
     client: {
         cleanHistoryOfFridayApp: 'cleanHistoryOfFridayApp',
         joinOverviewRoom: 'joinOverviewRoom',
@@ -49,6 +62,7 @@ export const SocketEvents = {
         sendUserInputToServer: 'sendUserInputToServer',
         sendUserInputToFridayApp: 'sendUserInputToFridayApp',
         interruptReplyOfFridayApp: 'interruptReplyOfFridayApp',
+        acceptDebateOfFridayApp: 'acceptDebateOfFridayApp',
         deleteProjects: 'deleteProjects',
         deleteRuns: 'deleteRuns',
     },
@@ -103,6 +117,23 @@ export interface ReplyData {
     finished: boolean;
 }
 
+// The progress of a debate run by the Friday app, pushed after each round
+// started, speaker finished and judge verdict, and when the debate finished
+export interface DebateEvent {
+    type:
+        | 'round_started'
+        | 'speaker_finished'
+        | 'judge_verdict'
+        | 'debate_finished';
+    round: number;
+    [key: string]: unknown;
+}
+
+export interface DebateEventData {
+    debateId: string;
+    event: DebateEvent;
+}
+
 export interface OverviewData {
     projectsWeekAgo: number;
     projectsMonthAgo: number;